@@ -4,7 +4,11 @@ Django Admin configuration for Mind Status.
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import Organization, User, InviteToken, StatusLog
+from .models import (
+    Organization, User, InviteToken, StatusLog, UserLatestStatus, DailyStatusAggregate, ExportJob, BulkUploadJob,
+    EmailOutbox,
+    EmailRateLimit,
+)
 
 
 @admin.register(Organization)
@@ -64,3 +68,50 @@ class StatusLogAdmin(admin.ModelAdmin):
             return obj.comment[:50] + '...' if len(obj.comment) > 50 else obj.comment
         return '-'
     comment_preview.short_description = 'コメント'
+
+
+@admin.register(UserLatestStatus)
+class UserLatestStatusAdmin(admin.ModelAdmin):
+    list_display = ['user', 'status', 'local_date', 'created_at']
+    list_filter = ['status', 'local_date']
+    search_fields = ['user__email', 'user__full_name']
+    raw_id_fields = ['user', 'status_log']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(DailyStatusAggregate)
+class DailyStatusAggregateAdmin(admin.ModelAdmin):
+    list_display = ['organization', 'date', 'status', 'count']
+    list_filter = ['organization', 'status']
+    date_hierarchy = 'date'
+    readonly_fields = ['updated_at']
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ['organization', 'format', 'status', 'rows_processed', 'total_rows', 'created_at', 'expires_at']
+    list_filter = ['status', 'format']
+    search_fields = ['organization__name', 'requested_by__email']
+    readonly_fields = ['created_at', 'started_at', 'heartbeat_at', 'finished_at']
+
+
+@admin.register(BulkUploadJob)
+class BulkUploadJobAdmin(admin.ModelAdmin):
+    list_display = ['organization', 'file_name', 'status', 'rows_processed', 'total_rows', 'success_count', 'error_count', 'created_at']
+    list_filter = ['status']
+    search_fields = ['organization__name', 'requested_by__email', 'file_name']
+    readonly_fields = ['created_at', 'started_at', 'heartbeat_at', 'finished_at']
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ['to_email', 'kind', 'status', 'attempts', 'provider_status', 'created_at', 'sent_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['to_email', 'organization__name']
+    readonly_fields = ['created_at', 'claimed_at', 'sent_at', 'provider_status', 'provider_message_id']
+
+
+@admin.register(EmailRateLimit)
+class EmailRateLimitAdmin(admin.ModelAdmin):
+    list_display = ['key', 'rate', 'tokens', 'paused_until', 'day', 'day_count', 'updated_at']
+    readonly_fields = ['updated_at']
@@ -5,3 +5,6 @@ class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
     verbose_name = 'Mind Status API'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,73 @@
+"""
+Authentication classes for Mind Status API.
+"""
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .utils.cache import auth_cache, get_org_auth_version, get_user_auth_version, is_shared_cache
+
+AUTH_USER_KEY = 'auth-user:{user_id}:v{version}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication のユーザー取得をキャッシュする
+
+    ユーザーは組織と一緒に（select_related）取得し、AUTH_USER_CACHE_TIMEOUT 秒キャッシュする。
+    キャッシュキーにはユーザーのバージョンを含め、ユーザーの変更（パスワード変更・無効化・権限変更・削除）で
+    バージョンを上げて無効化する（signals / utils.cache.bump_user_auth_versions）。
+    組織の変更は組織のバージョンで無効化する。DB はキャッシュがない場合のみ参照する。
+
+    プロセス内のキャッシュ（LocMem・デフォルト）では無効化が他のワーカーに届かず、無効化したユーザーや
+    権限を外した管理者が TTL の間認証されてしまうため、キャッシュせず毎回 DB から取得する
+    （共有キャッシュ（Redis・DB）を設定した場合のみキャッシュする）。
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 0)
+        if timeout <= 0 or not is_shared_cache(getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')):
+            return self._check_user(self._load_user(user_id), validated_token)
+
+        cache = auth_cache()
+        key = AUTH_USER_KEY.format(user_id=user_id, version=get_user_auth_version(user_id))
+        entry = cache.get(key)
+        if entry is not None:
+            org_version, user = entry
+            if org_version == get_org_auth_version(user.organization_id):
+                return self._check_user(user, validated_token)
+
+        user = self._load_user(user_id)
+        cache.set(key, (get_org_auth_version(user.organization_id), user), timeout=timeout)
+        return self._check_user(user, validated_token)
+
+    def _load_user(self, user_id):
+        try:
+            return (
+                self.user_model.objects
+                .select_related('organization')
+                .get(**{api_settings.USER_ID_FIELD: user_id})
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+    def _check_user(self, user, validated_token):
+        """JWTAuthentication.get_user と同じ検証（キャッシュしたユーザーにも毎回行う）"""
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            from rest_framework_simplejwt.utils import get_md5_hash_password
+
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        return user
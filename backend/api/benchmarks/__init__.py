@@ -0,0 +1,72 @@
+"""
+性能ベンチマーク
+
+各スイートは run(**options) で結果の dict のリストを返す。
+python manage.py run_benchmarks から実行し、JSON で出力する。
+"""
+
+import gc
+import statistics
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(values, pct):
+    """values の pct パーセンタイル（線形補間）"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    k = (len(ordered) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def measure(func, repeat=10, warmup=1):
+    """
+    func を repeat 回実行し、レイテンシ・クエリ数・ピークメモリを計測
+
+    Args:
+        func: 引数なしで呼び出す計測対象
+        repeat: 計測回数
+        warmup: 計測前の空実行回数
+
+    Returns:
+        dict: latency_ms（p50/p95/p99/mean/min/max）, queries, peak_memory_kb
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # クエリ数とピークメモリは別の1回で計測（tracemalloc のオーバーヘッドを時間計測に含めない）
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'latency_ms': {
+            'p50': round(percentile(timings, 50), 3),
+            'p95': round(percentile(timings, 95), 3),
+            'p99': round(percentile(timings, 99), 3),
+            'mean': round(statistics.fmean(timings), 3),
+            'min': round(min(timings), 3),
+            'max': round(max(timings), 3),
+        },
+        'repeat': repeat,
+        'queries': len(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
@@ -0,0 +1,64 @@
+"""
+JWT 認証（リクエストごとのユーザー・組織の取得）のコスト比較
+
+- jwt: 従来の実装（JWTAuthentication・ユーザーの SELECT と request.user.organization の SELECT）
+- cached_jwt: CachedJWTAuthentication（キャッシュにあれば DB を参照しない）
+
+rows 回の認証（ダッシュボードのポーリング相当）を1回として計測し、queries で DB の参照回数を比較する。
+一時的な組織とユーザーを作成して実行し、終了後に削除する。
+CachedJWTAuthentication は共有キャッシュでのみキャッシュするため、一時ディレクトリのファイルキャッシュで計測する。
+"""
+
+import tempfile
+
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import CachedJWTAuthentication
+from api.models import Organization, User
+from . import measure
+
+DEFAULT_SIZES = (1, 100)
+
+
+def _authenticate(authenticator, request, size):
+    for _ in range(size):
+        user, _token = authenticator.authenticate(request)
+        user.organization.name
+    return size
+
+
+def run(sizes=DEFAULT_SIZES, repeat=10, **options):
+    organization = Organization.objects.create(name='認証ベンチマーク', org_type='COMPANY')
+    user = User.objects.create_user(
+        email=f'bench-auth-{organization.id}@example.com',
+        full_name='ベンチマーク管理者',
+        password=None,
+        organization=organization,
+        role='ADMIN',
+        is_activated=True,
+    )
+    header = f'Bearer {AccessToken.for_user(user)}'
+    request = Request(RequestFactory().get('/api/users/me/', HTTP_AUTHORIZATION=header))
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': cache_dir,
+            }},
+            AUTH_USER_CACHE_TIMEOUT=30,
+        ):
+            for size in sizes:
+                for name, authenticator in (('jwt', JWTAuthentication()), ('cached_jwt', CachedJWTAuthentication())):
+                    result = measure(lambda: _authenticate(authenticator, request, size), repeat=repeat)
+                    result.update({'suite': 'auth', 'case': name, 'rows': size})
+                    results.append(result)
+    finally:
+        user.delete()
+        organization.delete()
+    return results
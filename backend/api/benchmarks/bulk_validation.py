@@ -0,0 +1,58 @@
+"""
+一括登録の行検証コスト比較
+
+- serializer: 従来の実装（行ごとに BulkUploadRowSerializer を生成して is_valid()）
+- columnar: validate_user_rows（列ごとに検証・繰り返し現れる値はメモ化）
+- columnar_pool: validate_user_rows をプロセスプール（POOL_WORKERS）で実行
+
+DB を使わず、validate_bulk_upload_row 済みの行の検証コストのみを計測する
+（既存ユーザーとのメールアドレス重複チェックは含まない）。
+"""
+
+from api.serializers import BulkUploadRowSerializer
+from api.utils.bulk_validation import validate_user_rows
+from . import measure
+
+DEFAULT_SIZES = (1000, 10000)
+POOL_WORKERS = 4
+
+
+def _rows(size):
+    """学校向けテンプレート相当の行（性別・学年・組は繰り返し現れる）"""
+    genders = ['男', '女', 'その他', None]
+    return [
+        {
+            'student_number': str(i),
+            'full_name': f'生徒{i:05d}',
+            'full_name_kana': 'セイト',
+            'grade': str(i % 6 + 1),
+            'class_name': 'ABCD'[i % 4] + '組',
+            'gender': genders[i % 4],
+            'birth_date': f'20{10 + i % 6}-0{i % 9 + 1}-1{i % 9}',
+            'email': f'student{i}@example.com',
+        }
+        for i in range(size)
+    ]
+
+
+def _serializer(rows):
+    return sum(
+        BulkUploadRowSerializer(data=row).is_valid()
+        for row in rows
+    )
+
+
+def run(sizes=DEFAULT_SIZES, repeat=5, **options):
+    results = []
+    for size in sizes:
+        rows = _rows(size)
+        cases = (
+            ('serializer', lambda: _serializer(rows)),
+            ('columnar', lambda: validate_user_rows(rows, workers=0)),
+            ('columnar_pool', lambda: validate_user_rows(rows, workers=POOL_WORKERS)),
+        )
+        for name, func in cases:
+            result = measure(func, repeat=repeat)
+            result.update({'suite': 'bulk_validation', 'case': name, 'rows': size})
+            results.append(result)
+    return results
@@ -0,0 +1,155 @@
+"""
+メール送信のスループット比較（SendGrid 互換のローカルサーバー sendgrid_stub に送信）
+
+- client_per_message: 従来の実装（1通ごとに SendGridAPIClient を作成・毎回新しい接続）
+- pooled_per_message: send_email_batches で1通ずつ（keep-alive 接続を使い回し・並行送信）
+- pooled_batched: send_email_batches で EMAIL_OUTBOX_BATCH_SIZE 件ずつ（personalizations でまとめて送信）
+- bulk_upload_delivered: bulk_upload（rows 行）から送信キューが空になるまで（run_email_worker と同じ deliver_outbox）
+- password_reset_delivered: request_password_reset からリセットメールの送信まで
+
+スタブサーバーはネットワーク遅延の代わりに STUB_LATENCY_MS だけ待ってから応答する。
+送信レート制限（email_rate_limit）は BENCHMARK_SETTINGS で実質無制限にして計測する。
+結果には messages_per_second（p50 から算出）を含める。
+client_per_message は1通ごとに遅延がかかるため、CLIENT_MAX_ROWS 件・CLIENT_MAX_REPEAT 回までに抑える。
+
+bulk_upload_delivered / password_reset_delivered は一時的な組織を作成して実行し、終了後に削除する。
+他の組織の送信待ちメールがある場合（スタブに送信してしまうため）は実行しない。
+"""
+
+import time
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+from sendgrid import SendGridAPIClient
+from sendgrid.helpers.mail import Mail
+
+from api.models import EmailOutbox, Organization, User
+from api.utils.email import INVITE_TEMPLATE, send_email_batches
+from api.utils.email_transport import SendGridTransport
+from api.utils.outbox import deliver_outbox, has_due_emails
+from api.utils.sendgrid_stub import SendGridStubServer
+from . import measure
+from .views import _bulk_upload_file, _consume
+
+DEFAULT_SIZES = (100, 1000)
+STUB_LATENCY_MS = 20
+CLIENT_MAX_ROWS = 100
+CLIENT_MAX_REPEAT = 3
+
+BENCHMARK_SETTINGS = {
+    'SENDGRID_API_KEY': 'bench-key',
+    'EMAIL_RATE_LIMIT_PER_SECOND': 1_000_000,
+    'EMAIL_RATE_LIMIT_BURST': 1_000_000,
+    'ALLOWED_HOSTS': ['*'],
+}
+
+
+def _recipients(size):
+    return [
+        (f'bench-mail-{i}@example.com', f'送信ユーザー{i}', f'http://localhost:3000/invite/{uuid.uuid4()}')
+        for i in range(size)
+    ]
+
+
+def _client_per_message(base_url, recipients):
+    for user_email, user_name, url in recipients:
+        message = Mail(
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to_emails=user_email,
+            subject='Mind Status への招待',
+            html_content=INVITE_TEMPLATE.substitute(user_name=user_name, action_url=url),
+        )
+        SendGridAPIClient('bench-key', host=base_url).send(message)
+    return len(recipients)
+
+
+def _pooled(transport, recipients, batch_size):
+    batches = [('INVITE', recipients[i:i + batch_size]) for i in range(0, len(recipients), batch_size)]
+    results = send_email_batches(batches, transport=transport)
+    assert all(result['sent'] for result in results)
+    return len(recipients)
+
+
+def _deliver_all():
+    delivered = 0
+    while True:
+        count = deliver_outbox()
+        if not count:
+            if not has_due_emails():
+                return delivered
+            time.sleep(0.01)
+        delivered += count
+
+
+def _end_to_end_cases(organization, admin, size):
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    def bulk_upload_delivered():
+        upload = SimpleUploadedFile('bench.csv', _bulk_upload_file(organization, size), content_type='text/csv')
+        _consume(client.post('/api/users/bulk_upload/', {'file': upload}, format='multipart'))
+        return _deliver_all()
+
+    def password_reset_delivered():
+        _consume(APIClient().post('/api/users/request_password_reset/', {'email': admin.email}, format='json'))
+        return _deliver_all()
+
+    return (
+        ('bulk_upload_delivered', size, bulk_upload_delivered),
+        ('password_reset_delivered', 1, password_reset_delivered),
+    )
+
+
+def run(sizes=DEFAULT_SIZES, repeat=5, **options):
+    if EmailOutbox.objects.filter(status__in=['PENDING', 'SENDING']).exists():
+        raise ValueError('送信待ちのメールがあるため email_send スイートは実行できません（run_email_worker で送信してください）')
+
+    server = SendGridStubServer(latency_ms=STUB_LATENCY_MS).start()
+    transport = SendGridTransport('bench-key', base_url=server.base_url, max_connections=settings.EMAIL_SEND_CONCURRENCY)
+    organization = Organization.objects.create(name='メール送信ベンチマーク', org_type='COMPANY')
+    admin = User.objects.create_user(
+        email=f'bench-mail-admin-{organization.id}@example.com',
+        full_name='ベンチマーク管理者',
+        password='Bench1234',
+        organization=organization,
+        role='ADMIN',
+        is_activated=True,
+    )
+
+    results = []
+    try:
+        with override_settings(SENDGRID_API_HOST=server.base_url, **BENCHMARK_SETTINGS):
+            for size in sizes:
+                recipients = _recipients(size)
+                cases = (
+                    ('client_per_message', size, lambda: _client_per_message(server.base_url, recipients)),
+                    ('pooled_per_message', size, lambda: _pooled(transport, recipients, 1)),
+                    ('pooled_batched', size, lambda: _pooled(transport, recipients, settings.EMAIL_OUTBOX_BATCH_SIZE)),
+                ) + _end_to_end_cases(organization, admin, size)
+                for name, messages, func in cases:
+                    if name == 'password_reset_delivered' and size != sizes[0]:
+                        continue
+                    if name == 'client_per_message':
+                        if size > CLIENT_MAX_ROWS:
+                            continue
+                        result = measure(func, repeat=min(repeat, CLIENT_MAX_REPEAT), warmup=0)
+                    else:
+                        result = measure(func, repeat=repeat)
+                    result.update({
+                        'suite': 'email_send',
+                        'case': name,
+                        'rows': messages,
+                        'concurrency': transport.max_connections,
+                        'stub_latency_ms': STUB_LATENCY_MS,
+                        'messages_per_second': round(messages / (result['latency_ms']['p50'] / 1000), 1),
+                    })
+                    results.append(result)
+    finally:
+        transport.close()
+        server.stop()
+        User.objects.filter(organization=organization).delete()
+        organization.delete()
+    return results
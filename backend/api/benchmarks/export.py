@@ -0,0 +1,73 @@
+"""
+Excel 出力の生成コスト比較
+
+- in_memory: 従来の実装（Workbook に ws.cell() で書き込み、BytesIO に保存して read() で複製）
+- write_only: write_xlsx（write-only モードで一時ファイルに保存）
+
+DB を使わず、メモリ上の行データで Excel の生成コストのみを計測する。
+"""
+
+import io
+import tempfile
+from datetime import datetime, timedelta
+
+from api.utils.export import DATETIME_FORMAT, export_headers, write_xlsx
+from . import measure
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+
+
+def _rows(size):
+    """期間指定モード相当の行を生成"""
+    base = datetime(2026, 4, 1, 8, 0, 0)
+    statuses = ['健康', '注意', '警告']
+    comments = ['-', '少し疲れ気味です', '寝不足です', '元気です！']
+    for i in range(size):
+        yield [
+            f'ユーザー{i % 5000:05d}',
+            (i % 6) + 1,
+            'ABCD'[i % 4] + '組',
+            statuses[i % 3],
+            comments[i % 4],
+            base + timedelta(minutes=i),
+        ]
+
+
+def _in_memory(size):
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Font, PatternFill
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'ステータス記録'
+    for col_num, header in enumerate(export_headers('SCHOOL'), 1):
+        cell = ws.cell(row=1, column=col_num, value=header)
+        cell.font = Font(bold=True, color='FFFFFF')
+        cell.fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
+        cell.alignment = Alignment(horizontal='center')
+    for row_num, row in enumerate(_rows(size), 2):
+        for col_num, value in enumerate(row, 1):
+            if isinstance(value, datetime):
+                value = value.strftime(DATETIME_FORMAT)
+            ws.cell(row=row_num, column=col_num, value=value)
+
+    output = io.BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return len(output.read())
+
+
+def _write_only(size):
+    with tempfile.TemporaryFile() as output:
+        write_xlsx(output, export_headers('SCHOOL'), _rows(size), 'ステータス記録', '4472C4')
+        return output.tell()
+
+
+def run(sizes=DEFAULT_SIZES, repeat=5, **options):
+    results = []
+    for size in sizes:
+        for name, func in (('in_memory', _in_memory), ('write_only', _write_only)):
+            result = measure(lambda: func(size), repeat=repeat)
+            result.update({'suite': 'export', 'case': name, 'rows': size})
+            results.append(result)
+    return results
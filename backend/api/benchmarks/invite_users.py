@@ -0,0 +1,47 @@
+"""
+一括登録で作成する招待ユーザーのパスワード処理コスト比較
+
+- hashed: 従来の実装（make_random_password で生成したパスワードを set_password でハッシュ化）
+- unusable: set_unusable_password（ハッシュ計算なし・招待フローで本パスワードを設定）
+
+DB を使わず、bulk_create 前の User インスタンス生成コストのみを計測する。
+hashed は1行あたり PBKDF2 1回分かかるため、HASHED_MAX_ROWS 以下の行数・
+HASHED_MAX_REPEAT 回までに抑える（1行あたりのコストは rows で割って比較する）。
+"""
+
+from api.models import User
+from api.utils.bulk_upload import FIXED_FIELDS
+from . import measure
+
+DEFAULT_SIZES = (10, 100, 1000, 5000)
+HASHED_MAX_ROWS = 10
+HASHED_MAX_REPEAT = 3
+
+
+def _build_users(size, hashed):
+    users = []
+    for i in range(size):
+        user = User(
+            email=f'bench-invite-{i}@example.com',
+            full_name=f'招待ユーザー{i}',
+            **FIXED_FIELDS,
+        )
+        if hashed:
+            user.set_password(User.objects.make_random_password(length=12))
+        else:
+            user.set_unusable_password()
+        users.append(user)
+    return len(users)
+
+
+def run(sizes=DEFAULT_SIZES, repeat=5, **options):
+    results = []
+    for size in sizes:
+        for name, hashed in (('hashed', True), ('unusable', False)):
+            if hashed and size > HASHED_MAX_ROWS:
+                continue
+            case_repeat = min(repeat, HASHED_MAX_REPEAT) if hashed else repeat
+            result = measure(lambda: _build_users(size, hashed), repeat=case_repeat, warmup=0 if hashed else 1)
+            result.update({'suite': 'invite_users', 'case': name, 'rows': size})
+            results.append(result)
+    return results
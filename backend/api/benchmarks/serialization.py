@@ -0,0 +1,65 @@
+"""
+StatusLog 一覧のシリアライズコスト比較
+
+- serializer: ORM と同様に行からモデルを生成し StatusLogSerializer(many=True) で変換
+- values: values() の dict から status_log_rows_to_representation で変換（一覧の高速パス）
+
+DB を使わず、メモリ上の行データで1ページあたりの変換コストのみを計測する。
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.utils import timezone
+
+from api.models import StatusLog, User
+from api.serializers import StatusLogSerializer, status_log_rows_to_representation
+from . import measure
+
+DEFAULT_SIZES = (50, 500, 5000)
+
+LOG_FIELDS = ['id', 'user_id', 'status', 'comment', 'created_at', 'local_date']
+USER_FIELDS = ['id', 'full_name']
+
+
+def _make_rows(size):
+    """ページ相当の行データ（DB から取得した状態を模したタプル）"""
+    now = timezone.now()
+    statuses = ['GREEN', 'YELLOW', 'RED']
+    rows = []
+    for i in range(size):
+        created_at = now - timedelta(minutes=i)
+        rows.append({
+            'id': uuid.uuid4(),
+            'user_id': uuid.uuid4(),
+            'user__full_name': f'ユーザー{i}',
+            'status': statuses[i % 3],
+            'comment': 'コメント' * (i % 5),
+            'created_at': created_at,
+            'local_date': timezone.localdate(created_at),
+        })
+    return rows
+
+
+def _serializer_path(rows):
+    logs = []
+    for row in rows:
+        log = StatusLog.from_db('default', LOG_FIELDS, [row[f] for f in LOG_FIELDS])
+        log.user = User.from_db('default', USER_FIELDS, [row['user_id'], row['user__full_name']])
+        logs.append(log)
+    return StatusLogSerializer(logs, many=True).data
+
+
+def _values_path(rows):
+    return status_log_rows_to_representation(rows)
+
+
+def run(sizes=DEFAULT_SIZES, repeat=10, **options):
+    results = []
+    for size in sizes:
+        rows = _make_rows(size)
+        for name, func in (('serializer', _serializer_path), ('values', _values_path)):
+            result = measure(lambda: func(rows), repeat=repeat)
+            result.update({'suite': 'serialization', 'case': name, 'rows': size})
+            results.append(result)
+    return results
@@ -0,0 +1,118 @@
+"""
+主要エンドポイントのレイテンシ計測
+
+generate_synthetic_tenant で作成した組織の管理者として APIClient からリクエストし、
+認証・権限チェック・シリアライズを含むビュー全体のコストを計測する。
+
+- レスポンスキャッシュは DummyCache に差し替えて無効化（毎回実際に集計させる）
+- bulk_upload は1回ごとにトランザクションをロールバックし、組織のデータを変化させない
+"""
+
+import csv
+import io
+import uuid
+from datetime import timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from api.models import Organization, User
+from api.utils.status import today_jst
+from . import measure
+
+DEFAULT_BULK_ROWS = 100
+
+BENCHMARK_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+    'SENDGRID_API_KEY': '',
+    'ALLOWED_HOSTS': ['*'],
+}
+
+
+def _consume(response):
+    """ストリーミングレスポンスも含めて本文を最後まで読み出す"""
+    if response.status_code >= 400:
+        raise RuntimeError(f'{response.status_code}: {getattr(response, "data", response.content)!r}')
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def _bulk_upload_file(organization, rows):
+    """bulk_upload 用の CSV（新規ユーザーのみ）"""
+    buffer = io.StringIO()
+    suffix = uuid.uuid4().hex[:8]
+    if organization.org_type == 'SCHOOL':
+        headers = ['student_number', 'full_name', 'full_name_kana', 'grade', 'class_name', 'gender', 'birth_date', 'email']
+        make_row = lambda i: [f'B{i:06d}', f'一括太郎{i}', 'イッカツタロウ', '1', 'A組', '男', '2010-04-15',
+                              f'bulk-{suffix}-{i}@example.com']
+    else:
+        headers = ['employee_number', 'full_name', 'full_name_kana', 'department', 'position', 'gender', 'birth_date', 'email']
+        make_row = lambda i: [f'B{i:06d}', f'一括太郎{i}', 'イッカツタロウ', '営業部', '一般', '男', '1990-04-15',
+                              f'bulk-{suffix}-{i}@example.com']
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for i in range(rows):
+        writer.writerow(make_row(i))
+    return buffer.getvalue().encode('utf-8-sig')
+
+
+def run(repeat=10, organization=None, bulk_rows=DEFAULT_BULK_ROWS, **options):
+    if not organization:
+        raise ValueError('views スイートには --organization（generate_synthetic_tenant で作成した組織ID）が必要です')
+
+    org = Organization.objects.get(id=organization)
+    admin = User.objects.filter(organization=org, role='ADMIN').order_by('created_at').first()
+    if admin is None:
+        raise ValueError(f'組織 {organization} に管理者がいません')
+    member_count = User.objects.filter(organization=org, role='USER').count()
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    today = today_jst()
+    month_ago = (today - timedelta(days=29)).isoformat()
+    csv_bytes = _bulk_upload_file(org, bulk_rows)
+
+    def bulk_upload():
+        upload = SimpleUploadedFile('bench.csv', csv_bytes, content_type='text/csv')
+        with transaction.atomic():
+            response = client.post('/api/users/bulk_upload/', {'file': upload}, format='multipart')
+            transaction.set_rollback(True)
+        return _consume(response)
+
+    cases = [
+        ('dashboard_summary', lambda: _consume(client.get('/api/status/dashboard_summary/'))),
+        ('alerts', lambda: _consume(client.get('/api/status/alerts/'))),
+        ('user_latest_status', lambda: _consume(client.get('/api/status/user_latest_status/'))),
+        ('trend_data_7', lambda: _consume(client.get('/api/status/trend_data/', {'days': 7}))),
+        ('trend_data_30', lambda: _consume(client.get('/api/status/trend_data/', {'days': 30}))),
+        ('dashboard_bundle', lambda: _consume(client.get('/api/status/dashboard_bundle/'))),
+        ('status_list', lambda: _consume(client.get('/api/status/'))),
+        ('status_list_cursor', lambda: _consume(client.get('/api/status/', {'pagination': 'cursor'}))),
+        ('user_list', lambda: _consume(client.get('/api/users/'))),
+        ('user_list_cursor', lambda: _consume(client.get('/api/users/', {'pagination': 'cursor'}))),
+        ('export_latest', lambda: _consume(client.get('/api/status/export_csv/'))),
+        ('export_period_30', lambda: _consume(client.get(
+            '/api/status/export_csv/', {'start_date': month_ago, 'end_date': today.isoformat()}))),
+        ('export_latest_csv', lambda: _consume(client.get('/api/status/export_csv/', {'format': 'csv'}))),
+        ('export_period_30_csv', lambda: _consume(client.get(
+            '/api/status/export_csv/', {'format': 'csv', 'start_date': month_ago, 'end_date': today.isoformat()}))),
+        ('bulk_upload', bulk_upload),
+    ]
+
+    results = []
+    with override_settings(**BENCHMARK_SETTINGS):
+        for name, func in cases:
+            result = measure(func, repeat=repeat)
+            result.update({
+                'suite': 'views',
+                'case': name,
+                'users': member_count,
+                'rows': bulk_rows if name == 'bulk_upload' else None,
+            })
+            results.append(result)
+    return results
@@ -0,0 +1,57 @@
+"""
+UserLatestStatus を StatusLog の履歴からバックフィルする
+
+使い方:
+    python manage.py backfill_latest_status
+    python manage.py backfill_latest_status --organization <組織ID> --batch-size 2000
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import StatusLog, UserLatestStatus
+from api.utils.status import latest_logs_from_history
+
+
+class Command(BaseCommand):
+    help = 'StatusLog の履歴から UserLatestStatus（ユーザーごとの最新ステータス）を再構築します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            help='対象組織ID（省略時は全組織）',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='1回の upsert で処理するユーザー数（デフォルト: 1000）',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        logs = StatusLog.objects.all()
+        if options['organization']:
+            logs = logs.filter(user__organization_id=options['organization'])
+
+        # DISTINCT ON (user_id) で各ユーザーの最新記録のみをストリーミング取得
+        latest_logs = latest_logs_from_history(logs).only(
+            'id', 'user_id', 'status', 'comment', 'created_at', 'local_date'
+        )
+
+        total = 0
+        batch = []
+        for log in latest_logs.iterator(chunk_size=batch_size):
+            batch.append(log)
+            if len(batch) >= batch_size:
+                total += self._flush(batch)
+                batch = []
+        total += self._flush(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ 最新ステータスを {total} 件バックフィルしました'))
+
+    def _flush(self, batch):
+        """バッチ単位で upsert（バッチごとにコミット）"""
+        with transaction.atomic():
+            return UserLatestStatus.upsert(batch)
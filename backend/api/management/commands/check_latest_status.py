@@ -0,0 +1,70 @@
+"""
+UserLatestStatus と StatusLog 履歴の整合性をチェックする
+
+使い方:
+    python manage.py check_latest_status          # 不整合の報告のみ
+    python manage.py check_latest_status --fix    # 不整合を修復
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import StatusLog, UserLatestStatus
+from api.utils.status import latest_logs_from_history
+
+
+class Command(BaseCommand):
+    help = 'UserLatestStatus が StatusLog の最新記録と一致しているか検証します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            help='対象組織ID（省略時は全組織）',
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='不整合があれば修復する',
+        )
+
+    def handle(self, *args, **options):
+        logs = StatusLog.objects.all()
+        rows = UserLatestStatus.objects.all()
+        if options['organization']:
+            logs = logs.filter(user__organization_id=options['organization'])
+            rows = rows.filter(user__organization_id=options['organization'])
+
+        # 期待値: 履歴から求めた各ユーザーの最新記録ID
+        expected = dict(
+            latest_logs_from_history(logs).values_list('user_id', 'id').iterator()
+        )
+        # 実際値: UserLatestStatus に保存されている最新記録ID
+        actual = dict(rows.values_list('user_id', 'status_log_id').iterator())
+
+        missing = [user_id for user_id in expected if user_id not in actual]
+        stale = [
+            user_id for user_id, log_id in expected.items()
+            if user_id in actual and actual[user_id] != log_id
+        ]
+        orphaned = [user_id for user_id in actual if user_id not in expected]
+
+        self.stdout.write(
+            f'ユーザー数: {len(expected)} / 欠損: {len(missing)} / '
+            f'不一致: {len(stale)} / 不要行: {len(orphaned)}'
+        )
+
+        if not (missing or stale or orphaned):
+            self.stdout.write(self.style.SUCCESS('✅ 最新ステータスは履歴と一致しています'))
+            return
+
+        if not options['fix']:
+            raise CommandError('❌ 最新ステータスに不整合があります（--fix で修復できます）')
+
+        with transaction.atomic():
+            repair_ids = [expected[user_id] for user_id in missing + stale]
+            UserLatestStatus.upsert(StatusLog.objects.filter(id__in=repair_ids))
+            UserLatestStatus.objects.filter(user_id__in=orphaned).delete()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {len(missing) + len(stale) + len(orphaned)} 件を修復しました')
+        )
@@ -0,0 +1,192 @@
+"""
+ベンチマーク用の合成テナント（組織・ユーザー・ステータス履歴）を生成する
+
+使い方:
+    python manage.py generate_synthetic_tenant --users 5000 --days 90
+    python manage.py generate_synthetic_tenant --users 50000 --days 365 --org-type COMPANY --seed 1
+
+生成後、UserLatestStatus のバックフィルと日次集計の再構築まで行う。
+"""
+
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import Organization, User, StatusLog, UserLatestStatus
+from api.utils.status import JST, latest_logs_from_history, rebuild_daily_aggregates, today_jst
+
+# ユーザーの傾向ごとのステータス出現比率（GREEN, YELLOW, RED）
+PROFILES = {
+    'stable': (0.85, 0.12, 0.03),
+    'fluctuating': (0.55, 0.33, 0.12),
+    'at_risk': (0.25, 0.40, 0.35),
+}
+# 傾向の構成比（stable 75% / fluctuating 20% / at_risk 5%）
+PROFILE_WEIGHTS = (('stable', 0.75), ('fluctuating', 0.20), ('at_risk', 0.05))
+
+STATUSES = ('GREEN', 'YELLOW', 'RED')
+COMMENTS = ('', '', '', '少し疲れ気味です', '寝不足です', '体調不良のため早退します', '元気です！')
+DEPARTMENTS = ('営業部', '人事部', '開発部', '総務部', '経理部', 'マーケティング部')
+CLASS_NAMES = ('A組', 'B組', 'C組', 'D組')
+
+
+@contextmanager
+def _explicit_created_at():
+    """bulk_create で created_at（auto_now_add）を指定値のまま保存する"""
+    field = StatusLog._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'ベンチマーク用に、指定人数・日数のステータス履歴を持つ組織を生成します'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='一般ユーザー数（デフォルト: 100）')
+        parser.add_argument('--days', type=int, default=30, help='履歴の日数 1〜365（デフォルト: 30）')
+        parser.add_argument(
+            '--org-type',
+            choices=['SCHOOL', 'COMPANY'],
+            default='SCHOOL',
+            help='組織種別（デフォルト: SCHOOL）',
+        )
+        parser.add_argument(
+            '--participation',
+            type=float,
+            default=0.8,
+            help='1日に記録するユーザーの割合（デフォルト: 0.8）',
+        )
+        parser.add_argument(
+            '--repeat-rate',
+            type=float,
+            default=0.1,
+            help='同じ日に2回目を記録する割合（デフォルト: 0.1）',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='乱数シード（デフォルト: 42）')
+        parser.add_argument('--batch-size', type=int, default=5000, help='bulk_create の件数（デフォルト: 5000）')
+
+    def handle(self, *args, **options):
+        if not 1 <= options['days'] <= 365:
+            raise CommandError('--days は 1〜365 で指定してください')
+        if options['users'] < 1:
+            raise CommandError('--users は1以上で指定してください')
+
+        rng = random.Random(options['seed'])
+        org_type = options['org_type']
+        batch_size = options['batch_size']
+
+        organization = Organization.objects.create(
+            name=f'合成テナント {options["users"]}人/{options["days"]}日',
+            org_type=org_type,
+        )
+        admin_email = f'bench-admin-{organization.id}@example.com'
+        User.objects.create_user(
+            email=admin_email,
+            full_name='ベンチマーク管理者',
+            password='Bench1234',
+            organization=organization,
+            role='ADMIN',
+            is_activated=True,
+        )
+
+        user_ids = self._create_users(rng, organization, options['users'], batch_size)
+        self.stdout.write(f'  ユーザー {len(user_ids)} 人を作成しました')
+
+        log_count = self._create_logs(rng, user_ids, options, batch_size)
+        self.stdout.write(f'  ステータス記録 {log_count} 件を作成しました')
+
+        # 非正規化テーブルを履歴から作成
+        with transaction.atomic():
+            UserLatestStatus.upsert(
+                latest_logs_from_history(StatusLog.objects.filter(user__organization=organization))
+            )
+        end_date = today_jst()
+        rebuild_daily_aggregates(
+            end_date - timedelta(days=options['days'] - 1), end_date, organization_id=organization.id
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ 組織 {organization.id} を生成しました（管理者: {admin_email} / Bench1234）'
+        ))
+
+    def _create_users(self, rng, organization, count, batch_size):
+        # 招待前のユーザーと同じく使用不可パスワード（ハッシュ計算なし）
+        unusable_password = make_password(None)
+        user_ids = []
+        batch = []
+        for i in range(count):
+            user_id = uuid.uuid4()
+            user = User(
+                id=user_id,
+                email=f'bench-{organization.id.hex[:8]}-{i}@example.com',
+                full_name=f'合成ユーザー{i:06d}',
+                password=unusable_password,
+                organization=organization,
+                role='USER',
+                is_activated=True,
+            )
+            if organization.org_type == 'SCHOOL':
+                user.student_number = f'S{i:06d}'
+                user.grade = rng.randint(1, 6)
+                user.class_name = rng.choice(CLASS_NAMES)
+            else:
+                user.employee_number = f'E{i:06d}'
+                user.department = rng.choice(DEPARTMENTS)
+            batch.append(user)
+            user_ids.append(user_id)
+            if len(batch) >= batch_size:
+                User.objects.bulk_create(batch)
+                batch = []
+        User.objects.bulk_create(batch)
+        return user_ids
+
+    def _create_logs(self, rng, user_ids, options, batch_size):
+        profiles = {
+            user_id: rng.choices(
+                [name for name, _ in PROFILE_WEIGHTS],
+                weights=[weight for _, weight in PROFILE_WEIGHTS],
+            )[0]
+            for user_id in user_ids
+        }
+        today = today_jst()
+        now = timezone.now()
+
+        total = 0
+        batch = []
+        with _explicit_created_at():
+            for offset in range(options['days'] - 1, -1, -1):
+                day = today - timedelta(days=offset)
+                for user_id in user_ids:
+                    if rng.random() >= options['participation']:
+                        continue
+                    entries = 2 if rng.random() < options['repeat_rate'] else 1
+                    for _ in range(entries):
+                        # 7:00〜22:00（日本時間）の間で記録
+                        minutes = rng.randint(7 * 60, 22 * 60 - 1)
+                        created_at = JST.localize(
+                            datetime.combine(day, time(minutes // 60, minutes % 60, rng.randint(0, 59)))
+                        )
+                        if created_at > now:
+                            continue
+                        batch.append(StatusLog(
+                            user_id=user_id,
+                            status=rng.choices(STATUSES, weights=PROFILES[profiles[user_id]])[0],
+                            comment=rng.choice(COMMENTS),
+                            created_at=created_at,
+                        ))
+                    if len(batch) >= batch_size:
+                        StatusLog.objects.bulk_create(batch)
+                        total += len(batch)
+                        batch = []
+            StatusLog.objects.bulk_create(batch)
+            total += len(batch)
+        return total
@@ -0,0 +1,68 @@
+"""
+DailyStatusAggregate（日次ステータス集計）を StatusLog の履歴から再構築する
+
+使い方:
+    python manage.py rebuild_daily_aggregates                      # 直近30日
+    python manage.py rebuild_daily_aggregates --start-date 2025-04-01 --end-date 2026-03-31
+    python manage.py rebuild_daily_aggregates --days 365 --organization <組織ID>
+"""
+
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.status import rebuild_daily_aggregates, today_jst
+
+
+class Command(BaseCommand):
+    help = '指定期間の日次ステータス集計を StatusLog の履歴から作り直します'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help='開始日（YYYY-MM-DD）')
+        parser.add_argument('--end-date', help='終了日（YYYY-MM-DD・省略時は今日）')
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='--start-date 省略時に遡る日数（デフォルト: 30）',
+        )
+        parser.add_argument('--organization', help='対象組織ID（省略時は全組織）')
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=31,
+            help='1回の再構築で処理する日数（デフォルト: 31）',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            end_date = self._parse_date(options['end_date']) or today_jst()
+            start_date = (
+                self._parse_date(options['start_date'])
+                or end_date - timedelta(days=options['days'] - 1)
+            )
+        except ValueError:
+            raise CommandError('日付形式が正しくありません（YYYY-MM-DD）')
+
+        if start_date > end_date:
+            raise CommandError('開始日は終了日以前を指定してください')
+
+        # 長期間は chunk-days ごとに分割して再構築（1トランザクションを小さく保つ）
+        total = 0
+        chunk_start = start_date
+        while chunk_start <= end_date:
+            chunk_end = min(chunk_start + timedelta(days=options['chunk_days'] - 1), end_date)
+            total += rebuild_daily_aggregates(
+                chunk_start, chunk_end, organization_id=options['organization']
+            )
+            self.stdout.write(f'  {chunk_start} 〜 {chunk_end} を再構築しました')
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {start_date} 〜 {end_date} の集計 {total} 行を作成しました')
+        )
+
+    def _parse_date(self, value):
+        if not value:
+            return None
+        return datetime.strptime(value, '%Y-%m-%d').date()
@@ -0,0 +1,96 @@
+"""
+性能ベンチマークを実行し、結果を JSON で出力する
+
+使い方:
+    python manage.py run_benchmarks --suite serialization
+    python manage.py run_benchmarks --suite serialization --repeat 20 --output bench.json
+    python manage.py run_benchmarks --suite invite_users
+    python manage.py run_benchmarks --suite email_send
+    python manage.py run_benchmarks --suite views --organization <組織ID> --bulk-rows 500
+
+views スイートの組織は generate_synthetic_tenant で作成する。
+"""
+
+import importlib
+import json
+import platform
+import subprocess
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+SUITES = {
+    'auth': 'api.benchmarks.auth',
+    'bulk_validation': 'api.benchmarks.bulk_validation',
+    'email_send': 'api.benchmarks.email_send',
+    'export': 'api.benchmarks.export',
+    'invite_users': 'api.benchmarks.invite_users',
+    'serialization': 'api.benchmarks.serialization',
+    'views': 'api.benchmarks.views',
+}
+
+
+class Command(BaseCommand):
+    help = '性能ベンチマークを実行し、レイテンシ・クエリ数・ピークメモリを JSON で出力します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--suite',
+            action='append',
+            choices=sorted(SUITES),
+            help='実行するスイート（複数指定可・省略時は全スイート）',
+        )
+        parser.add_argument('--repeat', type=int, default=10, help='各ケースの計測回数（デフォルト: 10）')
+        parser.add_argument('--organization', help='views スイートで計測する組織ID')
+        parser.add_argument(
+            '--bulk-rows',
+            type=int,
+            default=100,
+            help='views スイートの bulk_upload で送る行数（デフォルト: 100）',
+        )
+        parser.add_argument('--output', help='結果の出力先ファイル（省略時は標準出力）')
+
+    def handle(self, *args, **options):
+        suites = options['suite'] or sorted(SUITES)
+        if 'views' in suites and not options['organization']:
+            raise CommandError('views スイートには --organization を指定してください（generate_synthetic_tenant で作成）')
+
+        results = []
+        for suite in suites:
+            module = importlib.import_module(SUITES[suite])
+            self.stderr.write(f'▶ {suite} を実行中...')
+            results.extend(module.run(
+                repeat=options['repeat'],
+                organization=options['organization'],
+                bulk_rows=options['bulk_rows'],
+            ))
+
+        report = {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'commit': self._git_commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'suites': suites,
+            },
+            'results': results,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+            self.stderr.write(self.style.SUCCESS(f'✅ 結果を {options["output"]} に出力しました'))
+        else:
+            self.stdout.write(output)
+
+    def _git_commit(self):
+        """比較用に現在のコミットを記録（取得できなければ None）"""
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,69 @@
+"""
+送信待ちのメール（EmailOutbox）を送信するワーカー
+
+使い方:
+    python manage.py run_email_worker            # 常駐してキューを処理
+    python manage.py run_email_worker --once     # キューが空になったら（または1日の送信上限に達したら）終了
+
+送信件数は EMAIL_RATE_LIMIT_*（全ワーカーで共有するトークンバケット）で制限され、429・5xx を受けると自動的に下がる。
+
+一括登録などの長いジョブ（run_worker）にパスワードリセットのメールが待たされないよう、別プロセスで起動する。
+複数プロセスで起動しても、メールは SKIP LOCKED で1つのワーカーにのみ割り当てられる。
+"""
+
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.utils.email_rate_limit import daily_limit_reached
+from api.utils.outbox import delete_sent_emails, deliver_outbox, has_due_emails
+
+
+class Command(BaseCommand):
+    help = '送信待ちのメール（EmailOutbox）をまとめて送信します'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='キューが空になったら（または1日の送信上限に達したら）終了')
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.WORKER_POLL_INTERVAL,
+            help=f'キューが空のときの待機秒数（デフォルト: {settings.WORKER_POLL_INTERVAL}）',
+        )
+
+    def handle(self, *args, **options):
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.stdout.write('▶ メール送信ワーカーを起動しました')
+        last_cleanup = None
+        while not self._stopping:
+            # 保存期間を過ぎた送信済みメールの削除（1時間ごと）
+            now = timezone.now()
+            if last_cleanup is None or (now - last_cleanup).total_seconds() >= 3600:
+                deleted = delete_sent_emails()
+                if deleted:
+                    self.stdout.write(f'  送信済みメールを {deleted} 件削除しました')
+                last_cleanup = now
+
+            if deliver_outbox():
+                continue
+            # レート制限で送れなかった場合は待ってから再度送信する
+            if options['once']:
+                if not has_due_emails():
+                    break
+                # 1日の上限は翌日まで解除されないため、待たずに終了する（残りは翌日以降に送信）
+                if daily_limit_reached():
+                    self.stdout.write(self.style.WARNING('  1日の送信上限（EMAIL_DAILY_LIMIT）に達したため終了します'))
+                    break
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS('✅ メール送信ワーカーを終了しました'))
+
+    def _stop(self, signum, frame):
+        """送信中のメールを処理してから終了する"""
+        self._stopping = True
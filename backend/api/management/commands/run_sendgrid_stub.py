@@ -0,0 +1,70 @@
+"""
+SendGrid v3 API 互換のローカルサーバーを起動する（負荷試験用・メールは送信しない）
+
+使い方:
+    python manage.py run_sendgrid_stub --port 8025 --latency-ms 80 --jitter-ms 40
+    python manage.py run_sendgrid_stub --error-rate 0.02 --rate-limit-rate 0.05
+
+送信側（backend・email_worker）の .env:
+    SENDGRID_API_KEY=stub
+    SENDGRID_API_HOST=http://localhost:8025
+"""
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.sendgrid_stub import SendGridStubServer
+
+
+class Command(BaseCommand):
+    help = 'SendGrid v3 API（/v3/mail/send）互換のローカルサーバーを起動します'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='待ち受けるアドレス（デフォルト: 127.0.0.1）')
+        parser.add_argument('--port', type=int, default=8025, help='待ち受けるポート（デフォルト: 8025）')
+        parser.add_argument('--latency-ms', type=float, default=50, help='応答までの遅延（デフォルト: 50）')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='遅延のばらつき ±ミリ秒（デフォルト: 0）')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='5xx を返す割合 0〜1（デフォルト: 0）')
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='429 を返す割合 0〜1（デフォルト: 0）')
+        parser.add_argument('--seed', type=int, help='失敗させる順序の乱数シード')
+        parser.add_argument('--verbose-requests', action='store_true', help='リクエストごとにログを出力')
+
+    def handle(self, *args, **options):
+        for name in ('error_rate', 'rate_limit_rate'):
+            if not 0 <= options[name] <= 1:
+                raise CommandError(f'--{name.replace("_", "-")} は 0〜1 で指定してください')
+        if options['error_rate'] + options['rate_limit_rate'] > 1:
+            raise CommandError('--error-rate と --rate-limit-rate の合計は 1 以下にしてください')
+
+        server = SendGridStubServer(
+            (options['host'], options['port']),
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            error_rate=options['error_rate'],
+            rate_limit_rate=options['rate_limit_rate'],
+            seed=options['seed'],
+            verbose=options['verbose_requests'],
+        ).start()
+
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.stdout.write(f'▶ SendGrid スタブを起動しました: {server.base_url}')
+        last = server.stats()
+        elapsed = 0
+        while not self._stopping:
+            time.sleep(1)
+            elapsed += 1
+            # 10秒ごとに件数が変わっていれば表示
+            if elapsed % 10 == 0 and server.stats() != last:
+                last = server.stats()
+                self.stdout.write(f'  {last}')
+
+        server.stop()
+        self.stdout.write(self.style.SUCCESS(f'✅ SendGrid スタブを終了しました: {server.stats()}'))
+
+    def _stop(self, signum, frame):
+        self._stopping = True
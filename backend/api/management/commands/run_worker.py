@@ -0,0 +1,64 @@
+"""
+バックグラウンドジョブ（一括登録・出力）を処理するワーカー
+
+使い方:
+    python manage.py run_worker            # 常駐してキューを処理
+    python manage.py run_worker --once     # キューが空になったら終了
+
+複数プロセスで起動しても、ジョブは SKIP LOCKED で1つのワーカーにのみ割り当てられる。
+"""
+
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.utils.bulk_upload import delete_finished_upload_files
+from api.utils.export import delete_expired_exports
+from api.utils.jobs import run_next_job
+
+
+class Command(BaseCommand):
+    help = 'DB キューのバックグラウンドジョブを処理します'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='キューが空になったら終了')
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.WORKER_POLL_INTERVAL,
+            help=f'キューが空のときの待機秒数（デフォルト: {settings.WORKER_POLL_INTERVAL}）',
+        )
+
+    def handle(self, *args, **options):
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.stdout.write('▶ ワーカーを起動しました')
+        last_cleanup = None
+        while not self._stopping:
+            # 不要になったファイルの削除（1時間ごと）
+            now = timezone.now()
+            if last_cleanup is None or (now - last_cleanup).total_seconds() >= 3600:
+                deleted = delete_expired_exports()
+                if deleted:
+                    self.stdout.write(f'  期限切れの出力ファイルを {deleted} 件削除しました')
+                deleted = delete_finished_upload_files()
+                if deleted:
+                    self.stdout.write(f'  処理済みのアップロードファイルを {deleted} 件削除しました')
+                last_cleanup = now
+
+            if run_next_job():
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS('✅ ワーカーを終了しました'))
+
+    def _stop(self, signum, frame):
+        """実行中のジョブを終えてから終了する"""
+        self._stopping = True
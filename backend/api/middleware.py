@@ -0,0 +1,105 @@
+"""
+Middleware for Mind Status API.
+"""
+
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('api.performance')
+
+
+class _QueryMetrics:
+    """connection.execute_wrapper に渡して SQL の件数・時間・最も遅い文を記録する"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms >= self.slowest_ms:
+                self.slowest_ms = elapsed_ms
+                self.slowest_sql = sql
+
+
+class QueryInstrumentationMiddleware:
+    """
+    リクエストごとの SQL クエリ数・合計時間・最も遅い文を計測するミドルウェア
+
+    - レスポンスヘッダー Server-Timing に db / app の時間を出力
+    - ロガー api.performance に JSON 形式で1行出力
+    - settings.QUERY_BUDGETS（URL名ごと）/ QUERY_BUDGET_DEFAULT を超えたら警告ログ
+
+    settings.QUERY_INSTRUMENTATION_ENABLED = True の場合のみ有効。
+    StreamingHttpResponse の本文生成中に実行されるクエリは計測対象外。
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = _QueryMetrics()
+        start = time.perf_counter()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+
+        total_ms = (time.perf_counter() - start) * 1000
+        endpoint = self._endpoint_name(request)
+
+        response['Server-Timing'] = (
+            f'db;dur={metrics.total_ms:.1f};desc="{metrics.count} queries", '
+            f'app;dur={total_ms - metrics.total_ms:.1f}, '
+            f'total;dur={total_ms:.1f}'
+        )
+
+        record = {
+            'endpoint': endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 1),
+            'query_count': metrics.count,
+            'query_ms': round(metrics.total_ms, 1),
+            'slowest_query_ms': round(metrics.slowest_ms, 1),
+            'slowest_query': (metrics.slowest_sql or '')[:500],
+        }
+        logger.info('request_metrics %s', json.dumps(record, ensure_ascii=False))
+
+        budget = self._query_budget(endpoint)
+        if budget is not None and metrics.count > budget:
+            logger.warning(
+                'query_budget_exceeded %s',
+                json.dumps({**record, 'query_budget': budget}, ensure_ascii=False),
+            )
+
+        return response
+
+    def _endpoint_name(self, request):
+        """URL名（例: status-trend-data）。解決できなければパス"""
+        match = getattr(request, 'resolver_match', None)
+        if match and match.url_name:
+            return match.url_name
+        return request.path
+
+    def _query_budget(self, endpoint):
+        budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        return budgets.get(endpoint, getattr(settings, 'QUERY_BUDGET_DEFAULT', None))
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-16 22:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_alter_invitetoken_options_invitetoken_token_type_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserLatestStatus',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='latest_status', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='ユーザー')),
+                ('status', models.CharField(choices=[('GREEN', '健康'), ('YELLOW', '注意'), ('RED', '警告')], max_length=10, verbose_name='ステータス')),
+                ('comment', models.TextField(blank=True, verbose_name='コメント')),
+                ('created_at', models.DateTimeField(verbose_name='記録日時')),
+                ('local_date', models.DateField(verbose_name='記録日（日本時間）')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新日時')),
+                ('status_log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.statuslog', verbose_name='最新ステータス記録')),
+            ],
+            options={
+                'verbose_name': '最新ステータス',
+                'verbose_name_plural': '最新ステータス',
+                'db_table': 'user_latest_status',
+                'indexes': [models.Index(fields=['local_date', 'status'], name='user_latest_local_d_6c4a3d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-16 22:53
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_userlateststatus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStatusAggregate',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('date', models.DateField(verbose_name='集計日（日本時間）')),
+                ('status', models.CharField(choices=[('GREEN', '健康'), ('YELLOW', '注意'), ('RED', '警告')], max_length=10, verbose_name='ステータス')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='人数')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新日時')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_status_aggregates', to='api.organization', verbose_name='組織')),
+            ],
+            options={
+                'verbose_name': '日次ステータス集計',
+                'verbose_name_plural': '日次ステータス集計',
+                'db_table': 'daily_status_aggregates',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailystatusaggregate',
+            constraint=models.UniqueConstraint(fields=('organization', 'date', 'status'), name='uniq_daily_status_aggregate'),
+        ),
+    ]
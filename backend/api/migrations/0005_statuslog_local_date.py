@@ -0,0 +1,100 @@
+# Generated by Django 5.0.1 on 2026-10-16 22:58
+
+import api.models
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models, transaction
+from django.db.models.functions import TruncDate
+
+# 1トランザクションで更新する行数（大きなテーブルでロックを長時間保持しないように）
+BACKFILL_BATCH_SIZE = 5000
+
+
+def backfill_local_date(apps, schema_editor):
+    """
+    既存の StatusLog に local_date（日本時間の記録日）を設定
+
+    主キー順にバッチで UPDATE し、バッチごとにコミットする。
+    """
+    StatusLog = apps.get_model('api', 'StatusLog')
+
+    last_pk = None
+    while True:
+        batch = StatusLog.objects.order_by('pk')
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        pks = list(batch.values_list('pk', flat=True)[:BACKFILL_BATCH_SIZE])
+        if not pks:
+            break
+
+        with transaction.atomic():
+            StatusLog.objects.filter(pk__in=pks, local_date__isnull=True).update(
+                local_date=TruncDate('created_at')  # settings.TIME_ZONE（Asia/Tokyo）で日付化
+            )
+        last_pk = pks[-1]
+
+
+def set_local_date_not_null(apps, schema_editor):
+    """
+    バックフィル中に旧コードが追加した行（local_date が NULL）を埋めてから NOT NULL にする
+
+    書き込みをロックした同じトランザクションで最後のバックフィルと NOT NULL 化を行うため、
+    その間に NULL の行が追加されて ALTER が失敗することはない（残りの行だけなので短時間で終わる）。
+    """
+    StatusLog = apps.get_model('api', 'StatusLog')
+    table = schema_editor.quote_name(StatusLog._meta.db_table)
+    column = schema_editor.quote_name('local_date')
+    # SeparateDatabaseAndState 内の操作はマイグレーションが atomic で包まないため、ここでトランザクションを張る
+    with transaction.atomic():
+        schema_editor.execute(f'LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE')
+        StatusLog.objects.filter(local_date__isnull=True).update(local_date=TruncDate('created_at'))
+        schema_editor.execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL')
+
+
+def drop_local_date_not_null(apps, schema_editor):
+    StatusLog = apps.get_model('api', 'StatusLog')
+    table = schema_editor.quote_name(StatusLog._meta.db_table)
+    column = schema_editor.quote_name('local_date')
+    schema_editor.execute(f'ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL')
+
+
+class Migration(migrations.Migration):
+
+    # バッチごとのコミットと CREATE INDEX CONCURRENTLY のため非アトミック
+    atomic = False
+
+    dependencies = [
+        ('api', '0004_dailystatusaggregate_and_more'),
+    ]
+
+    operations = [
+        # 1. NULL 許可で列を追加（既存行の書き換えなし）
+        migrations.AddField(
+            model_name='statuslog',
+            name='local_date',
+            field=api.models.LocalDateField(editable=False, null=True, verbose_name='記録日（日本時間）'),
+        ),
+        # 2. 既存行をバッチでバックフィル
+        migrations.RunPython(backfill_local_date, migrations.RunPython.noop),
+        # 3. 残りの行をバックフィルして NOT NULL 化（書き込みをロックした1トランザクション）
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(set_local_date_not_null, drop_local_date_not_null),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='statuslog',
+                    name='local_date',
+                    field=api.models.LocalDateField(editable=False, verbose_name='記録日（日本時間）'),
+                ),
+            ],
+        ),
+        # 4. 書き込みを止めずにインデックス作成
+        AddIndexConcurrently(
+            model_name='statuslog',
+            index=models.Index(fields=['user', 'local_date'], name='status_logs_user_id_f0a375_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='statuslog',
+            index=models.Index(fields=['local_date', 'status'], name='status_logs_local_d_37f108_idx'),
+        ),
+    ]
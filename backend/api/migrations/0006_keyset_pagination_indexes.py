@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-16 22:59
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY のため非アトミック
+    atomic = False
+
+    dependencies = [
+        ('api', '0005_statuslog_local_date'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='statuslog',
+            index=models.Index(fields=['created_at', 'id'], name='status_logs_created_d82eed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(fields=['organization', 'created_at', 'id'], name='users_organiz_980fb2_idx'),
+        ),
+    ]
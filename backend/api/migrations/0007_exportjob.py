@@ -0,0 +1,45 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:10
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('PENDING', '待機中'), ('RUNNING', '実行中'), ('SUCCEEDED', '完了'), ('FAILED', '失敗')], default='PENDING', max_length=10, verbose_name='状態')),
+                ('error', models.TextField(blank=True, default='', verbose_name='エラー内容')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='実行回数')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='作成日時')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='開始日時')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='最終更新日時')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='終了日時')),
+                ('format', models.CharField(choices=[('xlsx', 'Excel'), ('csv', 'CSV')], default='xlsx', max_length=10, verbose_name='出力形式')),
+                ('params', models.JSONField(default=dict, verbose_name='出力条件')),
+                ('total_rows', models.PositiveIntegerField(blank=True, null=True, verbose_name='対象件数')),
+                ('rows_processed', models.PositiveIntegerField(default=0, verbose_name='処理済み件数')),
+                ('file_name', models.CharField(blank=True, default='', max_length=255, verbose_name='ダウンロード時のファイル名')),
+                ('file_path', models.CharField(blank=True, default='', max_length=500, verbose_name='保存先')),
+                ('file_size', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='ファイルサイズ')),
+                ('expires_at', models.DateTimeField(blank=True, null=True, verbose_name='ダウンロード期限')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to='api.organization', verbose_name='組織')),
+                ('requested_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='依頼者')),
+            ],
+            options={
+                'verbose_name': '出力ジョブ',
+                'verbose_name_plural': '出力ジョブ',
+                'db_table': 'export_jobs',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='export_jobs_status_7c943b_idx'), models.Index(fields=['organization', '-created_at'], name='export_jobs_organiz_be0f2e_idx')],
+            },
+        ),
+    ]
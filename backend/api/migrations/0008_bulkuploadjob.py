@@ -0,0 +1,45 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:15
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkUploadJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('PENDING', '待機中'), ('RUNNING', '実行中'), ('SUCCEEDED', '完了'), ('FAILED', '失敗')], default='PENDING', max_length=10, verbose_name='状態')),
+                ('error', models.TextField(blank=True, default='', verbose_name='エラー内容')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='実行回数')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='作成日時')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='開始日時')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='最終更新日時')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='終了日時')),
+                ('file_name', models.CharField(max_length=255, verbose_name='ファイル名')),
+                ('file_path', models.CharField(blank=True, default='', max_length=500, verbose_name='保存先')),
+                ('chunk_size', models.PositiveIntegerField(default=500, verbose_name='チャンクサイズ')),
+                ('total_rows', models.PositiveIntegerField(blank=True, null=True, verbose_name='全行数')),
+                ('rows_processed', models.PositiveIntegerField(default=0, verbose_name='処理済み行数')),
+                ('success_count', models.PositiveIntegerField(default=0, verbose_name='成功件数')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='失敗件数')),
+                ('errors', models.JSONField(default=list, verbose_name='エラー詳細')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bulk_upload_jobs', to='api.organization', verbose_name='組織')),
+                ('requested_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bulk_upload_jobs', to=settings.AUTH_USER_MODEL, verbose_name='依頼者')),
+            ],
+            options={
+                'verbose_name': '一括登録ジョブ',
+                'verbose_name_plural': '一括登録ジョブ',
+                'db_table': 'bulk_upload_jobs',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='bulk_upload_status_c03a60_idx'), models.Index(fields=['organization', '-created_at'], name='bulk_upload_organiz_9a3d63_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:33
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_bulkuploadjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('INVITE', '招待'), ('RESET', 'パスワードリセット')], max_length=10, verbose_name='種別')),
+                ('to_email', models.EmailField(max_length=254, verbose_name='宛先')),
+                ('to_name', models.CharField(max_length=100, verbose_name='宛名')),
+                ('action_url', models.CharField(max_length=500, verbose_name='リンクURL')),
+                ('status', models.CharField(choices=[('PENDING', '送信待ち'), ('SENDING', '送信中'), ('SENT', '送信済み'), ('FAILED', '送信失敗')], default='PENDING', max_length=10, verbose_name='状態')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='送信回数')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='次回送信日時')),
+                ('claimed_at', models.DateTimeField(blank=True, null=True, verbose_name='送信開始日時')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='送信日時')),
+                ('provider_status', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='送信APIのステータス')),
+                ('provider_message_id', models.CharField(blank=True, default='', max_length=100, verbose_name='送信APIのメッセージID')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='エラー内容')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='作成日時')),
+                ('organization', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbox_emails', to='api.organization', verbose_name='組織')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox_emails', to=settings.AUTH_USER_MODEL, verbose_name='宛先ユーザー')),
+            ],
+            options={
+                'verbose_name': '送信待ちメール',
+                'verbose_name_plural': '送信待ちメール',
+                'db_table': 'email_outbox',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='email_outbo_status_c5a6aa_idx')],
+            },
+        ),
+    ]
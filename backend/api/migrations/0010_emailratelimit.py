@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailRateLimit',
+            fields=[
+                ('key', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='キー')),
+                ('rate', models.FloatField(verbose_name='送信レート（通/秒）')),
+                ('tokens', models.FloatField(verbose_name='残りトークン')),
+                ('updated_at', models.DateTimeField(verbose_name='トークン更新日時')),
+                ('paused_until', models.DateTimeField(blank=True, null=True, verbose_name='送信停止期限')),
+                ('day', models.DateField(blank=True, null=True, verbose_name='集計日')),
+                ('day_count', models.PositiveIntegerField(default=0, verbose_name='当日の送信数')),
+            ],
+            options={
+                'verbose_name': 'メール送信レート',
+                'verbose_name_plural': 'メール送信レート',
+                'db_table': 'email_rate_limits',
+            },
+        ),
+    ]
@@ -120,6 +120,9 @@ class User(AbstractUser):
         db_table = 'users'
         verbose_name = 'ユーザー'
         verbose_name_plural = 'ユーザー'
+        indexes = [
+            models.Index(fields=['organization', 'created_at', 'id']),  # キーセットページネーション用
+        ]
     
     def __str__(self):
         return f"{self.full_name} ({self.email})"
@@ -187,6 +190,26 @@ class InviteToken(models.Model):
         return True
 
 
+class LocalDateField(models.DateField):
+    """
+    created_at の日本時間（settings.TIME_ZONE）での日付を保存時に自動設定する DateField
+    
+    created_at（auto_now_add）の pre_save 後に評価されるため、
+    created_at より後に定義すること。bulk_create でも設定される。
+    
+    組織ごとのタイムゾーンは持たず、全組織が settings.TIME_ZONE（Asia/Tokyo・today_jst と同じ）を
+    使う前提。組織ごとのタイムゾーンを導入する場合は、設定を変えたときに local_date と
+    DailyStatusAggregate の再計算が必要になる。
+    """
+    
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.attname)
+        if value is None and model_instance.created_at is not None:
+            value = timezone.localdate(model_instance.created_at)
+            setattr(model_instance, self.attname, value)
+        return value
+
+
 class StatusLog(models.Model):
     """ステータス記録モデル"""
     
@@ -206,6 +229,8 @@ class StatusLog(models.Model):
     status = models.CharField('ステータス', max_length=10, choices=STATUS_CHOICES)
     comment = models.TextField('コメント', blank=True)
     created_at = models.DateTimeField('記録日時', auto_now_add=True)
+    # 日付での絞り込み用（created_at__date は関数適用になりインデックスが効かないため）
+    local_date = LocalDateField('記録日（日本時間）', editable=False)
     
     class Meta:
         db_table = 'status_logs'
@@ -215,7 +240,505 @@ class StatusLog(models.Model):
         indexes = [
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['user', 'local_date']),
+            models.Index(fields=['local_date', 'status']),
+            models.Index(fields=['created_at', 'id']),  # キーセットページネーション用
         ]
     
     def __str__(self):
         return f"{self.user.full_name} - {self.status} ({self.created_at.date()})"
+
+
+class UserLatestStatus(models.Model):
+    """
+    ユーザーごとの最新ステータス（StatusLog の非正規化テーブル）
+    
+    1ユーザー1行。StatusLog の記録時に同一トランザクションで upsert され、
+    最新ステータスの参照を履歴全体のスキャンではなく主キー参照にする。
+    """
+    
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='latest_status',
+        verbose_name='ユーザー'
+    )
+    status_log = models.ForeignKey(
+        StatusLog,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='最新ステータス記録'
+    )
+    status = models.CharField('ステータス', max_length=10, choices=StatusLog.STATUS_CHOICES)
+    comment = models.TextField('コメント', blank=True)
+    created_at = models.DateTimeField('記録日時')
+    local_date = models.DateField('記録日（日本時間）')
+    updated_at = models.DateTimeField('更新日時', auto_now=True)
+    
+    UPSERT_FIELDS = ['status_log', 'status', 'comment', 'created_at', 'local_date', 'updated_at']
+    
+    class Meta:
+        db_table = 'user_latest_status'
+        verbose_name = '最新ステータス'
+        verbose_name_plural = '最新ステータス'
+        indexes = [
+            models.Index(fields=['local_date', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.status} ({self.local_date})"
+    
+    @classmethod
+    def from_log(cls, status_log):
+        """StatusLog から（未保存の）最新ステータス行を組み立てる"""
+        return cls(
+            user_id=status_log.user_id,
+            status_log_id=status_log.id,
+            status=status_log.status,
+            comment=status_log.comment,
+            created_at=status_log.created_at,
+            local_date=status_log.local_date,
+            updated_at=timezone.now(),
+        )
+    
+    @classmethod
+    def upsert(cls, status_logs):
+        """
+        最新ステータスを一括 upsert（INSERT ... ON CONFLICT (user_id) DO UPDATE）
+        
+        Args:
+            status_logs: StatusLog のイテラブル（1ユーザー1件であること）
+        """
+        rows = [cls.from_log(log) for log in status_logs]
+        if rows:
+            cls.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=cls.UPSERT_FIELDS,
+            )
+        return len(rows)
+    
+    @classmethod
+    def record(cls, status_log):
+        """新しい StatusLog を最新ステータスとして反映"""
+        cls.upsert([status_log])
+    
+    @classmethod
+    def refresh_for_user(cls, user_id):
+        """
+        履歴から指定ユーザーの最新ステータスを再計算
+        
+        記録の削除時など、最新行が履歴と食い違う可能性がある場合に使用する。
+        """
+        latest_log = StatusLog.objects.filter(user_id=user_id).order_by('-created_at').first()
+        if latest_log:
+            cls.record(latest_log)
+        else:
+            cls.objects.filter(user_id=user_id).delete()
+
+
+class DailyStatusAggregate(models.Model):
+    """
+    組織・日付・ステータスごとの人数（日次ロールアップ）
+    
+    各ユーザーの「その日の最後のステータス」を数えたもの。
+    StatusLog の記録時に差分更新され、trend_data はこのテーブルのみを参照する。
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='daily_status_aggregates',
+        verbose_name='組織'
+    )
+    date = models.DateField('集計日（日本時間）')
+    status = models.CharField('ステータス', max_length=10, choices=StatusLog.STATUS_CHOICES)
+    count = models.PositiveIntegerField('人数', default=0)
+    updated_at = models.DateTimeField('更新日時', auto_now=True)
+    
+    class Meta:
+        db_table = 'daily_status_aggregates'
+        verbose_name = '日次ステータス集計'
+        verbose_name_plural = '日次ステータス集計'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'date', 'status'],
+                name='uniq_daily_status_aggregate'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.organization_id} - {self.date} {self.status}: {self.count}"
+    
+    @classmethod
+    def add(cls, organization_id, date, status, delta):
+        """
+        指定セルの人数を delta だけ増減（行が無ければ作成）
+        
+        UPDATE ... SET count = GREATEST(count + delta, 0) で更新するため、
+        同一セルへの同時更新でも値が失われない。
+        ロールアップ未構築の日（rebuild_daily_aggregates 前・集計のずれ）に減算しても
+        0 未満（PositiveIntegerField の CHECK 制約違反）にはしない。
+        """
+        from django.db.models.functions import Greatest
+        
+        cls.objects.get_or_create(
+            organization_id=organization_id,
+            date=date,
+            status=status,
+        )
+        cls.objects.filter(
+            organization_id=organization_id,
+            date=date,
+            status=status,
+        ).update(count=Greatest(models.F('count') + delta, 0), updated_at=timezone.now())
+
+
+class BackgroundJob(models.Model):
+    """
+    DB をキューとして使うバックグラウンドジョブの共通部分
+    
+    run_worker コマンドが PENDING のジョブを SELECT ... FOR UPDATE SKIP LOCKED で取得して実行する。
+    実行中のジョブは heartbeat_at を定期的に更新し、更新が途絶えたジョブ（ワーカー停止）は再取得される。
+    """
+    
+    STATUS_CHOICES = [
+        ('PENDING', '待機中'),
+        ('RUNNING', '実行中'),
+        ('SUCCEEDED', '完了'),
+        ('FAILED', '失敗'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField('状態', max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    error = models.TextField('エラー内容', blank=True, default='')
+    attempts = models.PositiveSmallIntegerField('実行回数', default=0)
+    created_at = models.DateTimeField('作成日時', auto_now_add=True)
+    started_at = models.DateTimeField('開始日時', null=True, blank=True)
+    heartbeat_at = models.DateTimeField('最終更新日時', null=True, blank=True)
+    finished_at = models.DateTimeField('終了日時', null=True, blank=True)
+    
+    # 最大実行回数（ワーカー停止による再取得を含む）
+    MAX_ATTEMPTS = 3
+    
+    class Meta:
+        abstract = True
+    
+    @staticmethod
+    def claimable(now, stale_after):
+        """取得できるジョブの条件（PENDING と、heartbeat_at が stale_after 以上更新されていない RUNNING）"""
+        return (
+            models.Q(status='PENDING')
+            | models.Q(status='RUNNING', heartbeat_at__lt=now - stale_after)
+        )
+    
+    @classmethod
+    def oldest_claimable_at(cls, stale_after):
+        """取得できるジョブのうち最も古いものの created_at（無ければ None）"""
+        return (
+            cls.objects
+            .filter(cls.claimable(timezone.now(), stale_after))
+            .order_by('created_at')
+            .values_list('created_at', flat=True)
+            .first()
+        )
+    
+    @classmethod
+    def claim_next(cls, stale_after):
+        """
+        次に実行するジョブを1件取得し RUNNING にする（無ければ None）
+        
+        Args:
+            stale_after: この時間 heartbeat_at が更新されていない RUNNING ジョブを再取得する
+        
+        Returns:
+            取得したジョブ or None
+        """
+        from django.db import transaction
+        
+        now = timezone.now()
+        with transaction.atomic():
+            job = (
+                cls.objects
+                .select_for_update(skip_locked=True)
+                .filter(cls.claimable(now, stale_after))
+                .order_by('created_at')
+                .first()
+            )
+            if job is None:
+                return None
+            job.status = 'RUNNING'
+            job.attempts += 1
+            job.started_at = job.started_at or now
+            job.heartbeat_at = now
+            job.save(update_fields=['status', 'attempts', 'started_at', 'heartbeat_at'])
+        return job
+    
+    def heartbeat(self, **fields):
+        """進捗などを保存し、実行中であることを記録"""
+        fields['heartbeat_at'] = timezone.now()
+        type(self).objects.filter(pk=self.pk).update(**fields)
+        for name, value in fields.items():
+            setattr(self, name, value)
+    
+    def touch(self):
+        """実行中であることだけを記録する（run_worker のハートビートスレッドから呼ぶ・終了済みなら何もしない）"""
+        type(self).objects.filter(pk=self.pk, status='RUNNING').update(heartbeat_at=timezone.now())
+    
+    def mark_succeeded(self, **fields):
+        self.heartbeat(status='SUCCEEDED', finished_at=timezone.now(), error='', **fields)
+    
+    def mark_failed(self, error):
+        self.heartbeat(status='FAILED', finished_at=timezone.now(), error=str(error)[:2000])
+    
+    @property
+    def progress(self):
+        """進捗率（0〜100・total_rows が未確定なら None。total_rows / rows_processed はサブクラスで定義）"""
+        if self.status == 'SUCCEEDED':
+            return 100
+        if not self.total_rows:
+            return None
+        return min(100, self.rows_processed * 100 // self.total_rows)
+
+
+class ExportJob(BackgroundJob):
+    """
+    ステータス出力ジョブ（期間の長い出力をリクエスト外で生成する）
+    
+    params には export_csv と同じ指定（format / start_date / end_date / フィルタ）を保存する。
+    生成したファイルは EXPORT_ROOT に保存し、expires_at を過ぎたら削除する。
+    """
+    
+    FORMAT_CHOICES = [
+        ('xlsx', 'Excel'),
+        ('csv', 'CSV'),
+    ]
+    
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='export_jobs',
+        verbose_name='組織'
+    )
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='export_jobs',
+        verbose_name='依頼者'
+    )
+    format = models.CharField('出力形式', max_length=10, choices=FORMAT_CHOICES, default='xlsx')
+    params = models.JSONField('出力条件', default=dict)
+    total_rows = models.PositiveIntegerField('対象件数', null=True, blank=True)
+    rows_processed = models.PositiveIntegerField('処理済み件数', default=0)
+    file_name = models.CharField('ダウンロード時のファイル名', max_length=255, blank=True, default='')
+    file_path = models.CharField('保存先', max_length=500, blank=True, default='')
+    file_size = models.PositiveBigIntegerField('ファイルサイズ', null=True, blank=True)
+    expires_at = models.DateTimeField('ダウンロード期限', null=True, blank=True)
+    
+    class Meta:
+        db_table = 'export_jobs'
+        verbose_name = '出力ジョブ'
+        verbose_name_plural = '出力ジョブ'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['organization', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.organization_id} - {self.format} - {self.status}"
+    
+    def is_expired(self):
+        return self.expires_at is not None and timezone.now() > self.expires_at
+
+
+class BulkUploadJob(BackgroundJob):
+    """
+    ユーザー一括登録ジョブ
+    
+    アップロードされたファイルを BULK_UPLOAD_ROOT に保存し、run_worker がチャンク単位で取り込む。
+    各チャンクの登録と進捗（rows_processed・件数・エラー）は同じトランザクションで保存するため、
+    ワーカーが停止しても最後にコミットしたチャンクの次から再開できる。
+    """
+    
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='bulk_upload_jobs',
+        verbose_name='組織'
+    )
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='bulk_upload_jobs',
+        verbose_name='依頼者'
+    )
+    file_name = models.CharField('ファイル名', max_length=255)
+    file_path = models.CharField('保存先', max_length=500, blank=True, default='')
+    chunk_size = models.PositiveIntegerField('チャンクサイズ', default=500)
+    total_rows = models.PositiveIntegerField('全行数', null=True, blank=True)
+    rows_processed = models.PositiveIntegerField('処理済み行数', default=0)
+    success_count = models.PositiveIntegerField('成功件数', default=0)
+    error_count = models.PositiveIntegerField('失敗件数', default=0)
+    errors = models.JSONField('エラー詳細', default=list)
+    
+    class Meta:
+        db_table = 'bulk_upload_jobs'
+        verbose_name = '一括登録ジョブ'
+        verbose_name_plural = '一括登録ジョブ'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['organization', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.organization_id} - {self.file_name} - {self.status}"
+
+
+class EmailOutbox(models.Model):
+    """
+    送信待ちのメール（トランザクショナル・アウトボックス）
+    
+    ユーザー・トークンと同じトランザクションで作成し、run_email_worker がまとめて送信する。
+    リクエスト処理はメール送信を待たず、コミットされたメールはワーカーが停止しても失われない。
+    送信に失敗したメールは next_attempt_at まで待って再送し、MAX_ATTEMPTS 回で FAILED にする。
+    """
+    
+    KIND_CHOICES = [
+        ('INVITE', '招待'),
+        ('RESET', 'パスワードリセット'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('PENDING', '送信待ち'),
+        ('SENDING', '送信中'),
+        ('SENT', '送信済み'),
+        ('FAILED', '送信失敗'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField('種別', max_length=10, choices=KIND_CHOICES)
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='outbox_emails',
+        verbose_name='組織'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='outbox_emails',
+        verbose_name='宛先ユーザー'
+    )
+    to_email = models.EmailField('宛先')
+    to_name = models.CharField('宛名', max_length=100)
+    action_url = models.CharField('リンクURL', max_length=500)
+    status = models.CharField('状態', max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField('送信回数', default=0)
+    next_attempt_at = models.DateTimeField('次回送信日時', default=timezone.now)
+    claimed_at = models.DateTimeField('送信開始日時', null=True, blank=True)
+    sent_at = models.DateTimeField('送信日時', null=True, blank=True)
+    provider_status = models.PositiveSmallIntegerField('送信APIのステータス', null=True, blank=True)
+    provider_message_id = models.CharField('送信APIのメッセージID', max_length=100, blank=True, default='')
+    last_error = models.TextField('エラー内容', blank=True, default='')
+    created_at = models.DateTimeField('作成日時', auto_now_add=True)
+    
+    # 最大送信回数（ワーカー停止による再取得を含む）
+    MAX_ATTEMPTS = 5
+    
+    class Meta:
+        db_table = 'email_outbox'
+        verbose_name = '送信待ちメール'
+        verbose_name_plural = '送信待ちメール'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.to_email} - {self.status}"
+    
+    @classmethod
+    def claim_batch(cls, limit, stale_after):
+        """
+        送信するメールをまとめて取得し SENDING にする
+        
+        Args:
+            limit: 最大件数
+            stale_after: この時間 SENDING のままのメール（ワーカー停止）を再取得する
+        
+        Returns:
+            list: 取得したメール（組織間で公平になるよう選ぶ）
+        """
+        from django.db import transaction
+        
+        from django.db.models.functions import RowNumber
+        
+        now = timezone.now()
+        claimable = (
+            models.Q(status='PENDING', next_attempt_at__lte=now)
+            | models.Q(status='SENDING', claimed_at__lt=now - stale_after)
+        )
+        # 組織ごとに順位を付け、各組織の1件目・2件目…の順に取得する
+        # （大きな名簿の招待メールが他の組織のパスワードリセットを待たせないように・リセットは招待より先）
+        priority = models.Case(models.When(kind='RESET', then=models.Value(0)), default=models.Value(1))
+        ranked = (
+            cls.objects
+            .filter(claimable)
+            .annotate(
+                priority=priority,
+                org_rank=models.Window(
+                    RowNumber(),
+                    partition_by=[models.F('organization_id')],
+                    order_by=[priority.asc(), models.F('next_attempt_at').asc()],
+                ),
+            )
+            .order_by('org_rank', 'priority', 'next_attempt_at')
+            .values('pk')[:limit]
+        )
+        with transaction.atomic():
+            # ウィンドウ関数と FOR UPDATE は同じクエリで使えないため、順位付けはサブクエリで行う
+            # ロック後にも条件を再評価し、他のワーカーが取得済み（コミット済み）のメールを除く
+            emails = list(
+                cls.objects
+                .select_for_update(skip_locked=True)
+                .filter(claimable, pk__in=ranked)
+            )
+            if emails:
+                cls.objects.filter(pk__in=[email.pk for email in emails]).update(
+                    status='SENDING', claimed_at=now, attempts=models.F('attempts') + 1
+                )
+            for email in emails:
+                email.status = 'SENDING'
+                email.claimed_at = now
+                email.attempts += 1
+        return emails
+
+
+class EmailRateLimit(models.Model):
+    """
+    メール送信のレート制限の状態（トークンバケット）
+    
+    全ての run_email_worker で1行を共有し（select_for_update で排他）、再起動後も引き継ぐ。
+    更新は utils/email_rate_limit.py で行う。
+    """
+    
+    key = models.CharField('キー', max_length=50, primary_key=True)
+    rate = models.FloatField('送信レート（通/秒）')
+    tokens = models.FloatField('残りトークン')
+    updated_at = models.DateTimeField('トークン更新日時')
+    paused_until = models.DateTimeField('送信停止期限', null=True, blank=True)
+    day = models.DateField('集計日', null=True, blank=True)
+    day_count = models.PositiveIntegerField('当日の送信数', default=0)
+    
+    class Meta:
+        db_table = 'email_rate_limits'
+        verbose_name = 'メール送信レート'
+        verbose_name_plural = 'メール送信レート'
+    
+    def __str__(self):
+        return f"{self.key} - {self.rate:.1f}通/秒"
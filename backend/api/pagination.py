@@ -0,0 +1,154 @@
+"""
+Pagination classes for Mind Status API.
+"""
+
+import json
+import uuid
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    (created_at, id) のキーセット（カーソル）ページネーション
+    
+    - 件数の COUNT(*) を行わない
+    - OFFSET を使わず「前ページ最後の (created_at, id) より後」を WHERE で絞り込むため、
+      何ページ目でも同じコストで取得できる
+    
+    Query Params:
+        cursor: 前ページのレスポンスの next に含まれるカーソル
+        page_size: 1ページの件数（最大 max_page_size）
+        order: desc（新しい順・デフォルト）/ asc（古い順・差分同期用）
+    
+    Response:
+    {
+        "next": "http://.../?pagination=cursor&cursor=xxx" or null,
+        "results": [...]
+    }
+    """
+    
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    order_query_param = 'order'
+    invalid_cursor_message = '無効なカーソルです'
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.descending = request.query_params.get(self.order_query_param, 'desc') != 'asc'
+        
+        if self.descending:
+            queryset = queryset.order_by('-created_at', '-id')
+        else:
+            queryset = queryset.order_by('created_at', 'id')
+        
+        position = self.decode_cursor(request)
+        if position is not None:
+            created_at, pk = position
+            # created_at の範囲条件でインデックスの走査開始位置を決め、
+            # 同一時刻の行は id で順序付ける（(created_at, id) > / < (t, pk)）
+            if self.descending:
+                queryset = queryset.filter(created_at__lte=created_at).filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                )
+            else:
+                queryset = queryset.filter(created_at__gte=created_at).filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+                )
+        
+        # 1件多く取得して次ページの有無を判定
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+    
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+    
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+    
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+    
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(last))
+    
+    # ─── カーソルのエンコード・デコード ─────────────────────────
+    def get_position(self, item):
+        """ページ末尾の行（モデル or values() の dict）から (created_at, id) を取り出す"""
+        if isinstance(item, dict):
+            return item['created_at'], item['id']
+        return item.created_at, item.id
+    
+    def encode_cursor(self, item):
+        created_at, pk = self.get_position(item)
+        payload = json.dumps({'t': created_at.isoformat(), 'id': str(pk)})
+        return b64encode(payload.encode('utf-8')).decode('ascii')
+    
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            created_at = parse_datetime(payload['t'])
+            # 主キーは UUID。不正な値を WHERE に渡すと DB エラー（500）になるためここで検証する
+            pk = uuid.UUID(payload['id'])
+        except (TypeError, ValueError, KeyError, AttributeError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+
+class KeysetPaginationMixin:
+    """
+    ViewSet 用: ?pagination=cursor（または cursor 指定）のときだけ
+    KeysetPagination に切り替える（デフォルトは従来の PageNumberPagination）
+    """
+    
+    keyset_pagination_class = KeysetPagination
+    
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params if self.request is not None else {}
+            if params.get('pagination') == 'cursor' or params.get('cursor'):
+                self._paginator = self.keyset_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
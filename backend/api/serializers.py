@@ -2,8 +2,10 @@
 Serializers for Mind Status API.
 """
 
+from django.utils.functional import cached_property
 from rest_framework import serializers
-from .models import Organization, User, StatusLog, InviteToken
+from rest_framework.validators import UniqueValidator
+from .models import Organization, User, StatusLog, InviteToken, ExportJob, BulkUploadJob
 
 
 class OrganizationSerializer(serializers.ModelSerializer):
@@ -49,6 +51,39 @@ class StatusLogSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'created_at']
 
 
+# 一覧用の高速パスで values() に渡すフィールド
+STATUS_LOG_LIST_FIELDS = ('id', 'user_id', 'user__full_name', 'status', 'comment', 'created_at')
+
+
+def status_log_rows_to_representation(rows):
+    """
+    values(*STATUS_LOG_LIST_FIELDS) の行を StatusLogSerializer と同じ形式に変換
+    
+    一覧レスポンス用の読み取り専用パス。モデルインスタンスの生成と
+    行ごとの Serializer フィールド処理を省略する。
+    
+    Args:
+        rows: values(*STATUS_LOG_LIST_FIELDS) の結果（dict のイテラブル）
+    
+    Returns:
+        list[dict]: StatusLogSerializer(many=True).data と同じ内容
+    """
+    # 日時の書式・タイムゾーン変換は StatusLogSerializer と同じ DateTimeField に任せる
+    format_datetime = serializers.DateTimeField().to_representation
+    
+    return [
+        {
+            'id': str(row['id']),
+            'user': row['user_id'],
+            'user_name': row['user__full_name'],
+            'status': row['status'],
+            'comment': row['comment'],
+            'created_at': format_datetime(row['created_at']),
+        }
+        for row in rows
+    ]
+
+
 class InviteTokenSerializer(serializers.ModelSerializer):
     """招待トークンシリアライザー"""
     
@@ -58,6 +93,44 @@ class InviteTokenSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'token', 'created_at']
 
 
+class ExportJobSerializer(serializers.ModelSerializer):
+    """出力ジョブシリアライザー（進捗・ダウンロードURL付き）"""
+    
+    progress = serializers.IntegerField(read_only=True)  # BackgroundJob.progress
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'status', 'format', 'params',
+            'total_rows', 'rows_processed', 'progress',
+            'file_name', 'file_size', 'expires_at', 'download_url',
+            'error', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+    
+    def get_download_url(self, obj):
+        if obj.status != 'SUCCEEDED' or not obj.file_path or obj.is_expired():
+            return None
+        return f'/api/status/export_jobs/{obj.id}/download/'
+
+
+class BulkUploadJobSerializer(serializers.ModelSerializer):
+    """一括登録ジョブシリアライザー（進捗・行単位のエラー付き）"""
+    
+    progress = serializers.IntegerField(read_only=True)  # BackgroundJob.progress
+    
+    class Meta:
+        model = BulkUploadJob
+        fields = [
+            'id', 'status', 'file_name',
+            'total_rows', 'rows_processed', 'progress',
+            'success_count', 'error_count', 'errors',
+            'error', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+
 class AdminRegistrationSerializer(serializers.Serializer):
     """管理者登録シリアライザー"""
     
@@ -107,7 +180,7 @@ class BulkUploadUserSerializer(serializers.ModelSerializer):
     - ユーザー属性のバリデーション（性別・生年月日・メール重複など）
     - エラーメッセージの統一
     - 内部値への変換（「男」→ MALE）
-    - organization, role, password はサーバー側で注入
+    - organization, role はサーバー側で注入（パスワードは使用不可で作成し、招待フローで設定）
     """
     
     # gender を CharField で上書き（Model の ChoiceField を無効化）
@@ -175,6 +248,15 @@ class BulkUploadUserSerializer(serializers.ModelSerializer):
         # 空文字列は None
         return value if value else None
     
+    def normalize_email(self, value):
+        """
+        メールアドレスの形式チェックと正規化（小文字化・トリム）
+        """
+        if not value or '@' not in value:
+            raise serializers.ValidationError('有効なメールアドレスを入力してください。')
+        
+        return value.lower().strip()
+    
     def validate_email(self, value):
         """
         メールアドレスの検証
@@ -183,10 +265,7 @@ class BulkUploadUserSerializer(serializers.ModelSerializer):
         - 重複チェック（同一組織内）
         - 正規化（小文字化・トリム）
         """
-        if not value or '@' not in value:
-            raise serializers.ValidationError('有効なメールアドレスを入力してください。')
-        
-        email = value.lower().strip()
+        email = self.normalize_email(value)
         
         # 重複チェック（同一組織内・更新時は自分自身を除外）
         queryset = User.objects.filter(email=email)
@@ -290,26 +369,25 @@ class BulkUploadUserSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         """
-        ユーザー作成（パスワードハッシュ化保証版）
+        ユーザー作成（招待ユーザー）
         
-        必ず create_user() を通すことで set_password() 実行を保証。
-        password=None の場合でも create_user() を使用することで、
-        使用不可なパスワードが設定され、招待フローで後からパスワード設定可能。
+        一括登録のユーザーは招待フロー（set_password_with_invite）で本パスワードを
+        設定するため、ここでは create_user(password=None) で使用不可パスワードにする。
+        make_password(None) はハッシュ計算をしないので、行数が多くても CPU を消費しない。
         
         Args:
             validated_data: バリデーション済みデータ
-                - role, is_activated, organization, password はサーバー側で注入済み
+                - role, is_activated, organization はサーバー側で注入済み
+                - password が含まれていても使用しない
         
         Returns:
             User: 作成されたユーザーインスタンス
         """
-        password = validated_data.pop('password', None)
+        validated_data.pop('password', None)
         
-        # 必ず create_user() を使用（password が None でも OK）
-        # → set_password() が必ず実行される
-        # → JWT認証が正常動作する
+        # create_user() を通すことで使用不可パスワードが必ず設定される
         user = User.objects.create_user(
-            password=password,
+            password=None,
             **validated_data
         )
         
@@ -327,3 +405,31 @@ class BulkUploadUserSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
         return instance
+
+
+class BulkUploadRowSerializer(BulkUploadUserSerializer):
+    """
+    一括登録の行の検証用（utils.bulk_validation の列ごとの検証で使う）
+
+    DB を参照しないよう email の UniqueValidator と validate_email の重複チェックを外す。
+    既存ユーザーとの重複は呼び出し側（bulk_upload / bulk_sync）で事前取得したユーザーと照合し、
+    エラーメッセージは unique_email_message（UniqueValidator と同じもの）を使う。
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields['email'].validators = [
+            v for v in fields['email'].validators if not isinstance(v, UniqueValidator)
+        ]
+        return fields
+
+    @cached_property
+    def unique_email_message(self):
+        """email の UniqueValidator のエラーメッセージ"""
+        for validator in super().get_fields()['email'].validators:
+            if isinstance(validator, UniqueValidator):
+                return validator.message
+        return 'このメールアドレスは既に登録されています。'
+
+    def validate_email(self, value):
+        return self.normalize_email(value)
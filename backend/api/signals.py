@@ -0,0 +1,61 @@
+"""
+Signal handlers for Mind Status API.
+"""
+
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import User, Organization
+from .utils.cache import bump_org_auth_version, bump_org_cache_version, bump_user_auth_versions
+from .utils.status import rebuild_daily_aggregates, status_log_span
+
+
+def _only_last_login(update_fields):
+    """ログイン時の last_login だけの保存か（update_fields は post_delete では渡されない）"""
+    return update_fields is not None and set(update_fields) == {'last_login'}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_org_cache_on_user_change(sender, instance, update_fields=None, **kwargs):
+    """ユーザーの作成・変更（有効化含む）・削除で組織のダッシュボードキャッシュを無効化"""
+    if _only_last_login(update_fields):
+        # ログインのたびに組織全体のキャッシュを消さないように
+        return
+    bump_org_cache_version(instance.organization_id)
+
+
+@receiver(post_save, sender=Organization)
+def invalidate_org_cache_on_organization_change(sender, instance, **kwargs):
+    """組織情報（組織種別など）の変更で組織のダッシュボードキャッシュを無効化"""
+    bump_org_cache_version(instance.id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_auth_cache_on_user_change(sender, instance, update_fields=None, **kwargs):
+    """ユーザーの変更（パスワード変更・無効化・権限変更など）・削除で認証キャッシュを無効化"""
+    if _only_last_login(update_fields):
+        return
+    bump_user_auth_versions([instance.pk])
+
+
+@receiver(post_save, sender=Organization)
+def invalidate_auth_cache_on_organization_change(sender, instance, **kwargs):
+    """組織情報の変更で認証キャッシュ（request.user.organization）を無効化"""
+    bump_org_auth_version(instance.id)
+
+
+@receiver(pre_delete, sender=User)
+def remember_status_log_span_on_user_delete(sender, instance, **kwargs):
+    """削除するユーザーの記録がある期間を保持（StatusLog は CASCADE で User より先に削除される）"""
+    instance._status_log_span = status_log_span([instance.pk])
+
+
+@receiver(post_delete, sender=User)
+def rebuild_daily_aggregates_on_user_delete(sender, instance, **kwargs):
+    """ユーザーの削除で、そのユーザーの記録があった日の日次集計を作り直す（削除と同じトランザクション）"""
+    span = getattr(instance, '_status_log_span', None)
+    if span is None or instance.organization_id is None:
+        return
+    rebuild_daily_aggregates(*span, organization_id=instance.organization_id)
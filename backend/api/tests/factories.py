@@ -0,0 +1,48 @@
+"""
+テスト用のデータ作成ヘルパー
+"""
+
+import uuid
+
+from django.utils import timezone
+
+from api.models import Organization, User
+
+
+def create_organization(org_type='SCHOOL', name='テスト組織'):
+    return Organization.objects.create(name=name, org_type=org_type)
+
+
+def create_user(organization, role='USER', is_activated=True, password=None, **fields):
+    """ユーザーを作成する（password を省略すると使用不可パスワード・ハッシュ計算をしない）"""
+    fields.setdefault('email', f'user-{uuid.uuid4().hex[:12]}@example.com')
+    fields.setdefault('full_name', 'テストユーザー')
+    return User.objects.create_user(
+        password=password,
+        organization=organization,
+        role=role,
+        is_activated=is_activated,
+        **fields,
+    )
+
+
+def record_status(user, status, comment='', created_at=None):
+    """
+    ステータスを記録する（StatusLogViewSet.perform_create と同じく record_status_log まで行う）
+
+    created_at を指定した場合は、その日時の記録として反映する（過去の日の記録用）。
+    """
+    from django.db import transaction
+
+    from api.models import StatusLog
+    from api.utils.status import record_status_log
+
+    with transaction.atomic():
+        status_log = StatusLog.objects.create(user=user, status=status, comment=comment)
+        if created_at is not None:
+            StatusLog.objects.filter(pk=status_log.pk).update(
+                created_at=created_at, local_date=timezone.localdate(created_at)
+            )
+            status_log.refresh_from_db()
+        record_status_log(status_log)
+    return status_log
@@ -0,0 +1,81 @@
+"""
+CachedJWTAuthentication のテスト（ユーザーの無効化でキャッシュが無効になること）
+"""
+
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import CachedJWTAuthentication
+from api.models import User
+from api.utils.bulk_sync import apply_user_diff, diff_user_rows
+from .factories import create_organization, create_user
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        # 共有キャッシュでのみキャッシュするため、ファイルキャッシュを使う
+        self.cache_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': self.cache_dir,
+            }},
+            AUTH_USER_CACHE_TIMEOUT=30,
+        )
+        self.settings_override.enable()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.addCleanup(self.settings_override.disable)
+
+        self.organization = create_organization('COMPANY')
+        self.user = create_user(self.organization, email='member@example.com', employee_number='E1')
+        header = f'Bearer {AccessToken.for_user(self.user)}'
+        self.request = Request(APIRequestFactory().get('/api/users/me/', HTTP_AUTHORIZATION=header))
+        self.authentication = CachedJWTAuthentication()
+
+    def _authenticate(self):
+        user, _ = self.authentication.authenticate(self.request)
+        return user
+
+    def test_cached_user_is_served_without_queries(self):
+        self._authenticate()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._authenticate().pk, self.user.pk)
+        self.assertEqual(len(queries), 0)
+
+    def test_deactivation_invalidates_cached_user(self):
+        self._authenticate()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate()
+
+    def test_sync_deactivation_invalidates_cached_user(self):
+        self._authenticate()
+
+        diff = diff_user_rows(self.organization, [], key='employee_number', deactivate_missing=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_user_diff(self.organization, diff)
+
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_active)
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate()
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_process_local_cache_is_not_used(self):
+        self._authenticate()
+
+        with CaptureQueriesContext(connection) as queries:
+            self._authenticate()
+        self.assertGreater(len(queries), 0)
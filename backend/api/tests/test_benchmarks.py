@@ -0,0 +1,77 @@
+"""
+合成テナント生成（generate_synthetic_tenant）とベンチマーク（run_benchmarks）のテスト
+"""
+
+import json
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from api.models import DailyStatusAggregate, Organization, StatusLog, User, UserLatestStatus
+from api.utils.status import rebuild_daily_aggregates, today_jst
+
+
+def generate(**options):
+    call_command('generate_synthetic_tenant', stdout=StringIO(), **options)
+    return Organization.objects.latest('created_at')
+
+
+class GenerateSyntheticTenantTests(TestCase):
+    def test_creates_members_history_and_denormalized_rows(self):
+        organization = generate(users=6, days=5, seed=1)
+
+        members = User.objects.filter(organization=organization, role='USER')
+        self.assertEqual(members.count(), 6)
+        self.assertFalse(any(user.has_usable_password() for user in members))
+        logs = StatusLog.objects.filter(user__organization=organization)
+        self.assertTrue(logs.exists())
+        self.assertFalse(logs.filter(local_date__isnull=True).exists())
+        self.assertEqual(
+            UserLatestStatus.objects.filter(user__organization=organization).count(),
+            logs.values('user').distinct().count(),
+        )
+        call_command('check_latest_status', stdout=StringIO())
+
+        def rollup():
+            return sorted(
+                DailyStatusAggregate.objects.filter(organization=organization, count__gt=0)
+                .values_list('date', 'status', 'count')
+            )
+        generated = rollup()
+        end_date = today_jst()
+        rebuild_daily_aggregates(end_date.replace(year=end_date.year - 1), end_date, organization_id=organization.id)
+        self.assertEqual(generated, rollup())
+
+    def test_same_seed_generates_same_history(self):
+        def history(organization):
+            return list(
+                StatusLog.objects.filter(user__organization=organization)
+                .order_by('created_at', 'user__full_name')
+                .values_list('user__full_name', 'status', 'comment', 'created_at')
+            )
+
+        self.assertEqual(history(generate(users=4, days=3, seed=7)), history(generate(users=4, days=3, seed=7)))
+
+    def test_rejects_out_of_range_days(self):
+        with self.assertRaises(CommandError):
+            generate(users=1, days=366)
+
+
+class RunBenchmarksTests(TestCase):
+    def test_views_suite_reports_every_endpoint(self):
+        organization = generate(users=5, days=3)
+        output = StringIO()
+
+        call_command(
+            'run_benchmarks', suite=['views'], organization=str(organization.id),
+            repeat=1, bulk_rows=3, stdout=output, stderr=StringIO(),
+        )
+
+        report = json.loads(output.getvalue())
+        self.assertEqual(report['meta']['suites'], ['views'])
+        cases = {result['case'] for result in report['results']}
+        self.assertTrue({'dashboard_summary', 'alerts', 'trend_data_30', 'export_period_30_csv', 'bulk_upload'} <= cases)
+        self.assertTrue(all(result['users'] == 5 for result in report['results']))
+        # bulk_upload はロールバックされ、組織のデータは変わらない
+        self.assertEqual(User.objects.filter(organization=organization, role='USER').count(), 5)
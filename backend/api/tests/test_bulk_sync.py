@@ -0,0 +1,76 @@
+"""
+diff_user_rows（名簿の差分同期）のテスト
+"""
+
+from datetime import date
+
+from django.test import TestCase
+
+from api.utils.bulk_sync import diff_user_rows
+from .factories import create_organization, create_user
+
+
+def row(student_number, email, full_name='生徒', **fields):
+    return {
+        'student_number': student_number,
+        'full_name': full_name,
+        'full_name_kana': 'セイト',
+        'grade': '1',
+        'class_name': 'A組',
+        'gender': '男',
+        'birth_date': '2010-01-01',
+        'email': email,
+        **fields,
+    }
+
+
+class DiffUserRowsTests(TestCase):
+    def setUp(self):
+        self.organization = create_organization('SCHOOL')
+        self.member = create_user(
+            self.organization, email='s1@example.com', full_name='生徒', student_number='1',
+            grade=1, class_name='A組', gender='MALE', full_name_kana='セイト', birth_date=date(2010, 1, 1),
+        )
+
+    def _diff(self, rows, **options):
+        return diff_user_rows(self.organization, rows, key='student_number', **options)
+
+    def test_blank_key_is_reported(self):
+        diff = self._diff([row('', 'blank@example.com')])
+
+        self.assertEqual(diff['creates'], [])
+        self.assertEqual(len(diff['errors']), 1)
+        self.assertEqual(diff['errors'][0]['row'], 2)
+        self.assertIn('照合キー', diff['errors'][0]['error'])
+
+    def test_duplicate_key_in_file_is_reported(self):
+        diff = self._diff([row('2', 'a@example.com'), row('2', 'b@example.com')])
+
+        self.assertEqual([row_num for row_num, _ in diff['creates']], [2])
+        self.assertEqual(len(diff['errors']), 1)
+        self.assertEqual(diff['errors'][0]['row'], 3)
+        self.assertIn('重複', diff['errors'][0]['error'])
+
+    def test_missing_members_are_deactivated_only_when_requested(self):
+        rows = [row('2', 'new@example.com')]
+
+        self.assertEqual(self._diff(rows)['deactivations'], [])
+        diff = self._diff(rows, deactivate_missing=True)
+        self.assertEqual([user.pk for user in diff['deactivations']], [self.member.pk])
+        self.assertEqual([user.email for _, user in diff['creates']], ['new@example.com'])
+
+    def test_members_without_a_key_are_not_deactivated(self):
+        create_user(self.organization, email='nokey@example.com')
+
+        diff = self._diff([row('1', 's1@example.com')], deactivate_missing=True)
+
+        self.assertEqual(diff['deactivations'], [])
+        self.assertEqual(diff['unchanged'], 1)
+
+    def test_changed_fields_are_reported_as_updates(self):
+        diff = self._diff([row('1', 's1@example.com', class_name='B組')])
+
+        self.assertEqual(len(diff['updates']), 1)
+        _, user, changes = diff['updates'][0]
+        self.assertEqual(user.pk, self.member.pk)
+        self.assertEqual(changes, {'class_name': ('A組', 'B組')})
@@ -0,0 +1,302 @@
+"""
+ユーザー一括登録（bulk_upload・一括登録ジョブ）のテスト
+"""
+
+import csv
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.hashers import get_hasher
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from api.models import BulkUploadJob, EmailOutbox, InviteToken, User
+from api.utils import bulk_upload
+from api.utils.bulk_upload import UploadReadError, _iter_text_lines, iter_upload_rows
+from api.utils.jobs import run_next_job
+from .factories import create_organization, create_user
+
+SCHOOL_HEADERS = ['student_number', 'full_name', 'full_name_kana', 'grade', 'class_name', 'gender', 'birth_date', 'email']
+
+
+def school_row(i, **fields):
+    row = {
+        'student_number': f'S{i:04d}',
+        'full_name': f'生徒{i}',
+        'full_name_kana': 'セイト',
+        'grade': '1',
+        'class_name': 'A組',
+        'gender': '男',
+        'birth_date': '2010-04-15',
+        'email': f'student{i}@example.com',
+    }
+    row.update(fields)
+    return [row[header] for header in SCHOOL_HEADERS]
+
+
+def csv_file(rows, headers=SCHOOL_HEADERS, name='roster.csv', encoding='utf-8-sig', lineterminator='\r\n'):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator=lineterminator)
+    writer.writerow(headers)
+    writer.writerows(rows)
+    return SimpleUploadedFile(name, buffer.getvalue().encode(encoding), content_type='text/csv')
+
+
+def xlsx_file(rows, headers=SCHOOL_HEADERS, sheet_title='学校向けテンプレート'):
+    """テンプレートと同じ形式（1行目: タイトル・2行目: ヘッダー・3行目以降: データ）の Excel"""
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = sheet_title
+    sheet.append(['一括登録テンプレート'])
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return SimpleUploadedFile('roster.xlsx', buffer.getvalue())
+
+
+class ReadUploadRowsTests(TestCase):
+    def read(self, upload_file, file_ext='csv'):
+        rows, first_row_num = iter_upload_rows(upload_file, file_ext, 'SCHOOL')
+        return list(rows), first_row_num
+
+    def test_csv_line_endings(self):
+        for lineterminator in ('\r\n', '\n', '\r'):
+            with self.subTest(lineterminator=repr(lineterminator)):
+                rows, first_row_num = self.read(csv_file([school_row(1), school_row(2)], lineterminator=lineterminator))
+
+                self.assertEqual(first_row_num, 2)
+                self.assertEqual([row['email'] for row in rows], ['student1@example.com', 'student2@example.com'])
+                self.assertEqual(rows[0]['student_number'], 'S0001')
+
+    def test_csv_shift_jis(self):
+        rows, _ = self.read(csv_file([school_row(1, full_name='髙橋 太郎')], encoding='cp932'))
+
+        self.assertEqual(rows[0]['full_name'], '髙橋 太郎')
+
+    def test_text_lines_across_chunk_boundaries(self):
+        data = 'a,b\r\n"改\r\n行",c\rd,e\nf'.encode('utf-8')
+        expected = ['a,b\r\n', '"改\r\n', '行",c\r', 'd,e\n', 'f']
+
+        for size in range(1, len(data) + 1):
+            with self.subTest(size=size):
+                chunks = [data[i:i + size] for i in range(0, len(data), size)]
+                self.assertEqual(list(_iter_text_lines(chunks, 'utf-8')), expected)
+
+    def test_csv_quoted_newline_stays_in_field(self):
+        rows, _ = self.read(csv_file([school_row(1, class_name='A\r\n組')], lineterminator='\r'))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['class_name'], 'A\r\n組')
+
+    def test_xlsx_rows_start_at_row_3_and_skip_blank_rows(self):
+        rows, first_row_num = self.read(xlsx_file([school_row(1), [None] * 8, school_row(2)]), 'xlsx')
+
+        self.assertEqual(first_row_num, 3)
+        self.assertEqual([row['email'] for row in rows], ['student1@example.com', 'student2@example.com'])
+        self.assertEqual(rows[0]['grade'], '1')
+
+    def test_broken_xlsx_raises_read_error(self):
+        with self.assertRaises(UploadReadError):
+            self.read(SimpleUploadedFile('roster.xlsx', b'not a workbook'), 'xlsx')
+
+
+class BulkUploadFixture:
+    def setUp(self):
+        self.organization = create_organization('SCHOOL')
+        self.admin = create_user(self.organization, role='ADMIN')
+        self.client.force_authenticate(self.admin)
+
+    def upload(self, upload_file, expected_status=200, **params):
+        response = self.client.post(
+            '/api/users/bulk_upload/', {'file': upload_file, **params}, format='multipart'
+        )
+        self.assertEqual(response.status_code, expected_status, response.data)
+        return response.data
+
+
+class BulkUploadTests(BulkUploadFixture, APITestCase):
+    def test_creates_invited_users_with_tokens_and_emails(self):
+        result = self.upload(csv_file([school_row(1), school_row(2)]))
+
+        self.assertEqual((result['success_count'], result['error_count']), (2, 0))
+        users = User.objects.filter(organization=self.organization, role='USER').order_by('email')
+        self.assertEqual([user.email for user in users], ['student1@example.com', 'student2@example.com'])
+        student = users[0]
+        self.assertEqual(
+            (student.student_number, student.grade, student.class_name, student.gender, student.is_activated),
+            ('S0001', 1, 'A組', 'MALE', False),
+        )
+        token = InviteToken.objects.get(user=student)
+        self.assertEqual((token.token_type, token.is_used), ('INVITE', False))
+        email = EmailOutbox.objects.get(user=student)
+        self.assertEqual((email.kind, email.to_email, email.status), ('INVITE', student.email, 'PENDING'))
+        self.assertIn(str(token.token), email.action_url)
+
+    def test_invalid_and_duplicate_rows_are_reported_with_row_numbers(self):
+        create_user(create_organization(), email='taken@example.com')
+
+        result = self.upload(csv_file([
+            school_row(1),
+            school_row(2, email='student1@example.com'),
+            school_row(3, grade='abc'),
+            school_row(4, email='taken@example.com'),
+        ]))
+
+        self.assertEqual((result['success_count'], result['error_count']), (1, 3))
+        self.assertEqual([error['row'] for error in result['errors']], [3, 4, 5])
+        self.assertEqual(User.objects.filter(organization=self.organization, role='USER').count(), 1)
+
+    def test_reupload_updates_uninvited_user_and_replaces_token(self):
+        self.upload(csv_file([school_row(1)]))
+        old_token = InviteToken.objects.get()
+
+        result = self.upload(csv_file([school_row(1, full_name='改名', class_name='B組')]))
+
+        self.assertEqual(result['success_count'], 1)
+        user = User.objects.get(email='student1@example.com')
+        self.assertEqual((user.full_name, user.class_name), ('改名', 'B組'))
+        old_token.refresh_from_db()
+        self.assertTrue(old_token.is_used)
+        self.assertEqual(InviteToken.objects.filter(user=user, is_used=False).count(), 1)
+
+    def test_validate_only_writes_nothing(self):
+        result = self.upload(csv_file([school_row(1), school_row(2, grade='abc')]), validate_only='true')
+
+        self.assertEqual((result['validate_only'], result['success_count'], result['error_count']), (True, 1, 1))
+        self.assertFalse(User.objects.filter(role='USER').exists())
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as small:
+            self.upload(csv_file([school_row(i) for i in range(2)]))
+        with CaptureQueriesContext(connection) as large:
+            self.upload(csv_file([school_row(i) for i in range(100, 150)]))
+
+        self.assertEqual(User.objects.filter(role='USER').count(), 52)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+    def test_bare_cr_csv_and_xlsx_are_imported(self):
+        result = self.upload(csv_file([school_row(1), school_row(2)], lineterminator='\r'))
+        self.assertEqual((result['success_count'], result['error_count']), (2, 0))
+
+        result = self.upload(xlsx_file([school_row(3)]))
+        self.assertEqual((result['success_count'], result['error_count']), (1, 0))
+        self.assertEqual(User.objects.filter(organization=self.organization, role='USER').count(), 3)
+
+    def test_members_cannot_upload(self):
+        self.client.force_authenticate(create_user(self.organization))
+
+        self.upload(csv_file([school_row(1)]), expected_status=403)
+
+
+class InvitedUserPasswordTests(BulkUploadFixture, APITestCase):
+    def test_invited_users_get_unusable_passwords_without_hashing(self):
+        with mock.patch.object(type(get_hasher()), 'encode') as encode:
+            self.upload(csv_file([school_row(i) for i in range(3)]))
+
+        encode.assert_not_called()
+        users = User.objects.filter(organization=self.organization, role='USER')
+        self.assertEqual(len(users), 3)
+        self.assertFalse(any(user.has_usable_password() for user in users))
+
+    def test_invite_sets_the_real_password(self):
+        self.upload(csv_file([school_row(1)]))
+        token = InviteToken.objects.get()
+        self.client.force_authenticate(None)
+        login = {'email': 'student1@example.com', 'password': 'Invite1234'}
+        self.assertEqual(self.client.post('/api/auth/login/', login, format='json').status_code, 401)
+
+        response = self.client.post(
+            '/api/users/set_password_with_invite/',
+            {'token': str(token.token), 'password': 'Invite1234'},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(email='student1@example.com')
+        self.assertTrue(user.is_activated and user.check_password('Invite1234'))
+        self.assertEqual(self.client.post('/api/auth/login/', login, format='json').status_code, 200)
+
+
+class BulkUploadJobTests(BulkUploadFixture, APITransactionTestCase):
+    # run_next_job は close_old_connections() で接続を閉じるため、テストをトランザクションで包まない
+
+    def setUp(self):
+        self.upload_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.upload_root, ignore_errors=True)
+        settings_override = override_settings(BULK_UPLOAD_ROOT=self.upload_root, BULK_UPLOAD_CHUNK_SIZE=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+
+    def create_job(self, rows):
+        response = self.client.post('/api/users/bulk_upload_jobs/', {'file': csv_file(rows)}, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual((response.data['status'], response.data['progress']), ('PENDING', None))
+        return response.data['id']
+
+    def detail(self, job_id):
+        return self.client.get(f'/api/users/bulk_upload_jobs/{job_id}/').data
+
+    def test_worker_imports_file_in_chunks(self):
+        rows = [school_row(1), school_row(2), school_row(3, grade='abc'), school_row(4), school_row(5)]
+        job_id = self.create_job(rows)
+        self.assertEqual(len(list(Path(self.upload_root).iterdir())), 1)
+
+        self.assertTrue(run_next_job())
+
+        job = self.detail(job_id)
+        self.assertEqual(job['status'], 'SUCCEEDED')
+        self.assertEqual(
+            (job['total_rows'], job['rows_processed'], job['progress'], job['success_count'], job['error_count']),
+            (5, 5, 100, 4, 1),
+        )
+        self.assertEqual([error['row'] for error in job['errors']], [4])
+        self.assertEqual(User.objects.filter(organization=self.organization, role='USER').count(), 4)
+        self.assertEqual(EmailOutbox.objects.count(), 4)
+        self.assertEqual(list(Path(self.upload_root).iterdir()), [])
+
+    def test_stopped_job_resumes_after_last_committed_chunk(self):
+        job_id = self.create_job([school_row(i) for i in range(5)])
+        import_user_rows = bulk_upload.import_user_rows
+        calls = []
+
+        def stop_on_second_chunk(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError('worker stopped')
+            return import_user_rows(*args, **kwargs)
+
+        with mock.patch.object(bulk_upload, 'import_user_rows', side_effect=stop_on_second_chunk), \
+                self.assertLogs('api.utils.jobs', level='ERROR'):
+            run_next_job()
+        self.assertEqual((self.detail(job_id)['rows_processed'], self.detail(job_id)['progress']), (2, 40))
+        # ワーカーが停止して heartbeat が途絶えた状態にする
+        BulkUploadJob.objects.filter(id=job_id).update(status='RUNNING', heartbeat_at=timezone.now() - timedelta(days=1))
+
+        self.assertTrue(run_next_job())
+
+        job = self.detail(job_id)
+        self.assertEqual((job['status'], job['success_count'], job['error_count']), ('SUCCEEDED', 5, 0))
+        self.assertEqual(User.objects.filter(organization=self.organization, role='USER').count(), 5)
+        self.assertEqual(InviteToken.objects.count(), 5)
+
+    def test_jobs_of_other_organizations_are_not_found(self):
+        job_id = self.create_job([school_row(1)])
+        self.client.force_authenticate(create_user(create_organization(), role='ADMIN'))
+
+        response = self.client.get(f'/api/users/bulk_upload_jobs/{job_id}/')
+
+        self.assertEqual(response.status_code, 404)
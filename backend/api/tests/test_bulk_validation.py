@@ -0,0 +1,93 @@
+"""
+一括登録の列ごとの検証（bulk_validation）のテスト
+"""
+
+from django.test import TestCase, override_settings
+
+from api.serializers import BulkUploadUserSerializer
+from api.utils.bulk_validation import ColumnValidator, _shutdown_executor, validate_user_rows
+
+
+def row(i, **fields):
+    values = {
+        'full_name': f'生徒{i}',
+        'full_name_kana': 'セイト',
+        'email': f'student{i}@example.com',
+        'gender': '男',
+        'birth_date': '2010-04-15',
+        'student_number': f'S{i:04d}',
+        'grade': '1',
+        'class_name': 'A組',
+    }
+    values.update(fields)
+    return values
+
+
+# Serializer の検証・変換を一通り通る行（正常・正規化・エラー）
+ROWS = [
+    row(0),
+    row(1, gender='女性', grade="'3", birth_date="'2000-01-01"),
+    row(2, full_name='ｶﾞｸｾｲ　太郎 ', class_name='Ｂ組', email='Student2@Example.COM'),
+    row(3, gender='', birth_date='', grade=None, class_name=None),
+    row(4, gender='不明'),
+    row(5, birth_date='2000/01/01'),
+    row(6, grade='13'),
+    row(7, grade='x'),
+    row(8, full_name=None),
+    row(9, email='not-an-email'),
+    row(10, email=None, gender='不明', grade='0'),
+    row(11, gender='男'),  # 前の行と同じ値（メモ化された結果）
+]
+
+
+def serializer_results(rows):
+    results = []
+    for values in rows:
+        serializer = BulkUploadUserSerializer(data=values)
+        if serializer.is_valid():
+            results.append((dict(serializer.validated_data), {}))
+        else:
+            errors = {name: [str(message) for message in messages] for name, messages in serializer.errors.items()}
+            results.append(({}, errors))
+    return results
+
+
+def column_results(results):
+    """エラーのある行は validated_data を比較しない（Serializer はエラー時に validated_data を持たない）"""
+    return [({} if errors else data, errors) for data, errors in results]
+
+
+class ColumnValidatorTests(TestCase):
+    def test_matches_serializer_row_by_row(self):
+        expected = serializer_results(ROWS)
+
+        actual = column_results(ColumnValidator().validate(ROWS))
+
+        for i, (actual_row, expected_row) in enumerate(zip(actual, expected)):
+            with self.subTest(row=i):
+                self.assertEqual(actual_row, expected_row)
+
+    def test_repeated_values_are_validated_once(self):
+        validator = ColumnValidator()
+        calls = []
+        validate_gender = validator.serializer.validate_gender
+
+        def counting_validate_gender(value):
+            calls.append(value)
+            return validate_gender(value)
+
+        validator.serializer.validate_gender = counting_validate_gender
+        try:
+            results = validator.validate([row(i, gender=('男' if i % 2 else '女')) for i in range(20)])
+        finally:
+            del validator.serializer.validate_gender
+
+        self.assertEqual(sorted(calls), ['女', '男'])
+        self.assertEqual({data['gender'] for data, _ in results}, {'MALE', 'FEMALE'})
+
+    @override_settings(BULK_UPLOAD_VALIDATION_ROWS=4)
+    def test_process_pool_matches_in_process_validation(self):
+        self.addCleanup(_shutdown_executor)
+        rows = ROWS * 2
+
+        self.assertEqual(validate_user_rows(rows, workers=2), ColumnValidator().validate(rows))
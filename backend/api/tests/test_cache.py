@@ -0,0 +1,86 @@
+"""
+管理者ダッシュボードのレスポンスキャッシュ（cached_org_response）のテスト
+"""
+
+import shutil
+import tempfile
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .factories import create_organization, create_user, record_status
+
+
+class DashboardCacheTests(APITestCase):
+    def setUp(self):
+        # 共有キャッシュ（ワーカー間で無効化が届くもの）でのみキャッシュするため、ファイルキャッシュを使う
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = override_settings(
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': cache_dir,
+            }},
+            DASHBOARD_CACHE_TIMEOUT=60,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.organization = create_organization()
+        self.admin = create_user(self.organization, role='ADMIN')
+        self.user = create_user(self.organization)
+        self.client.force_authenticate(self.admin)
+
+    def summary(self):
+        return self.client.get('/api/status/dashboard_summary/')
+
+    def test_second_request_is_served_from_cache(self):
+        self.assertEqual(self.summary()['X-Cache'], 'MISS')
+
+        response = self.summary()
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['total_users'], 1)
+
+    def test_status_write_invalidates_organization_cache(self):
+        self.summary()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record_status(self.user, 'RED')
+        response = self.summary()
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['red_alerts'], 1)
+
+    def test_other_organizations_are_not_invalidated(self):
+        self.summary()
+        other = create_user(create_organization(name='他の組織'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record_status(other, 'RED')
+
+        self.assertEqual(self.summary()['X-Cache'], 'HIT')
+
+    def test_last_login_update_does_not_invalidate(self):
+        self.summary()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.last_login = timezone.now()
+            self.user.save(update_fields=['last_login'])
+
+        self.assertEqual(self.summary()['X-Cache'], 'HIT')
+
+    def test_non_admin_requests_are_not_cached(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.summary()
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.has_header('X-Cache'))
+
+    @override_settings(DASHBOARD_CACHE_TIMEOUT=0)
+    def test_disabled_cache_is_bypassed(self):
+        self.summary()
+
+        self.assertFalse(self.summary().has_header('X-Cache'))
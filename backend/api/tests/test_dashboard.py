@@ -0,0 +1,177 @@
+"""
+管理者ダッシュボード（dashboard_summary / alerts / dashboard_bundle）のテスト
+
+期待値は従来の実装（ユーザーごとに本日の最新記録を StatusLog から取得）と同じ方法で求める。
+"""
+
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import StatusLog, User
+from api.utils.status import today_jst
+from .factories import create_organization, create_user, record_status
+
+
+def baseline_latest_of_today(organization):
+    """従来の実装と同じく、有効化済みの一般ユーザーごとに本日の最新記録を求める"""
+    today = today_jst()
+    latest = {}
+    users = User.objects.filter(organization=organization, role='USER', is_activated=True)
+    for user in users:
+        logs = [
+            log for log in StatusLog.objects.filter(user=user)
+            if timezone.localdate(log.created_at) == today
+        ]
+        if logs:
+            latest[user] = max(logs, key=lambda log: log.created_at)
+    return latest
+
+
+class DashboardTestCase(APITestCase):
+    def setUp(self):
+        self.organization = create_organization('SCHOOL')
+        self.admin = create_user(self.organization, role='ADMIN')
+        self.client.force_authenticate(self.admin)
+        yesterday = timezone.now() - timedelta(days=1)
+
+        self.red = create_user(self.organization, full_name='赤', grade=1, class_name='A組')
+        record_status(self.red, 'GREEN')
+        record_status(self.red, 'RED', comment='つらい')
+        self.recovered = create_user(self.organization, full_name='回復')
+        record_status(self.recovered, 'RED')
+        record_status(self.recovered, 'GREEN')
+        self.yesterday_only = create_user(self.organization, full_name='昨日')
+        record_status(self.yesterday_only, 'RED', created_at=yesterday)
+        self.yellow = create_user(self.organization, full_name='黄')
+        record_status(self.yellow, 'RED', created_at=yesterday)
+        record_status(self.yellow, 'YELLOW')
+        self.not_activated = create_user(self.organization, is_activated=False)
+        record_status(self.not_activated, 'RED')
+        create_user(self.organization, full_name='未記録')
+
+    def add_members(self, count):
+        for i in range(count):
+            user = create_user(self.organization, full_name=f'追加{i}')
+            record_status(user, 'RED' if i % 2 else 'GREEN')
+
+
+class DashboardSummaryTests(DashboardTestCase):
+    def test_matches_baseline(self):
+        latest = baseline_latest_of_today(self.organization)
+        distribution = {'GREEN': 0, 'YELLOW': 0, 'RED': 0}
+        for log in latest.values():
+            distribution[log.status] += 1
+
+        response = self.client.get('/api/status/dashboard_summary/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'total_users': 5,
+            'today_recorded': len(latest),
+            'red_alerts': distribution['RED'],
+            'status_distribution': distribution,
+            'date': today_jst().isoformat(),
+        })
+        self.assertEqual(distribution, {'GREEN': 1, 'YELLOW': 1, 'RED': 1})
+
+    def test_query_count_does_not_grow_with_users(self):
+        with CaptureQueriesContext(connection) as before:
+            self.client.get('/api/status/dashboard_summary/')
+        self.add_members(10)
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get('/api/status/dashboard_summary/')
+
+        self.assertEqual(response.data['total_users'], 15)
+        self.assertEqual(len(after), len(before))
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(self.red)
+
+        response = self.client.get('/api/status/dashboard_summary/')
+
+        self.assertEqual(response.status_code, 403)
+
+
+class AlertsTests(DashboardTestCase):
+    def test_matches_baseline(self):
+        expected = [
+            {
+                'id': str(log.id),
+                'user_id': str(user.id),
+                'user_name': user.full_name,
+                'department': f'{user.grade}年{user.class_name}' if user.grade and user.class_name else '-',
+                'status': 'RED',
+                'comment': log.comment,
+                'created_at': log.created_at.isoformat(),
+            }
+            for user, log in baseline_latest_of_today(self.organization).items()
+            if log.status == 'RED'
+        ]
+
+        response = self.client.get('/api/status/alerts/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.data[0]['department'], '1年A組')
+
+    def test_newest_first_with_filters_and_paging(self):
+        self.add_members(6)
+        response = self.client.get('/api/status/alerts/')
+        created = [alert['created_at'] for alert in response.data]
+        self.assertEqual(created, sorted(created, reverse=True))
+        self.assertEqual(len(response.data), 4)
+
+        page = self.client.get('/api/status/alerts/?limit=2&offset=1')
+        self.assertEqual(page.data, response.data[1:3])
+
+        graded = self.client.get('/api/status/alerts/?grade=1')
+        self.assertEqual([alert['user_id'] for alert in graded.data], [str(self.red.id)])
+
+    def test_invalid_paging_is_rejected(self):
+        for query in ('limit=x', 'offset=-1', 'grade=a'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/status/alerts/?{query}').status_code, 400)
+
+
+class DashboardBundleTests(DashboardTestCase):
+    ENDPOINTS = {
+        'dashboard_summary': '/api/status/dashboard_summary/',
+        'alerts': '/api/status/alerts/',
+        'user_latest_status': '/api/status/user_latest_status/',
+        'trend_data': '/api/status/trend_data/?days=14',
+    }
+
+    def test_sections_match_individual_endpoints(self):
+        self.add_members(4)
+
+        bundle = self.client.get('/api/status/dashboard_bundle/?days=14')
+
+        self.assertEqual(bundle.status_code, 200)
+        self.assertEqual(set(bundle.data), set(self.ENDPOINTS))
+        for section, url in self.ENDPOINTS.items():
+            with self.subTest(section=section):
+                self.assertEqual(bundle.data[section], self.client.get(url).data)
+
+    def test_selected_sections_only(self):
+        response = self.client.get('/api/status/dashboard_bundle/?sections=alerts,trend_data')
+
+        self.assertEqual(set(response.data), {'alerts', 'trend_data'})
+        self.assertEqual(len(response.data['trend_data']), 7)
+
+    def test_unknown_section_is_rejected(self):
+        response = self.client.get('/api/status/dashboard_bundle/?sections=alerts,unknown')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_query_count_does_not_grow_with_users(self):
+        with CaptureQueriesContext(connection) as before:
+            self.client.get('/api/status/dashboard_bundle/')
+        self.add_members(10)
+        with CaptureQueriesContext(connection) as after:
+            self.client.get('/api/status/dashboard_bundle/')
+
+        self.assertEqual(len(after), len(before))
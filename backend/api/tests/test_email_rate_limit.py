@@ -0,0 +1,99 @@
+"""
+メール送信のレート制限（email_rate_limit）と run_email_worker のテスト
+"""
+
+import signal
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from api.models import EmailOutbox, EmailRateLimit
+from api.utils.email_rate_limit import (
+    LIMITER_KEY, acquire_email_tokens, daily_limit_reached, release_email_tokens,
+)
+from .factories import create_organization, create_user
+from .test_outbox import create_emails
+
+
+def set_state(tokens=1000, rate=100, day_count=0):
+    EmailRateLimit.objects.update_or_create(key=LIMITER_KEY, defaults={
+        'rate': rate,
+        'tokens': tokens,
+        'updated_at': timezone.now(),
+        'day': timezone.localdate(),
+        'day_count': day_count,
+    })
+
+
+@override_settings(EMAIL_RATE_LIMIT_PER_SECOND=100, EMAIL_RATE_LIMIT_BURST=1000, EMAIL_DAILY_LIMIT=0)
+class AcquireEmailTokensTests(TestCase):
+    def test_waits_for_one_second_of_tokens(self):
+        set_state(tokens=5)
+
+        self.assertEqual(acquire_email_tokens(500), 0)
+        self.assertEqual(acquire_email_tokens(3), 3)
+
+    def test_grants_up_to_count(self):
+        set_state(tokens=1000)
+
+        self.assertEqual(acquire_email_tokens(300), 300)
+        self.assertEqual(EmailRateLimit.objects.get().day_count, 300)
+
+    @override_settings(EMAIL_DAILY_LIMIT=103)
+    def test_grants_the_rest_of_the_daily_quota_below_rate(self):
+        set_state(tokens=1000, day_count=100)
+
+        self.assertEqual(acquire_email_tokens(500), 3)
+        self.assertTrue(daily_limit_reached())
+        self.assertEqual(acquire_email_tokens(500), 0)
+
+    @override_settings(EMAIL_DAILY_LIMIT=100)
+    def test_release_returns_unused_quota(self):
+        set_state(tokens=1000, day_count=90)
+        granted = acquire_email_tokens(500)
+
+        release_email_tokens(granted - 4)
+
+        self.assertEqual((granted, EmailRateLimit.objects.get().day_count), (10, 94))
+        self.assertFalse(daily_limit_reached())
+
+    @override_settings(EMAIL_DAILY_LIMIT=100)
+    def test_daily_limit_resets_on_a_new_day(self):
+        set_state(day_count=100)
+        EmailRateLimit.objects.update(day=timezone.localdate() - timedelta(days=1))
+
+        self.assertFalse(daily_limit_reached())
+        self.assertEqual(acquire_email_tokens(50), 50)
+
+
+@override_settings(
+    DEBUG=True,
+    SENDGRID_API_KEY='',
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    EMAIL_RATE_LIMIT_PER_SECOND=100,
+    EMAIL_RATE_LIMIT_BURST=1000,
+    EMAIL_DAILY_LIMIT=2,
+)
+class RunEmailWorkerOnceTests(TransactionTestCase):
+    # deliver_outbox は close_old_connections() で接続を閉じるため、テストをトランザクションで包まない
+
+    def setUp(self):
+        # run_email_worker が登録するシグナルハンドラーを元に戻す
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+
+    def test_exits_when_the_daily_limit_is_reached(self):
+        create_emails(create_user(create_organization()), 5)
+        output = StringIO()
+
+        # 上限に達した後に待機（ポーリング）したら失敗させる
+        with mock.patch('api.management.commands.run_email_worker.time.sleep', side_effect=AssertionError('polled')):
+            call_command('run_email_worker', once=True, poll_interval=0, stdout=output)
+
+        self.assertEqual(EmailOutbox.objects.filter(status='SENT').count(), 2)
+        self.assertEqual(EmailOutbox.objects.filter(status='PENDING').count(), 3)
+        self.assertIn('EMAIL_DAILY_LIMIT', output.getvalue())
@@ -0,0 +1,197 @@
+"""
+ステータス出力（export_csv・出力ジョブ）のテスト
+"""
+
+import csv
+import io
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from api.models import ExportJob
+from api.utils.export import CSV_BOM, XLSX_CONTENT_TYPE, delete_expired_exports, stream_csv
+from api.utils.jobs import run_next_job
+from api.utils.status import JST
+from .factories import create_organization, create_user, record_status
+
+
+def jst(*args):
+    return JST.localize(datetime(*args))
+
+
+class ExportFixture:
+    """学校の組織（記録のあるメンバー2人・記録のないメンバー1人・無効化済み1人）"""
+
+    def setUp(self):
+        self.organization = create_organization()
+        self.admin = create_user(self.organization, role='ADMIN')
+        self.aoki = create_user(self.organization, full_name='青木', grade=1, class_name='A組')
+        self.ito = create_user(self.organization, full_name='伊藤', grade=2, class_name='B組')
+        self.ueda = create_user(self.organization, full_name='上田', grade=1, class_name='A組')
+        inactive = create_user(self.organization, full_name='江藤', is_active=False)
+
+        record_status(self.aoki, 'GREEN', comment='元気', created_at=jst(2026, 4, 1, 8, 0))
+        record_status(self.aoki, 'RED', comment='', created_at=jst(2026, 4, 2, 23, 30))
+        record_status(self.ito, 'YELLOW', comment='眠い', created_at=jst(2026, 4, 2, 9, 15))
+        record_status(self.ito, 'GREEN', created_at=jst(2026, 4, 3, 0, 10))  # 期間外
+        record_status(inactive, 'RED', created_at=jst(2026, 4, 1, 12, 0))
+        self.client.force_authenticate(self.admin)
+
+
+class CsvExportTests(ExportFixture, APITestCase):
+    def get_csv(self, **params):
+        response = self.client.get('/api/status/export_csv/', {'format': 'csv', **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(body.startswith(CSV_BOM))
+        return response, list(csv.reader(io.StringIO(body[len(CSV_BOM):])))
+
+    def test_period_mode_uses_japan_dates(self):
+        response, rows = self.get_csv(start_date='2026-04-01', end_date='2026-04-02')
+
+        self.assertIn('user_status_2026-04-01_2026-04-02.csv', response['Content-Disposition'])
+        self.assertEqual(rows, [
+            ['氏名', '学年', '組・クラス', 'ステータス', 'コメント', '記録日時'],
+            ['伊藤', '2', 'B組', '注意', '眠い', '2026-04-02 09:15:00'],
+            ['青木', '1', 'A組', '健康', '元気', '2026-04-01 08:00:00'],
+            ['青木', '1', 'A組', '警告', '-', '2026-04-02 23:30:00'],
+        ])
+
+    def test_latest_mode_lists_members_without_logs(self):
+        _, rows = self.get_csv()
+
+        self.assertEqual(rows[0][3], '最新ステータス')
+        self.assertEqual(rows[1:], [
+            ['上田', '1', 'A組', '-', '-', '-'],
+            ['伊藤', '2', 'B組', '健康', '', '2026-04-03 00:10:00'],
+            ['青木', '1', 'A組', '警告', '', '2026-04-02 23:30:00'],
+        ])
+
+    def test_filters_apply(self):
+        _, rows = self.get_csv(start_date='2026-04-01', end_date='2026-04-30', grade='1', status='RED')
+
+        self.assertEqual([row[:4] for row in rows[1:]], [['青木', '1', 'A組', '警告']])
+
+    def test_stream_csv_flushes_in_chunks(self):
+        chunks = list(stream_csv(['a'], ([i] for i in range(5)), flush_rows=2))
+
+        self.assertEqual(len(chunks), 4)  # ヘッダー + 2行 + 2行 + 1行
+        self.assertEqual(b''.join(chunks).decode('utf-8'), CSV_BOM + 'a\r\n0\r\n1\r\n2\r\n3\r\n4\r\n')
+
+    def test_invalid_format_returns_400(self):
+        response = self.client.get('/api/status/export_csv/', {'format': 'pdf'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_members_cannot_export(self):
+        self.client.force_authenticate(self.aoki)
+
+        response = self.client.get('/api/status/export_csv/', {'format': 'csv'})
+
+        self.assertEqual(response.status_code, 403)
+
+
+class XlsxExportTests(ExportFixture, APITestCase):
+    def get_sheet(self, **params):
+        from openpyxl import load_workbook
+
+        response = self.client.get('/api/status/export_csv/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], XLSX_CONTENT_TYPE)
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(len(workbook.worksheets), 1)
+        return response, workbook.worksheets[0]
+
+    def test_period_mode_is_default_format(self):
+        response, sheet = self.get_sheet(start_date='2026-04-01', end_date='2026-04-02')
+
+        self.assertIn('user_status_2026-04-01_2026-04-02.xlsx', response['Content-Disposition'])
+        self.assertEqual(sheet.title, 'ステータス記録')
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(rows[0], ('氏名', '学年', '組・クラス', 'ステータス', 'コメント', '記録日時'))
+        self.assertEqual(rows[1:], [
+            ('伊藤', 2, 'B組', '注意', '眠い', datetime(2026, 4, 2, 9, 15)),
+            ('青木', 1, 'A組', '健康', '元気', datetime(2026, 4, 1, 8, 0)),
+            ('青木', 1, 'A組', '警告', '-', datetime(2026, 4, 2, 23, 30)),
+        ])
+
+    def test_header_and_datetime_use_named_styles(self):
+        _, sheet = self.get_sheet(start_date='2026-04-01', end_date='2026-04-02')
+
+        self.assertTrue(sheet['A1'].font.bold)
+        self.assertEqual(sheet['A1'].fill.start_color.rgb[-6:], '4472C4')
+        self.assertEqual(sheet['F2'].number_format, 'yyyy-mm-dd hh:mm:ss')
+        self.assertEqual(sheet.column_dimensions['E'].width, 40)
+
+    def test_latest_mode(self):
+        _, sheet = self.get_sheet()
+
+        self.assertEqual(sheet.title, '最新ステータス')
+        self.assertEqual([row[0] for row in sheet.iter_rows(min_row=2, values_only=True)], ['上田', '伊藤', '青木'])
+
+
+class ExportJobTests(ExportFixture, APITransactionTestCase):
+    # run_next_job は close_old_connections() で接続を閉じるため、テストをトランザクションで包まない
+
+    def setUp(self):
+        self.export_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_root, ignore_errors=True)
+        settings_override = override_settings(EXPORT_ROOT=self.export_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+    def create_job(self, **params):
+        response = self.client.post('/api/status/export_jobs/', params, format='json')
+        self.assertEqual(response.status_code, 202)
+        return response.data['id']
+
+    def detail(self, job_id):
+        return self.client.get(f'/api/status/export_jobs/{job_id}/')
+
+    def test_worker_creates_downloadable_file(self):
+        params = {'format': 'csv', 'start_date': '2026-04-01', 'end_date': '2026-04-02'}
+        job_id = self.create_job(**params)
+        pending = self.detail(job_id).data
+        self.assertEqual((pending['status'], pending['progress'], pending['download_url']), ('PENDING', None, None))
+        self.assertEqual(self.client.get(f'/api/status/export_jobs/{job_id}/download/').status_code, 409)
+
+        self.assertTrue(run_next_job())
+
+        job = self.detail(job_id).data
+        self.assertEqual(job['status'], 'SUCCEEDED')
+        self.assertEqual((job['total_rows'], job['rows_processed'], job['progress']), (3, 3, 100))
+        self.assertEqual(job['file_name'], 'user_status_2026-04-01_2026-04-02.csv')
+        download = self.client.get(job['download_url'])
+        self.assertEqual(download.status_code, 200)
+        direct = self.client.get('/api/status/export_csv/', params)
+        self.assertEqual(b''.join(download.streaming_content), b''.join(direct.streaming_content))
+        self.assertFalse(run_next_job())
+
+    def test_expired_file_is_gone(self):
+        job_id = self.create_job(format='xlsx')
+        run_next_job()
+        job = ExportJob.objects.get(id=job_id)
+        ExportJob.objects.filter(id=job_id).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(delete_expired_exports(), 1)
+        self.assertFalse((Path(self.export_root) / job.file_path).exists())
+        self.assertEqual(self.client.get(f'/api/status/export_jobs/{job_id}/download/').status_code, 410)
+
+    def test_jobs_of_other_organizations_are_not_found(self):
+        job_id = self.create_job(format='csv')
+        self.client.force_authenticate(create_user(create_organization(), role='ADMIN'))
+
+        self.assertEqual(self.detail(job_id).status_code, 404)
+        self.assertEqual(self.client.get('/api/status/export_jobs/').data, [])
+
+    def test_invalid_options_return_400(self):
+        response = self.client.post('/api/status/export_jobs/', {'format': 'pdf'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ExportJob.objects.exists())
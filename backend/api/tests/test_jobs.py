@@ -0,0 +1,95 @@
+"""
+バックグラウンドジョブのキュー（run_worker）のテスト
+"""
+
+import time
+from datetime import timedelta
+
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from api.models import BulkUploadJob, ExportJob
+from api.utils.jobs import _job_types_by_age, heartbeat_in_background, run_next_job
+from .factories import create_organization
+
+STALE_AFTER = timedelta(minutes=5)
+
+
+def create_job(model, age=timedelta(0), **fields):
+    if model is BulkUploadJob:
+        fields.setdefault('file_name', 'roster.csv')
+    job = model.objects.create(organization=create_organization(), **fields)
+    model.objects.filter(pk=job.pk).update(created_at=timezone.now() - age)
+    job.refresh_from_db()
+    return job
+
+
+class JobQueueTests(TestCase):
+    def test_oldest_job_type_runs_first(self):
+        create_job(BulkUploadJob, age=timedelta(minutes=1))
+        create_job(ExportJob, age=timedelta(minutes=2))
+
+        self.assertEqual([model for model, _ in _job_types_by_age(STALE_AFTER)], [ExportJob, BulkUploadJob])
+
+    def test_empty_types_are_skipped(self):
+        create_job(BulkUploadJob)
+
+        self.assertEqual([model for model, _ in _job_types_by_age(STALE_AFTER)], [BulkUploadJob])
+
+    def test_only_stale_running_jobs_are_reclaimed(self):
+        now = timezone.now()
+        create_job(ExportJob, status='RUNNING', heartbeat_at=now)
+        stale = create_job(ExportJob, status='RUNNING', heartbeat_at=now - STALE_AFTER * 2, attempts=1)
+
+        claimed = ExportJob.claim_next(STALE_AFTER)
+
+        self.assertEqual((claimed.pk, claimed.attempts), (stale.pk, 2))
+        self.assertIsNone(ExportJob.claim_next(STALE_AFTER))
+
+    def test_finished_jobs_are_not_claimed(self):
+        create_job(ExportJob, status='SUCCEEDED')
+        create_job(ExportJob, status='FAILED')
+
+        self.assertIsNone(ExportJob.oldest_claimable_at(STALE_AFTER))
+        self.assertIsNone(ExportJob.claim_next(STALE_AFTER))
+
+
+class JobProgressTests(TestCase):
+    def test_progress_from_processed_rows(self):
+        cases = [
+            (ExportJob(total_rows=None, rows_processed=0), None),
+            (ExportJob(total_rows=0, rows_processed=0), None),
+            (BulkUploadJob(total_rows=3, rows_processed=2), 66),
+            (BulkUploadJob(total_rows=3, rows_processed=5), 100),
+            (ExportJob(status='SUCCEEDED', total_rows=None), 100),
+        ]
+        for job, expected in cases:
+            with self.subTest(job=type(job).__name__, total_rows=job.total_rows, rows_processed=job.rows_processed):
+                self.assertEqual(job.progress, expected)
+
+
+class RunNextJobTests(TransactionTestCase):
+    # run_next_job は close_old_connections() で接続を閉じるため、テストをトランザクションで包まない
+
+    def test_gives_up_after_max_attempts(self):
+        job = create_job(
+            ExportJob, status='RUNNING', attempts=ExportJob.MAX_ATTEMPTS,
+            heartbeat_at=timezone.now() - timedelta(days=1),
+        )
+
+        self.assertTrue(run_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('FAILED', '実行回数の上限に達しました'))
+        self.assertFalse(run_next_job())
+
+    def test_heartbeat_thread_touches_running_job(self):
+        job = create_job(ExportJob, status='RUNNING', heartbeat_at=timezone.now() - timedelta(hours=1))
+        before = job.heartbeat_at
+
+        with heartbeat_in_background(job, interval=0.01):
+            deadline = timezone.now() + timedelta(seconds=5)
+            while ExportJob.objects.get(pk=job.pk).heartbeat_at == before and timezone.now() < deadline:
+                time.sleep(0.01)
+
+        self.assertGreater(ExportJob.objects.get(pk=job.pk).heartbeat_at, before)
@@ -0,0 +1,60 @@
+"""
+StatusLog.local_date（日本時間の記録日）のテスト
+"""
+
+import importlib
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+
+from api.models import StatusLog
+from .factories import create_organization, create_user
+
+migration_0005 = importlib.import_module('api.migrations.0005_statuslog_local_date')
+
+
+class LocalDateFieldTests(TestCase):
+    def test_uses_japan_date_of_created_at(self):
+        log = StatusLog(created_at=datetime(2026, 1, 1, 15, 30, tzinfo=dt_timezone.utc))
+
+        value = StatusLog._meta.get_field('local_date').pre_save(log, add=True)
+
+        self.assertEqual(value, date(2026, 1, 2))
+        self.assertEqual(log.local_date, date(2026, 1, 2))
+
+    def test_set_on_bulk_create(self):
+        user = create_user(create_organization())
+
+        StatusLog.objects.bulk_create([StatusLog(user=user, status='GREEN')])
+
+        self.assertFalse(StatusLog.objects.filter(local_date__isnull=True).exists())
+
+
+class LocalDateMigrationTests(TestCase):
+    def test_rows_added_during_backfill_are_filled_before_not_null(self):
+        user = create_user(create_organization())
+        log = StatusLog.objects.create(user=user, status='GREEN')
+        StatusLog.objects.filter(pk=log.pk).update(
+            created_at=datetime(2026, 1, 1, 15, 30, tzinfo=dt_timezone.utc)
+        )
+
+        with connection.cursor() as cursor:
+            # 遅延された外部キー検査を済ませておく（保留中のトリガーがあると ALTER TABLE できない）
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+        with connection.schema_editor(atomic=False) as schema_editor:
+            # バックフィル後に旧コードが local_date なしで追加した行を再現する
+            migration_0005.drop_local_date_not_null(apps, schema_editor)
+            StatusLog.objects.filter(pk=log.pk).update(local_date=None)
+
+            migration_0005.set_local_date_not_null(apps, schema_editor)
+
+        self.assertEqual(StatusLog.objects.get(pk=log.pk).local_date, date(2026, 1, 2))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT is_nullable FROM information_schema.columns "
+                "WHERE table_name = 'status_logs' AND column_name = 'local_date'"
+            )
+            self.assertEqual(cursor.fetchone()[0], 'NO')
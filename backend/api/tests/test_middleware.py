@@ -0,0 +1,48 @@
+"""
+QueryInstrumentationMiddleware のテスト
+"""
+
+import json
+
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from .factories import create_organization, create_user, record_status
+
+
+@override_settings(QUERY_INSTRUMENTATION_ENABLED=True)
+class QueryInstrumentationMiddlewareTests(APITestCase):
+    def setUp(self):
+        organization = create_organization()
+        self.admin = create_user(organization, role='ADMIN')
+        record_status(create_user(organization), 'GREEN')
+        self.client.force_authenticate(self.admin)
+
+    def metrics(self, logs):
+        line = next(message for message in logs.output if 'request_metrics' in message)
+        return json.loads(line.split('request_metrics ', 1)[1])
+
+    def test_reports_queries_in_header_and_log(self):
+        with self.assertLogs('api.performance', level='INFO') as logs:
+            response = self.client.get('/api/status/')
+
+        self.assertEqual(response.status_code, 200)
+        record = self.metrics(logs)
+        self.assertEqual(record['endpoint'], 'status-list')
+        self.assertGreater(record['query_count'], 0)
+        self.assertIn(f'desc="{record["query_count"]} queries"', response['Server-Timing'])
+        self.assertFalse(any('query_budget_exceeded' in message for message in logs.output))
+
+    @override_settings(QUERY_BUDGETS={'status-list': 0})
+    def test_warns_when_budget_is_exceeded(self):
+        with self.assertLogs('api.performance', level='WARNING') as logs:
+            self.client.get('/api/status/')
+
+        warning = json.loads(logs.output[0].split('query_budget_exceeded ', 1)[1])
+        self.assertEqual((warning['endpoint'], warning['query_budget']), ('status-list', 0))
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=False)
+    def test_disabled_by_default(self):
+        response = self.client.get('/api/status/')
+
+        self.assertNotIn('Server-Timing', response)
@@ -0,0 +1,149 @@
+"""
+EmailOutbox（claim_batch・deliver_outbox）のテスト
+"""
+
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from api.models import EmailOutbox
+from api.utils import email as email_utils
+from api.utils.email import send_emails
+from api.utils.outbox import deliver_outbox
+from .factories import create_organization, create_user
+
+STALE_AFTER = timedelta(minutes=5)
+
+
+def create_emails(user, count, **fields):
+    return EmailOutbox.objects.bulk_create([
+        EmailOutbox(
+            kind='INVITE',
+            organization_id=user.organization_id,
+            user=user,
+            to_email=user.email,
+            to_name=user.full_name,
+            action_url=f'http://localhost:3000/invite/{i}',
+            **fields,
+        )
+        for i in range(count)
+    ])
+
+
+class ClaimBatchTests(TestCase):
+    def setUp(self):
+        self.user = create_user(create_organization())
+
+    def test_claimed_emails_are_not_returned_again(self):
+        create_emails(self.user, 5)
+
+        first = EmailOutbox.claim_batch(3, STALE_AFTER)
+        second = EmailOutbox.claim_batch(10, STALE_AFTER)
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({email.pk for email in first} & {email.pk for email in second})
+        self.assertEqual(EmailOutbox.claim_batch(10, STALE_AFTER), [])
+        self.assertEqual(EmailOutbox.objects.filter(status='SENDING', attempts=1).count(), 5)
+
+    def test_skips_emails_that_are_not_due(self):
+        create_emails(self.user, 2, next_attempt_at=timezone.now() + timedelta(minutes=1))
+
+        self.assertEqual(EmailOutbox.claim_batch(10, STALE_AFTER), [])
+
+    def test_reclaims_stale_sending_emails(self):
+        stale, fresh = create_emails(self.user, 2, status='SENDING')
+        EmailOutbox.objects.filter(pk=stale.pk).update(claimed_at=timezone.now() - STALE_AFTER * 2)
+        EmailOutbox.objects.filter(pk=fresh.pk).update(claimed_at=timezone.now())
+
+        claimed = EmailOutbox.claim_batch(10, STALE_AFTER)
+
+        self.assertEqual([email.pk for email in claimed], [stale.pk])
+
+
+class ConcurrentClaimBatchTests(TransactionTestCase):
+    """複数のワーカーが同時に取得しても、同じメールを二重に取得しない"""
+
+    # 取得済みのメールを再取得する競合は1件ずつ取り合うときに起きやすい
+    WORKERS = 8
+    EMAILS = 400
+
+    def test_concurrent_claims_do_not_overlap(self):
+        user = create_user(create_organization())
+        create_emails(user, self.EMAILS)
+        barrier = threading.Barrier(self.WORKERS)
+        claimed = []
+
+        def worker():
+            try:
+                barrier.wait()
+                while True:
+                    emails = EmailOutbox.claim_batch(1, STALE_AFTER)
+                    if not emails:
+                        break
+                    claimed.extend(email.pk for email in emails)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(claimed), self.EMAILS)
+        self.assertEqual(len(set(claimed)), self.EMAILS)
+        self.assertFalse(EmailOutbox.objects.exclude(attempts=1).exists())
+
+
+@override_settings(
+    DEBUG=True,
+    SENDGRID_API_KEY='',
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class SmtpFallbackTests(TransactionTestCase):
+    # deliver_outbox は close_old_connections() で接続を閉じるため、テストをトランザクションで包まない
+
+    def setUp(self):
+        organization = create_organization()
+        self.users = [create_user(organization) for _ in range(3)]
+        self.failing = self.users[1].email
+        send_via_smtp = email_utils._send_via_smtp
+
+        def fail_one(user_email, user_name, invite_url):
+            if user_email == self.failing:
+                return False
+            return send_via_smtp(user_email, user_name, invite_url)
+
+        patcher = mock.patch.object(email_utils, '_send_via_smtp', side_effect=fail_one)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_send_emails_returns_result_per_recipient(self):
+        recipients = [(user.email, user.full_name, 'http://localhost:3000/invite/x') for user in self.users]
+
+        result = send_emails('INVITE', recipients)
+
+        self.assertFalse(result['sent'])
+        self.assertEqual([recipient['sent'] for recipient in result['recipients']], [True, False, True])
+        self.assertEqual([recipient['retry'] for recipient in result['recipients']], [False, True, False])
+
+    def test_only_failed_recipients_are_retried(self):
+        for user in self.users:
+            create_emails(user, 1)
+
+        self.assertEqual(deliver_outbox(batch_size=10), 3)
+
+        statuses = dict(EmailOutbox.objects.values_list('to_email', 'status'))
+        self.assertEqual(statuses, {
+            self.users[0].email: 'SENT', self.failing: 'PENDING', self.users[2].email: 'SENT',
+        })
+        self.assertEqual(len(mail.outbox), 2)
+        retry = EmailOutbox.objects.get(to_email=self.failing)
+        self.assertGreater(retry.next_attempt_at, timezone.now())
+        self.assertEqual(retry.last_error, 'SMTP送信に失敗しました')
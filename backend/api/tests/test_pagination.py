@@ -0,0 +1,79 @@
+"""
+KeysetPagination のテスト
+"""
+
+import json
+from base64 import b64encode
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import StatusLog, User
+from .factories import create_organization, create_user
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        organization = create_organization()
+        self.admin = create_user(organization, role='ADMIN')
+        user = create_user(organization)
+        logs = [StatusLog.objects.create(user=user, status='GREEN') for _ in range(7)]
+        # 同じ created_at の行を含める（id で順序付けられること）
+        base = timezone.now() - timedelta(days=1)
+        for i, log in enumerate(logs):
+            StatusLog.objects.filter(pk=log.pk).update(created_at=base + timedelta(minutes=i // 3))
+        self.client.force_authenticate(self.admin)
+
+    def _walk(self, order):
+        ids = []
+        url = f'/api/status/?pagination=cursor&page_size=2&order={order}'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 2)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_cursor_round_trip_returns_every_row_once(self):
+        for order, ordering in (('desc', ('-created_at', '-id')), ('asc', ('created_at', 'id'))):
+            with self.subTest(order=order):
+                expected = [str(pk) for pk in StatusLog.objects.order_by(*ordering).values_list('id', flat=True)]
+                self.assertEqual(self._walk(order), expected)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get('/api/status/?pagination=cursor&cursor=not-a-cursor')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_with_invalid_id_returns_404(self):
+        for pk in ('x', 1, None):
+            with self.subTest(pk=pk):
+                payload = json.dumps({'t': timezone.now().isoformat(), 'id': pk})
+                cursor = b64encode(payload.encode('utf-8')).decode('ascii')
+
+                response = self.client.get(f'/api/status/?pagination=cursor&cursor={cursor}')
+
+                self.assertEqual(response.status_code, 404)
+
+
+class UserKeysetPaginationTests(APITestCase):
+    def test_cursor_walks_every_member_once(self):
+        organization = create_organization()
+        admin = create_user(organization, role='ADMIN')
+        for _ in range(4):
+            create_user(organization)
+        create_user(create_organization())  # 他の組織のユーザーは含まれない
+        self.client.force_authenticate(admin)
+
+        ids = []
+        url = '/api/users/?pagination=cursor&page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+
+        expected = User.objects.filter(organization=organization).order_by('-created_at', '-id')
+        self.assertEqual(ids, [str(pk) for pk in expected.values_list('id', flat=True)])
@@ -0,0 +1,188 @@
+"""
+ステータス記録一覧と非正規化テーブル（UserLatestStatus / DailyStatusAggregate）のテスト
+"""
+
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from api.models import DailyStatusAggregate, StatusLog, UserLatestStatus
+from api.serializers import StatusLogSerializer
+from api.utils.status import rebuild_daily_aggregates, today_jst
+from .factories import create_organization, create_user, record_status
+
+
+class UserLatestStatusTests(APITestCase):
+    def setUp(self):
+        self.organization = create_organization()
+        self.user = create_user(self.organization)
+
+    def latest(self):
+        return UserLatestStatus.objects.get(user=self.user)
+
+    def test_status_post_updates_latest_row(self):
+        self.client.force_authenticate(self.user)
+
+        for status in ('GREEN', 'RED'):
+            response = self.client.post('/api/status/', {'status': status, 'comment': status}, format='json')
+            self.assertEqual(response.status_code, 201)
+
+        latest = self.latest()
+        self.assertEqual((latest.status, latest.comment), ('RED', 'RED'))
+        self.assertEqual(str(latest.status_log_id), response.data['id'])
+
+    def test_older_log_does_not_replace_latest(self):
+        newest = record_status(self.user, 'GREEN')
+        record_status(self.user, 'RED', created_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(self.latest().status_log_id, newest.id)
+
+    def test_deleting_latest_log_falls_back_to_previous(self):
+        previous = record_status(self.user, 'YELLOW', created_at=timezone.now() - timedelta(days=1))
+        latest = record_status(self.user, 'RED')
+        self.client.force_authenticate(self.user)
+
+        response = self.client.delete(f'/api/status/{latest.id}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.latest().status_log_id, previous.id)
+
+
+class CheckLatestStatusCommandTests(TestCase):
+    def test_detects_and_fixes_drift(self):
+        user = create_user(create_organization())
+        older = record_status(user, 'RED', created_at=timezone.now() - timedelta(days=1))
+        log = record_status(user, 'GREEN')
+        UserLatestStatus.record(older)
+
+        with self.assertRaises(CommandError):
+            call_command('check_latest_status', stdout=StringIO())
+        call_command('check_latest_status', '--fix', stdout=StringIO())
+        call_command('check_latest_status', stdout=StringIO())
+
+        self.assertEqual(UserLatestStatus.objects.get(user=user).status_log_id, log.id)
+        self.assertEqual(UserLatestStatus.objects.get(user=user).status, 'GREEN')
+
+
+class DailyStatusAggregateTests(APITestCase):
+    def setUp(self):
+        self.organization = create_organization()
+        self.admin = create_user(self.organization, role='ADMIN')
+        self.users = [create_user(self.organization) for _ in range(3)]
+
+    def counts(self, date=None):
+        date = date or today_jst()
+        return dict(
+            DailyStatusAggregate.objects
+            .filter(organization=self.organization, date=date)
+            .exclude(count=0)
+            .values_list('status', 'count')
+        )
+
+    def assert_matches_rebuild(self, date=None):
+        date = date or today_jst()
+        incremental = self.counts(date)
+        rebuild_daily_aggregates(date, date, organization_id=self.organization.id)
+        self.assertEqual(incremental, self.counts(date))
+
+    def test_last_status_of_day_is_counted(self):
+        record_status(self.users[0], 'GREEN')
+        record_status(self.users[0], 'RED')
+        record_status(self.users[1], 'RED')
+        record_status(self.users[2], 'YELLOW', created_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(self.counts(), {'RED': 2})
+        self.assert_matches_rebuild()
+        self.assert_matches_rebuild(today_jst() - timedelta(days=1))
+
+    def test_second_log_on_a_day_without_rollup_rows(self):
+        # マイグレーション直後（rebuild_daily_aggregates 前）・集計がずれた状態を再現する
+        record_status(self.users[0], 'GREEN')
+        DailyStatusAggregate.objects.all().delete()
+        self.client.force_authenticate(self.users[0])
+
+        response = self.client.post('/api/status/', {'status': 'RED', 'comment': ''}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.counts(), {'RED': 1})
+        self.assertEqual(
+            DailyStatusAggregate.objects.get(organization=self.organization, status='GREEN').count, 0
+        )
+
+    def test_only_active_members_are_counted(self):
+        self.users[0].is_active = False
+        self.users[0].save()
+        record_status(self.users[0], 'RED')
+        record_status(self.users[1], 'GREEN')
+
+        self.assertEqual(self.counts(), {'GREEN': 1})
+        self.assert_matches_rebuild()
+
+    def test_deleting_a_user_rebuilds_their_days(self):
+        yesterday = timezone.now() - timedelta(days=1)
+        record_status(self.users[0], 'RED', created_at=yesterday)
+        record_status(self.users[0], 'RED')
+        record_status(self.users[1], 'RED')
+
+        self.users[0].delete()
+
+        self.assertEqual(self.counts(), {'RED': 1})
+        self.assertEqual(self.counts(timezone.localdate(yesterday)), {})
+
+    def test_trend_data_reads_the_rollup(self):
+        record_status(self.users[0], 'RED', created_at=timezone.now() - timedelta(days=1))
+        record_status(self.users[1], 'GREEN')
+        self.client.force_authenticate(self.admin)
+
+        response = self.client.get('/api/status/trend_data/?days=7')
+
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(response.data[-1], {
+            'date': today_jst().isoformat(), 'green': 1, 'yellow': 0, 'red': 0, 'total': 1,
+        })
+        self.assertEqual(response.data[-2]['red'], 1)
+
+
+class StatusLogListTests(APITestCase):
+    def setUp(self):
+        self.organization = create_organization()
+        self.admin = create_user(self.organization, role='ADMIN')
+        self.client.force_authenticate(self.admin)
+
+    def add_logs(self, count):
+        for i in range(count):
+            record_status(create_user(self.organization, full_name=f'メンバー{i}'), 'YELLOW', comment=f'c{i}')
+
+    def test_matches_status_log_serializer(self):
+        self.add_logs(3)
+        record_status(create_user(create_organization()), 'RED')  # 他の組織の記録は含まれない
+
+        response = self.client.get('/api/status/')
+
+        self.assertEqual(response.status_code, 200)
+        logs = StatusLog.objects.filter(user__organization=self.organization).order_by('-created_at', '-id')
+        expected = json.loads(JSONRenderer().render(StatusLogSerializer(logs, many=True).data))
+        self.assertEqual(
+            sorted(response.json()['results'], key=lambda row: row['id']),
+            sorted(expected, key=lambda row: row['id']),
+        )
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.add_logs(2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/status/')
+        self.add_logs(20)
+
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/api/status/')
+
+        self.assertEqual(len(response.json()['results']), 22)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
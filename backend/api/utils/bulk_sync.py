@@ -0,0 +1,279 @@
+"""
+名簿の差分同期（bulk_upload の mode=sync）
+
+アップロードした名簿（ファイル全体）と組織の現在のユーザーをキーで突き合わせ、差分だけを反映する:
+- 新規: ユーザーを作成して招待する（通常の一括登録と同じ）
+- 変更: 値が変わったフィールドだけを更新する（変更がない行は書き込まず、招待トークンも再発行しない）
+- 名簿にないユーザー: deactivate_missing の場合のみ is_active=False にする（ログイン不可・ダッシュボード・エクスポートの対象外）
+
+キーは email、または学校は student_number・企業は employee_number。
+ファイル全体で差分を取るため、BulkUploadJob（チャンク単位の取り込み）では使わない。
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import InviteToken, User
+from .bulk_upload import (
+    INVITE_EXPIRES_DAYS,
+    UPDATABLE_FIELDS,
+    WRITE_BATCH_SIZE,
+    format_serializer_errors,
+    new_invited_user,
+    prepare_rows,
+)
+from .bulk_validation import ordered_field_errors, unique_email_message, validate_user_rows
+from .cache import bump_org_cache_version, bump_user_auth_versions
+from .outbox import enqueue_invites
+from .status import rebuild_daily_aggregates_for_users
+
+# 組織タイプごとに使えるキー
+SYNC_KEYS = {
+    'SCHOOL': ('email', 'student_number'),
+    'COMPANY': ('email', 'employee_number'),
+}
+
+
+def _key_label(key):
+    return 'メールアドレス' if key == 'email' else str(User._meta.get_field(key).verbose_name)
+
+
+def _normalize_key(key, value):
+    """キーの値を突き合わせ用に正規化（空は None）"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if key == 'email':
+        value = value.lower()
+    return value or None
+
+
+def _collect_keys(rows, key, file_keys):
+    """行をそのまま返しつつ、ファイルに含まれるキーを集める（検証エラーの行も含む）"""
+    for row in rows:
+        file_keys.add(_normalize_key(key, row.get(key)))
+        yield row
+
+
+def diff_user_rows(organization, rows, first_row_num=2, key='email', deactivate_missing=False):
+    """
+    アップロードした名簿と組織のユーザーの差分を計算する（DB への書き込みはしない）
+
+    Args:
+        organization: 同期する組織
+        rows: 列名 → 値 の dict のイテラブル（iter_upload_rows のジェネレーターも可）
+        first_row_num: 最初の行のファイル上の行番号（エラー表示用）
+        key: 突き合わせに使う列（SYNC_KEYS）
+        deactivate_missing: 名簿にない一般ユーザーを無効化の対象にするか
+
+    Returns:
+        dict: key, creates [(row_num, User)], updates [(row_num, User, {field: (変更前, 変更後)})],
+            unchanged（変更のない行数）, deactivations [User], reinvites [User], errors
+            ※ User は未保存（変更後の値を設定済み）
+    """
+    if key not in SYNC_KEYS[organization.org_type]:
+        raise ValueError(f'この組織では {key} をキーに使えません')
+
+    label = _key_label(key)
+    file_keys = set()
+    prepared, errors = prepare_rows(organization, _collect_keys(rows, key, file_keys), first_row_num)
+    cleaned = validate_user_rows([validated_row for _, _, validated_row in prepared])
+
+    # 組織の一般ユーザー（管理者は同期の対象外）
+    members = list(User.objects.filter(organization=organization, role='USER'))
+    member_keys = {member.pk: _normalize_key(key, getattr(member, key)) for member in members}
+    members_by_key = {}
+    for member in members:
+        if member_keys[member.pk] is not None:
+            members_by_key.setdefault(member_keys[member.pk], []).append(member)
+
+    # メールアドレスを使っている既存ユーザー（他組織・管理者を含む）
+    emails = [data['email'] for data, field_errors in cleaned if 'email' in data]
+    email_owners = dict(User.objects.filter(email__in=emails).values_list('email', 'id'))
+
+    diff = {
+        'key': key,
+        'creates': [],
+        'updates': [],
+        'unchanged': 0,
+        'deactivations': [],
+        'reinvites': [],
+        'errors': errors,
+    }
+    first_rows = {}
+    matched_ids = set()
+
+    for (row_num, email, _), (data, field_errors) in zip(prepared, cleaned):
+        row_key = email if key == 'email' else _normalize_key(key, data.get(key))
+        if row_key is None and key not in field_errors:
+            errors.append({
+                'row': row_num,
+                'email': email,
+                'error': f'{label}が入力されていません（照合キー）',
+            })
+            continue
+        if row_key is not None:
+            first_row = first_rows.setdefault(row_key, row_num)
+            if first_row != row_num:
+                errors.append({
+                    'row': row_num,
+                    'email': email,
+                    'error': f'ファイル内で{label}が重複しています（{first_row}行目）',
+                })
+                continue
+
+        matches = members_by_key.get(row_key, [])
+        if len(matches) > 1:
+            errors.append({
+                'row': row_num,
+                'email': email,
+                'error': f'同じ{label}のユーザーが複数登録されています',
+            })
+            continue
+        member = matches[0] if matches else None
+
+        owner_id = email_owners.get(data.get('email'))
+        if owner_id is not None and (member is None or owner_id != member.pk) and 'email' not in field_errors:
+            field_errors = dict(field_errors, email=[unique_email_message()])
+
+        if field_errors:
+            errors.append({
+                'row': row_num,
+                'email': email,
+                'error': format_serializer_errors(ordered_field_errors(field_errors)),
+            })
+            continue
+
+        if member is None:
+            diff['creates'].append((row_num, new_invited_user(organization, data)))
+            continue
+
+        matched_ids.add(member.pk)
+        changes = {
+            field: (getattr(member, field), value)
+            for field, value in data.items()
+            if getattr(member, field) != value
+        }
+        if not member.is_active:
+            # 名簿に戻ったユーザーは有効に戻す
+            changes['is_active'] = (False, True)
+        if not changes:
+            diff['unchanged'] += 1
+            continue
+
+        for field, (_, value) in changes.items():
+            setattr(member, field, value)
+        diff['updates'].append((row_num, member, changes))
+        if 'email' in changes and not member.is_activated:
+            # 未アクティブユーザーのメールアドレス変更は新しいアドレスに招待し直す
+            diff['reinvites'].append(member)
+
+    if deactivate_missing:
+        diff['deactivations'] = [
+            member for member in members
+            if member.is_active
+            and member.pk not in matched_ids
+            and member_keys[member.pk] is not None
+            and member_keys[member.pk] not in file_keys
+        ]
+
+    errors.sort(key=lambda error: error['row'])
+    return diff
+
+
+def apply_user_diff(organization, diff):
+    """
+    diff_user_rows の差分を1トランザクションで反映する（変更のある行だけを書き込む）
+
+    招待メール（新規ユーザーとメールアドレスを変更した未アクティブユーザー）も同じトランザクションで
+    EmailOutbox に登録する。
+
+    Returns:
+        list: 招待した [(User, InviteToken)]
+    """
+    created = [user for _, user in diff['creates']]
+    updated = [user for _, user, _ in diff['updates']]
+    invitees = created + diff['reinvites']
+    deactivated_ids = [user.pk for user in diff['deactivations']]
+    reactivated_ids = [user.pk for _, user, changes in diff['updates'] if 'is_active' in changes]
+
+    expires_at = timezone.now() + timedelta(days=INVITE_EXPIRES_DAYS)
+    tokens = [
+        InviteToken(user=user, token_type='INVITE', expires_at=expires_at)
+        for user in invitees
+    ]
+
+    with transaction.atomic():
+        User.objects.bulk_create(created, batch_size=WRITE_BATCH_SIZE)
+        if updated:
+            changed_fields = set()
+            for _, _, changes in diff['updates']:
+                changed_fields.update(changes)
+            fields = [f for f in UPDATABLE_FIELDS + ['is_active'] if f in changed_fields]
+            User.objects.bulk_update(updated, fields, batch_size=WRITE_BATCH_SIZE)
+
+        # 招待し直すユーザー・無効化するユーザーの未使用の招待トークンは使えなくする
+        expired_ids = [user.pk for user in diff['reinvites']] + deactivated_ids
+        for i in range(0, len(expired_ids), WRITE_BATCH_SIZE):
+            InviteToken.objects.filter(
+                user_id__in=expired_ids[i:i + WRITE_BATCH_SIZE], is_used=False
+            ).update(is_used=True)
+        for i in range(0, len(deactivated_ids), WRITE_BATCH_SIZE):
+            User.objects.filter(pk__in=deactivated_ids[i:i + WRITE_BATCH_SIZE]).update(is_active=False)
+
+        InviteToken.objects.bulk_create(tokens, batch_size=WRITE_BATCH_SIZE)
+        invited = list(zip(invitees, tokens))
+        enqueue_invites(invited, batch_size=WRITE_BATCH_SIZE)
+
+        # 無効化・有効に戻したユーザーは集計対象が変わるため、記録のある日の日次集計を作り直す
+        rebuild_daily_aggregates_for_users(organization.id, deactivated_ids + reactivated_ids)
+
+        # bulk_create / bulk_update はシグナルを送らないため、キャッシュは明示的に無効化
+        if created or updated or deactivated_ids:
+            bump_org_cache_version(organization.id)
+        bump_user_auth_versions([user.pk for user in updated] + deactivated_ids)
+
+    return invited
+
+
+def diff_summary(diff, details=True):
+    """
+    差分を API のレスポンス形式に変換する
+
+    Args:
+        details: True の場合は行ごとの内容（新規・変更・無効化の一覧）も含める（プレビュー用）
+    """
+    summary = {
+        'mode': 'sync',
+        'key': diff['key'],
+        'create_count': len(diff['creates']),
+        'update_count': len(diff['updates']),
+        'unchanged_count': diff['unchanged'],
+        'deactivate_count': len(diff['deactivations']),
+        'error_count': len(diff['errors']),
+        'errors': diff['errors'],
+    }
+    if details:
+        summary['creates'] = [
+            {'row': row_num, 'email': user.email, 'full_name': user.full_name}
+            for row_num, user in diff['creates']
+        ]
+        summary['updates'] = [
+            {
+                'row': row_num,
+                'email': user.email,
+                'full_name': user.full_name,
+                'changes': {
+                    field: {'before': before, 'after': after}
+                    for field, (before, after) in changes.items()
+                },
+            }
+            for row_num, user, changes in diff['updates']
+        ]
+        summary['deactivations'] = [
+            {'id': str(user.pk), 'email': user.email, 'full_name': user.full_name}
+            for user in diff['deactivations']
+        ]
+    return summary
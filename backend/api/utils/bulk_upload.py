@@ -0,0 +1,487 @@
+"""
+ユーザー一括登録（CSV/Excel）の取り込み処理
+
+行ごとに問い合わせるのではなく、まとめて処理する:
+1. 全行をホワイトリスト検証し、メールアドレスを集める
+2. 既存ユーザーをメールアドレスで1クエリで取得し、ファイル内の重複も検出
+3. Serializer と同じ検証を列ごとにメモリ上で行う（bulk_validation・重複チェックは取得済みのユーザーを使う）
+4. ユーザー・招待トークン・招待メール（EmailOutbox）をトランザクション内で bulk_create / bulk_update
+5. 招待メールは run_email_worker がまとめて送信（リクエスト処理は送信を待たない）
+
+validate_only を指定すると 4・5 を行わず、同じ検証結果だけを返す（ドライラン）。
+
+エラーは従来どおり {'row', 'email', 'error'} の形式で行番号順に返す。
+
+大きなファイルは BulkUploadJob として保存し、run_worker がチャンク単位で取り込む。
+"""
+
+import codecs
+import csv
+import itertools
+import logging
+import re
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from ..models import BulkUploadJob, InviteToken, User
+from ..validators import validate_bulk_upload_row
+from .bulk_validation import ordered_field_errors, unique_email_message, validate_user_rows
+from .cache import bump_org_cache_version, bump_user_auth_versions
+from .outbox import enqueue_invites
+
+logger = logging.getLogger(__name__)
+
+# bulk_create / bulk_update の1回あたりの件数
+WRITE_BATCH_SIZE = 500
+
+# 招待トークンの有効期間
+INVITE_EXPIRES_DAYS = 7
+
+# 既存ユーザーの更新時に保存するフィールド（Serializer の入力 + サーバー側で固定する値）
+UPDATABLE_FIELDS = [
+    'full_name', 'full_name_kana', 'email', 'gender', 'birth_date',
+    'employee_number', 'department', 'position',
+    'student_number', 'grade', 'class_name',
+]
+FIXED_FIELDS = {
+    'role': 'USER',
+    'is_activated': False,
+    'is_staff': False,
+    'is_superuser': False,
+}
+
+
+def format_serializer_errors(errors):
+    """
+    Serializer のエラーを読みやすい文字列に整形
+
+    例:
+    {'email': [ErrorDetail(string='このメールアドレスを持ったユーザーが既に存在します。', code='unique')]}
+    → 'このメールアドレスを持ったユーザーが既に存在します。'
+
+    複数エラー時:
+    {'email': [...], 'grade': [...]}
+    → 'このメールアドレスを持ったユーザーが既に存在します。 / 学年は1〜12の範囲で入力してください'
+    """
+    if isinstance(errors, dict):
+        messages = []
+        for field, error_list in errors.items():
+            if isinstance(error_list, list):
+                # フィールド名は含めない
+                messages.extend(str(error) for error in error_list)
+            else:
+                messages.append(str(error_list))
+        return ' / '.join(messages)
+    return str(errors)
+
+
+class UploadReadError(Exception):
+    """アップロードファイルを読み込めない（形式・文字コードの誤りなど）"""
+
+
+# 文字コード判定に使う先頭のバイト数
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+
+def detect_csv_encoding(upload_file):
+    """
+    CSV の文字コードを先頭のサンプルから判定（UTF-8 / Shift_JIS）
+
+    UTF-8 → cp932（Excel が出力する Shift_JIS）の順に厳密にデコードを試し、
+    どちらでも読めない場合のみ chardet で判定する（短い日本語サンプルは
+    chardet が他の 1 バイト文字コードと誤判定しやすいため）。
+    ファイル位置は先頭に戻す。
+    """
+    import chardet
+
+    sample = upload_file.read(ENCODING_SAMPLE_BYTES)
+    upload_file.seek(0)
+
+    for candidate, encoding in (('utf-8', 'utf-8-sig'), ('cp932', 'cp932')):
+        try:
+            # サンプル末尾で途切れたマルチバイト文字はエラーにしない
+            codecs.getincrementaldecoder(candidate)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            pass
+
+    encoding = (chardet.detect(sample).get('encoding') or '').lower()
+    if encoding in ('', 'shift_jis', 'cp932', 'windows-31j', 'ascii'):
+        return 'cp932'
+    return encoding
+
+
+# 行末（\r\n・\n・旧 Mac / 一部の Excel 出力の \r）
+LINE_END_RE = re.compile(r'\r\n|\r|\n')
+
+
+def _split_lines(text, final):
+    """
+    text を行末ごとに分割する（改行文字は残す）
+
+    Returns:
+        tuple: (完結した行のリスト, 次のチャンクに持ち越す残り)
+            final でなければ末尾の \r は持ち越す（次のチャンクが \n で始まる \r\n の可能性があるため）
+    """
+    lines = []
+    start = 0
+    for match in LINE_END_RE.finditer(text):
+        if not final and match.end() == len(text) and match.group() == '\r':
+            break
+        lines.append(text[start:match.end()])
+        start = match.end()
+    return lines, text[start:]
+
+
+def _iter_text_lines(chunks, encoding):
+    """バイト列のチャンクを少しずつデコードし、行ごとに返す（改行文字は残す・\r\n / \n / \r のいずれも行末）"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    for chunk in chunks:
+        lines, pending = _split_lines(pending + decoder.decode(chunk), final=False)
+        yield from lines
+    lines, pending = _split_lines(pending + decoder.decode(b'', final=True), final=True)
+    yield from lines
+    if pending:
+        yield pending
+
+
+def _iter_csv_rows(upload_file):
+    encoding = detect_csv_encoding(upload_file)
+    lines = _iter_text_lines(upload_file.chunks(), encoding)
+    yield from csv.DictReader(lines)
+
+
+def _iter_excel_rows(upload_file, org_type):
+    from openpyxl import load_workbook
+
+    # read-only モード: セルをまとめて読み込まず、行を順に読み出す
+    wb = load_workbook(upload_file, read_only=True, data_only=True)
+    try:
+        # シート選択
+        if org_type == 'SCHOOL':
+            ws = wb['学校向けテンプレート'] if '学校向けテンプレート' in wb.sheetnames else wb.worksheets[0]
+        else:
+            ws = wb['企業向けテンプレート'] if '企業向けテンプレート' in wb.sheetnames else (wb.worksheets[1] if len(wb.worksheets) > 1 else wb.worksheets[0])
+        # 保存元によってはシートの範囲情報が正しくないため、実際の行を最後まで読む
+        ws.reset_dimensions()
+
+        # ヘッダー取得（2行目）
+        headers = next(ws.iter_rows(min_row=2, max_row=2, values_only=True), ())
+
+        # データ行読み込み（3行目以降）
+        for row in ws.iter_rows(min_row=3, values_only=True):
+            if any(row):
+                yield {headers[i]: (row[i] if i < len(row) else None) for i in range(len(headers))}
+    finally:
+        wb.close()
+
+
+def _reraise_as_read_error(rows):
+    """読み込み中の例外を UploadReadError に変換する（行の検証エラーと区別するため）"""
+    try:
+        yield from rows
+    except Exception as e:
+        raise UploadReadError(f'ファイルの読み込みに失敗しました: {str(e)}') from e
+
+
+def iter_upload_rows(upload_file, file_ext, org_type):
+    """
+    アップロードファイルの行を1行ずつ読み込む（ファイル全体をメモリに展開しない）
+
+    - Excel: openpyxl の read-only モード
+    - CSV: チャンクごとに逐次デコード（UTF-8 / Shift_JIS は先頭のサンプルで判定）
+
+    Args:
+        upload_file: ファイルオブジェクト（chunks() / seek() が使えるもの）
+        file_ext: 拡張子（csv / xlsx / xls）
+        org_type: 組織タイプ（Excel のシート選択に使う）
+
+    Returns:
+        tuple: (列名 → 値 の dict を返すジェネレーター, 1行目のファイル上の行番号)
+            ジェネレーターは読み込みに失敗すると UploadReadError を送出する
+    """
+    if file_ext in ['xlsx', 'xls']:
+        return _reraise_as_read_error(_iter_excel_rows(upload_file, org_type)), 3
+    return _reraise_as_read_error(_iter_csv_rows(upload_file)), 2
+
+
+def _validate_rows(organization, rows, first_row_num):
+    """
+    各行をホワイトリスト検証する
+
+    Yields:
+        tuple: (row_num, email, validated_row, error) ※ 検証エラー時は validated_row が None
+    """
+    for row_num, row in enumerate(rows, start=first_row_num):
+        try:
+            validated_row = validate_bulk_upload_row(row, organization.org_type, row_num)
+        except serializers.ValidationError as e:
+            yield row_num, None, None, {
+                'row': row_num,
+                'email': row.get('email', ''),
+                'error': str(e.detail) if hasattr(e, 'detail') else str(e),
+            }
+            continue
+        except Exception as e:
+            yield row_num, None, None, {'row': row_num, 'email': row.get('email', ''), 'error': f'エラー: {str(e)}'}
+            continue
+        yield row_num, validated_row.get('email', '').lower().strip(), validated_row, None
+
+
+def first_rows_by_email(organization, rows, first_row_num=2):
+    """
+    メールアドレスごとに最初に現れる行番号（ファイルを分割して取り込むときの重複検出用）
+
+    Returns:
+        tuple: ({email: row_num}, 全行数)
+    """
+    first_seen = {}
+    row_count = 0
+    for row_num, email, validated_row, error in _validate_rows(organization, rows, first_row_num):
+        row_count += 1
+        if error is None:
+            first_seen.setdefault(email, row_num)
+    return first_seen, row_count
+
+
+def prepare_rows(organization, rows, first_row_num, first_seen=None):
+    """
+    ホワイトリスト検証・ファイル内重複の検出（DB は使わない）
+
+    Args:
+        first_seen: ファイル全体の first_rows_by_email()（省略時は rows の中だけで重複を検出）
+
+    Returns:
+        tuple: (検証済みの行 [(row_num, email, validated_row)], エラー)
+    """
+    prepared = []
+    errors = []
+    if first_seen is None:
+        first_seen = {}
+
+    for row_num, email, validated_row, error in _validate_rows(organization, rows, first_row_num):
+        if error is not None:
+            errors.append(error)
+            continue
+
+        first_row = first_seen.setdefault(email, row_num)
+        if first_row != row_num:
+            errors.append({
+                'row': row_num,
+                'email': email,
+                'error': f'ファイル内でメールアドレスが重複しています（{first_row}行目）',
+            })
+            continue
+        prepared.append((row_num, email, validated_row))
+
+    return prepared, errors
+
+
+def import_user_rows(organization, rows, first_row_num=2, first_seen=None, validate_only=False):
+    """
+    一括登録の行を検証し、ユーザーと招待トークンをまとめて作成・更新する
+
+    既存ユーザーのうち、同じ組織の未アクティブユーザーは更新し（既存の招待トークンは無効化）、
+    それ以外の既存メールアドレスはエラーにする。
+
+    Args:
+        organization: 登録先の組織
+        rows: 列名 → 値 の dict のイテラブル（iter_upload_rows のジェネレーターも可）
+        first_row_num: 最初の行のファイル上の行番号（エラー表示用）
+        first_seen: ファイル全体の first_rows_by_email()（分割して取り込む場合に指定）
+        validate_only: True の場合は検証のみ（既存ユーザーの取得以外に DB を使わない）
+
+    Returns:
+        tuple: (招待した [(User, InviteToken)], エラー [{'row', 'email', 'error'}])
+            validate_only の場合は保存していない User と None の組
+    """
+    prepared, errors = prepare_rows(organization, rows, first_row_num, first_seen)
+    cleaned = validate_user_rows([validated_row for _, _, validated_row in prepared])
+    prepared = [
+        (row_num, email, data, field_errors)
+        for (row_num, email, _), (data, field_errors) in zip(prepared, cleaned)
+    ]
+
+    # 検証後・書き込み前に同じメールアドレスが登録された場合は、既存ユーザーの取得からやり直す
+    for attempt in range(2):
+        try:
+            return _write_users(organization, prepared, list(errors), validate_only)
+        except IntegrityError:
+            if attempt:
+                raise
+            logger.warning('一括登録中にメールアドレスの競合を検出したため再実行します: %s', organization.id)
+
+
+def new_invited_user(organization, data):
+    """招待する新規ユーザー（未保存）を作成する"""
+    user = User(organization=organization, **FIXED_FIELDS, **data)
+    user.email = User.objects.normalize_email(user.email)
+    # 招待フロー（set_password_with_invite）で本パスワードを設定するため、
+    # ここではハッシュ計算をせず使用不可パスワードにする
+    user.set_unusable_password()
+    return user
+
+
+def _write_users(organization, prepared, errors, validate_only=False):
+    existing_users = {
+        user.email: user
+        for user in User.objects.filter(email__in=[email for _, email, _, _ in prepared])
+    }
+
+    to_create = []
+    to_update = []
+    updated_fields = set()
+    for row_num, email, data, field_errors in prepared:
+        existing = existing_users.get(email)
+        # 同じ組織の未アクティブユーザーは更新
+        is_update = (
+            existing is not None
+            and existing.organization_id == organization.id
+            and not existing.is_activated
+        )
+        if existing is not None and not is_update and 'email' not in field_errors:
+            # 他組織・アクティブ済みの重複（Serializer の validate_email と同じエラー）
+            field_errors = dict(field_errors, email=[unique_email_message()])
+
+        if field_errors:
+            errors.append({
+                'row': row_num,
+                'email': email,
+                'error': format_serializer_errors(ordered_field_errors(field_errors)),
+            })
+            continue
+
+        if is_update:
+            user = existing
+            for attr, value in data.items():
+                setattr(user, attr, value)
+            updated_fields.update(data)
+            to_update.append((row_num, user))
+        else:
+            user = new_invited_user(organization, data)
+            to_create.append((row_num, user))
+
+        for attr, value in FIXED_FIELDS.items():
+            setattr(user, attr, value)
+
+    errors.sort(key=lambda error: error['row'])
+    invited = sorted(to_create + to_update, key=lambda item: item[0])
+    if validate_only:
+        return [(user, None) for _, user in invited], errors
+
+    expires_at = timezone.now() + timedelta(days=INVITE_EXPIRES_DAYS)
+    tokens = [
+        InviteToken(user=user, token_type='INVITE', expires_at=expires_at)
+        for _, user in invited
+    ]
+
+    with transaction.atomic():
+        User.objects.bulk_create([user for _, user in to_create], batch_size=WRITE_BATCH_SIZE)
+        if to_update:
+            fields = [f for f in UPDATABLE_FIELDS if f in updated_fields] + list(FIXED_FIELDS)
+            User.objects.bulk_update([user for _, user in to_update], fields, batch_size=WRITE_BATCH_SIZE)
+            # 既存の招待トークンを無効化
+            updated_ids = [user.pk for _, user in to_update]
+            for i in range(0, len(updated_ids), WRITE_BATCH_SIZE):
+                InviteToken.objects.filter(
+                    user_id__in=updated_ids[i:i + WRITE_BATCH_SIZE]
+                ).update(is_used=True)
+        InviteToken.objects.bulk_create(tokens, batch_size=WRITE_BATCH_SIZE)
+        invited = [(user, token) for (_, user), token in zip(invited, tokens)]
+        enqueue_invites(invited, batch_size=WRITE_BATCH_SIZE)
+
+        # bulk_create / bulk_update はシグナルを送らないため、キャッシュは明示的に無効化
+        if invited:
+            bump_org_cache_version(organization.id)
+        bump_user_auth_versions(user.pk for _, user in to_update)
+
+    return invited, errors
+
+
+def _upload_root():
+    return Path(settings.BULK_UPLOAD_ROOT)
+
+
+def store_upload_file(job, upload_file):
+    """アップロードファイルを BULK_UPLOAD_ROOT に保存し、job.file_path を設定する"""
+    root = _upload_root()
+    root.mkdir(parents=True, exist_ok=True)
+    file_ext = upload_file.name.lower().split('.')[-1]
+    path = root / f'{job.id}.{file_ext}'
+    with open(path, 'wb') as output:
+        for chunk in upload_file.chunks():
+            output.write(chunk)
+    job.file_path = path.name
+    job.save(update_fields=['file_path'])
+    return path
+
+
+def run_bulk_upload_job(job):
+    """
+    BulkUploadJob を実行する（run_worker から呼ばれる）
+
+    rows_processed 行目以降をチャンク単位で取り込む。チャンクの登録と進捗は同じトランザクションで
+    コミットするため、途中で停止したジョブは最後にコミットしたチャンクの次から再開される。
+    ファイル内の重複はファイル全体で判定する（チャンクをまたいだ重複も検出）。
+    """
+    from django.core.files import File
+
+    organization = job.organization
+    path = _upload_root() / job.file_path
+    file_ext = path.suffix.lstrip('.')
+
+    # 1回目: ファイル全体の重複判定用のメールアドレスと行数
+    with open(path, 'rb') as upload_file:
+        rows, first_row_num = iter_upload_rows(File(upload_file), file_ext, organization.org_type)
+        first_seen, total_rows = first_rows_by_email(organization, rows, first_row_num)
+    job.heartbeat(total_rows=total_rows)
+
+    offset = job.rows_processed
+    if offset:
+        logger.info('BulkUploadJob %s resumed at row %s', job.id, offset)
+
+    # 2回目: コミット済みの行を読み飛ばし、チャンク単位で取り込む
+    with open(path, 'rb') as upload_file:
+        rows, first_row_num = iter_upload_rows(File(upload_file), file_ext, organization.org_type)
+        rows = itertools.islice(rows, offset, None)
+        while True:
+            chunk = list(itertools.islice(rows, job.chunk_size))
+            if not chunk:
+                break
+            with transaction.atomic():
+                invited, errors = import_user_rows(organization, chunk, first_row_num + offset, first_seen)
+                job.heartbeat(
+                    rows_processed=offset + len(chunk),
+                    success_count=job.success_count + len(invited),
+                    error_count=job.error_count + len(errors),
+                    errors=job.errors + errors,
+                )
+            offset += len(chunk)
+
+    job.mark_succeeded()
+    path.unlink(missing_ok=True)
+    BulkUploadJob.objects.filter(pk=job.pk).update(file_path='')
+
+
+def delete_finished_upload_files():
+    """
+    完了・失敗したジョブのアップロードファイルを削除する
+
+    Returns:
+        int: 削除したファイル数
+    """
+    deleted = 0
+    finished = BulkUploadJob.objects.filter(status__in=['SUCCEEDED', 'FAILED']).exclude(file_path='')
+    for job in finished.iterator():
+        path = _upload_root() / job.file_path
+        if path.exists():
+            path.unlink()
+            deleted += 1
+        BulkUploadJob.objects.filter(pk=job.pk).update(file_path='')
+    return deleted
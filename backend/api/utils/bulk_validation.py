@@ -0,0 +1,176 @@
+"""
+一括登録の行を列ごとに検証する
+
+BulkUploadUserSerializer を1行ずつ生成する代わりに、Serializer のフィールド
+（run_validation）と validate_<field> を列ごとに適用する。性別・組・部署のように
+同じ値が繰り返し現れる列は、値ごとの結果をメモ化して1回だけ検証する。
+
+検証内容とエラーメッセージは Serializer と同じ。既存ユーザーとのメールアドレス重複は
+DB が必要なため、呼び出し側（bulk_upload._write_users）で判定する。
+
+行数が BULK_UPLOAD_VALIDATION_ROWS を超え、BULK_UPLOAD_VALIDATION_WORKERS が2以上の場合は
+チャンクに分けてプロセスプールで検証する。
+"""
+
+import concurrent.futures
+import functools
+import logging
+import multiprocessing
+import threading
+
+import django
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from rest_framework.fields import SkipField, empty, get_error_detail
+
+logger = logging.getLogger(__name__)
+
+# 1列あたりのメモ化する値の上限（超えたら破棄する・氏名やメールアドレスなど値が重複しない列向け）
+MEMO_MAX_VALUES = 10000
+
+
+@functools.lru_cache(maxsize=None)
+def _serializer():
+    """検証に使う Serializer（プロセスごとに1つ）"""
+    from ..serializers import BulkUploadRowSerializer
+
+    # email の重複チェック（DB）を外した Serializer（重複は呼び出し側で判定）
+    return BulkUploadRowSerializer()
+
+
+def unique_email_message():
+    """既存ユーザーとメールアドレスが重複した場合のエラーメッセージ（UniqueValidator と同じ）"""
+    return _serializer().unique_email_message
+
+
+def ordered_field_errors(field_errors):
+    """フィールドのエラーを Serializer のフィールド順に並べる（serializer.errors と同じ順序）"""
+    return {
+        name: field_errors[name]
+        for name in _serializer().fields
+        if name in field_errors
+    }
+
+
+class ColumnValidator:
+    """
+    BulkUploadUserSerializer の入力フィールドを列ごとに検証する
+
+    validate() は validate_bulk_upload_row 済みの行（値は文字列または None）を受け取り、
+    行ごとに (validated_data, field_errors) を返す。
+    """
+
+    def __init__(self):
+        self.serializer = _serializer()
+        self.fields = [field for field in self.serializer.fields.values() if not field.read_only]
+        self._memo = {field.field_name: {} for field in self.fields}
+
+    def validate(self, rows):
+        results = [({}, {}) for _ in rows]
+        for field in self.fields:
+            name = field.field_name
+            for (data, field_errors), row in zip(results, rows):
+                value, messages = self._validate_value(field, row.get(name, empty))
+                if messages:
+                    field_errors[name] = messages
+                elif value is not empty:
+                    data[name] = value
+        return results
+
+    def _validate_value(self, field, value):
+        """
+        1つの値を検証する（Serializer.to_internal_value と同じ処理・結果はメモ化）
+
+        Returns:
+            tuple: (検証済みの値, None) / (empty, None) ※ 未入力で省略 / (None, エラーメッセージのリスト)
+        """
+        memo = self._memo[field.field_name]
+        key = (type(value), value)
+        if key in memo:
+            return memo[key]
+
+        validate_method = getattr(self.serializer, 'validate_' + field.field_name, None)
+        try:
+            validated = field.run_validation(value)
+            if validate_method is not None:
+                validated = validate_method(validated)
+        except serializers.ValidationError as exc:
+            detail = exc.detail if isinstance(exc.detail, list) else [exc.detail]
+            result = (None, [str(message) for message in detail])
+        except DjangoValidationError as exc:
+            result = (None, [str(message) for message in get_error_detail(exc)])
+        except SkipField:
+            result = (empty, None)
+        else:
+            result = (validated, None)
+
+        if len(memo) >= MEMO_MAX_VALUES:
+            memo.clear()
+        memo[key] = result
+        return result
+
+
+def validate_user_rows(rows, workers=None):
+    """
+    validate_bulk_upload_row 済みの行をまとめて検証する（DB は使わない）
+
+    Args:
+        rows: 列名 → 値 の dict のリスト
+        workers: プロセス数（省略時は settings.BULK_UPLOAD_VALIDATION_WORKERS・1以下はプロセス内で検証）
+
+    Returns:
+        list: 行ごとの (validated_data, field_errors) ※ field_errors はフィールド名 → メッセージのリスト
+    """
+    if workers is None:
+        workers = settings.BULK_UPLOAD_VALIDATION_WORKERS
+    chunk_rows = settings.BULK_UPLOAD_VALIDATION_ROWS
+
+    if workers > 1 and len(rows) > chunk_rows:
+        chunks = [rows[i:i + chunk_rows] for i in range(0, len(rows), chunk_rows)]
+        try:
+            results = []
+            for chunk_results in _executor(workers).map(_validate_chunk, chunks):
+                results.extend(chunk_results)
+            return results
+        except concurrent.futures.process.BrokenProcessPool:
+            logger.warning('検証用のプロセスプールが停止したため、プロセス内で検証します')
+            _shutdown_executor()
+
+    return ColumnValidator().validate(rows)
+
+
+# ─── プロセスプール ─────────────────────────────────────
+
+_pool = None
+_pool_lock = threading.Lock()
+_worker_validator = None
+
+
+def _executor(workers):
+    """プロセスプール（初回に作成して使い回す・spawn で起動し Django を初期化する）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        return _pool
+
+
+def _shutdown_executor():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _validate_chunk(rows):
+    """プロセスプールで実行（メモ化はワーカープロセスごとにチャンクをまたいで使う）"""
+    global _worker_validator
+    if _worker_validator is None:
+        _worker_validator = ColumnValidator()
+    return _worker_validator.validate(rows)
@@ -0,0 +1,193 @@
+"""
+管理者ダッシュボード用のレスポンスキャッシュ
+
+キャッシュキーは「組織・エンドポイント・クエリパラメータ・組織バージョン」で構成する。
+StatusLog の記録やユーザーの変更時に組織バージョンを上げることで、
+古いキーを一括で無効化する（古いエントリは TTL で自然に消える）。
+
+バックエンドは settings.CACHES で差し替え可能（デフォルトはプロセス内メモリ）。
+バージョンの更新はキャッシュを共有するプロセスにしか届かないため、複数ワーカーで運用する場合は
+共有キャッシュ（Redis・DB）を使う（プロセス内メモリでは DASHBOARD_CACHE_TIMEOUT のデフォルトは 0）。
+
+認証済みユーザーのキャッシュ（api.authentication.CachedJWTAuthentication）も同じ仕組みで、
+ユーザー・組織ごとのバージョンを上げて無効化する。
+"""
+
+import functools
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import urlencode
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'org-cache-version:{organization_id}'
+RESPONSE_KEY = 'org-cache:{organization_id}:v{version}:{endpoint}:{params}'
+AUTH_USER_VERSION_KEY = 'auth-user-version:{user_id}'
+AUTH_ORG_VERSION_KEY = 'auth-org-version:{organization_id}'
+
+
+def _cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def is_shared_cache(alias='default'):
+    """キャッシュがプロセス間で共有されるか（LocMem はワーカーごとのため、無効化が他のワーカーに届かない）"""
+    return settings.CACHES[alias]['BACKEND'] not in settings.PROCESS_LOCAL_CACHE_BACKENDS
+
+
+def get_org_cache_version(organization_id):
+    """組織のキャッシュバージョンを取得（未設定なら1で初期化）"""
+    key = VERSION_KEY.format(organization_id=organization_id)
+    cache = _cache()
+    version = cache.get(key)
+    if version is None:
+        # バージョンは期限なしで保持（TTL切れで古いキーが復活しないように）
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_org_cache_version(organization_id):
+    """
+    組織のキャッシュバージョンを上げる（= 組織のダッシュボードキャッシュを無効化）
+
+    トランザクション内で呼ばれた場合はコミット後に実行する。
+    コミット前に上げると、他リクエストが未コミットの旧データで
+    新バージョンのキャッシュを作ってしまうため。
+    """
+    if organization_id is None:
+        return
+
+    def _bump():
+        key = VERSION_KEY.format(organization_id=organization_id)
+        cache = _cache()
+        try:
+            cache.incr(key)
+        except ValueError:
+            # キーが存在しない（初回・追い出し済み）
+            cache.add(key, 1, timeout=None)
+            cache.incr(key)
+
+    transaction.on_commit(_bump)
+
+
+def auth_cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+
+
+def _get_auth_version(key):
+    cache = auth_cache()
+    version = cache.get(key)
+    if version is None:
+        # 初期値は時刻にする（キーが追い出された後に、古いバージョンのエントリが再び使われないように）
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_auth_versions(keys):
+    """トランザクション内で呼ばれた場合はコミット後に実行する（bump_org_cache_version と同じ理由）"""
+    keys = list(keys)
+    if not keys:
+        return
+
+    def _bump():
+        cache = auth_cache()
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(_bump)
+
+
+def get_user_auth_version(user_id):
+    """ユーザーの認証キャッシュのバージョン"""
+    return _get_auth_version(AUTH_USER_VERSION_KEY.format(user_id=user_id))
+
+
+def get_org_auth_version(organization_id):
+    """組織の認証キャッシュのバージョン（組織を持たないユーザーは None）"""
+    if organization_id is None:
+        return None
+    return _get_auth_version(AUTH_ORG_VERSION_KEY.format(organization_id=organization_id))
+
+
+def bump_user_auth_versions(user_ids):
+    """
+    ユーザーの認証キャッシュを無効化する
+
+    パスワード変更・無効化・権限変更・削除など、ユーザーを変更したときに呼ぶ
+    （save() / delete() は signals で自動的に呼ばれる。queryset.update() / bulk_update() では明示的に呼ぶ）。
+    """
+    _bump_auth_versions(AUTH_USER_VERSION_KEY.format(user_id=user_id) for user_id in user_ids)
+
+
+def bump_org_auth_version(organization_id):
+    """組織の認証キャッシュを無効化する（request.user.organization を更新させる）"""
+    if organization_id is not None:
+        _bump_auth_versions([AUTH_ORG_VERSION_KEY.format(organization_id=organization_id)])
+
+
+def org_cache_key(organization_id, endpoint, query_params):
+    """組織・エンドポイント・クエリパラメータからキャッシュキーを生成"""
+    params = urlencode(sorted(query_params.lists()), doseq=True)
+    params_hash = hashlib.md5(params.encode('utf-8')).hexdigest()
+    return RESPONSE_KEY.format(
+        organization_id=organization_id,
+        version=get_org_cache_version(organization_id),
+        endpoint=endpoint,
+        params=params_hash,
+    )
+
+
+def cached_org_response(endpoint):
+    """
+    管理者向け GET アクションのレスポンスを組織単位でキャッシュするデコレーター
+
+    - 管理者以外のリクエストはキャッシュせずにそのまま実行（権限エラー等）
+    - ステータス200のレスポンスのみ保存
+    - タイムアウトは settings.DASHBOARD_CACHE_TIMEOUT（秒・0 はキャッシュしない）
+
+    使い方:
+        @action(detail=False, methods=['get'])
+        @cached_org_response('dashboard_summary')
+        def dashboard_summary(self, request): ...
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(self, request, *args, **kwargs):
+            user = request.user
+            organization_id = getattr(user, 'organization_id', None)
+            timeout = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 60)
+            if getattr(user, 'role', None) != 'ADMIN' or organization_id is None or timeout <= 0:
+                return view_func(self, request, *args, **kwargs)
+
+            # 日付をまたいだら別キー（「本日」の集計が前日のまま残らないように）
+            from .status import today_jst
+            params = request.query_params.copy()
+            params['_date'] = today_jst().isoformat()
+
+            cache = _cache()
+            key = org_cache_key(organization_id, endpoint, params)
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = view_func(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout=timeout)
+            response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+    return decorator
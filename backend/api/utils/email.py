@@ -1,19 +1,223 @@
 # backend/api/utils/email.py (メールクライアント互換性最優先版)
+"""
+メール送信
+
+リクエスト処理からは送信せず、outbox.enqueue_* で EmailOutbox に登録する。
+実際の送信は run_email_worker が send_emails() でまとめて行う（SendGrid の personalizations で
+1回の API 呼び出しに複数の宛先を含め、宛名・URL は substitutions で差し込む）。
+
+SendGrid へのリクエストは email_transport の keep-alive 接続プールで送り、
+複数のまとまりは send_email_batches() で並行に送信する。
+HTML 本文はテンプレートから起動時に1回だけ生成し、宛先ごとの値だけを差し込む。
+"""
+import html
 import logging
+import time
+from email.utils import parseaddr
+from string import Template
 from django.conf import settings
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-from python_http_client.exceptions import HTTPError
+from .email_transport import get_transport
 
 logger = logging.getLogger(__name__)
 
+# SendGrid の substitutions で宛先ごとに置き換えるタグ
+USER_NAME_TAG = '-user_name-'
+ACTION_URL_TAG = '-action_url-'
+
+# 再送すれば成功する可能性があるステータス（レート制限・一時障害・認証設定の誤り）
+RETRYABLE_STATUSES = {401, 403, 429}
+
+
+INVITE_TEMPLATE = Template('''\
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background-color: #f5f5f5;">
+    <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f5f5f5; padding: 20px 0;">
+        <tr>
+            <td align="center">
+                <table width="600" cellpadding="0" cellspacing="0" border="0" style="max-width: 600px; background-color: #ffffff; border-radius: 10px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
+                    <!-- ヘッダー -->
+                    <tr>
+                        <td bgcolor="#667eea" style="background-color: #667eea; padding: 40px; text-align: center;">
+                            <h1 style="color: #ffffff; margin: 0; font-size: 28px; font-weight: 600;">Mind Status</h1>
+                        </td>
+                    </tr>
+
+                    <!-- メインコンテンツ -->
+                    <tr>
+                        <td style="padding: 40px 30px;">
+                            <h2 style="color: #333333; margin: 0 0 20px 0; font-size: 22px;">ようこそ、$user_name 様</h2>
+
+                            <p style="color: #555555; font-size: 16px; line-height: 1.6; margin: 0 0 30px 0;">
+                                Mind Status へのご招待です。<br>
+                                以下のボタンからパスワードを設定してアカウントを有効化してください。
+                            </p>
+
+                            <!-- ボタン（メールクライアント互換性最優先） -->
+                            <table width="100%" cellpadding="0" cellspacing="0" border="0">
+                                <tr>
+                                    <td align="center" style="padding: 20px 0;">
+                                        <table cellpadding="0" cellspacing="0" border="0">
+                                            <tr>
+                                                <td bgcolor="#667eea" style="background-color: #667eea; border-radius: 8px; padding: 16px 40px;">
+                                                    <a href="$action_url" style="display: inline-block; color:#ffffff !important; text-decoration: none; font-weight: 600; font-size: 16px; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;">
+                                                        アカウントを有効化
+                                                    </a>
+                                                </td>
+                                            </tr>
+                                        </table>
+                                    </td>
+                                </tr>
+                            </table>
+
+                            <!-- リンクのフォールバック -->
+                            <p style="color: #999999; font-size: 13px; line-height: 1.5; margin: 10px 0; text-align: center;">
+                                ボタンが表示されない場合は、以下のURLをコピーしてブラウザで開いてください：<br>
+                                <a href="$action_url" style="color: #667eea; word-break: break-all;">$action_url</a>
+                            </p>
+
+                            <!-- 注意事項 -->
+                            <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 30px 0;">
+                                <tr>
+                                    <td bgcolor="#fff3cd" style="background-color: #fff3cd; border-left: 4px solid #ffc107; padding: 15px; border-radius: 4px;">
+                                        <p style="margin: 0; color: #856404; font-size: 14px; line-height: 1.5;">
+                                            <strong>⏰ このリンクは7日間有効です</strong><br>
+                                            期限切れの場合は、管理者に再発行を依頼してください。
+                                        </p>
+                                    </td>
+                                </tr>
+                            </table>
+
+                            <p style="color: #999999; font-size: 13px; line-height: 1.5; margin: 20px 0 0 0;">
+                                ※このメールに心当たりがない場合は、このまま削除してください。<br>
+                                第三者がメールアドレスを誤って入力した可能性があります。
+                            </p>
+                        </td>
+                    </tr>
+
+                    <!-- フッター -->
+                    <tr>
+                        <td bgcolor="#f8f9fa" style="background-color: #f8f9fa; padding: 20px; text-align: center; border-top: 1px solid #e9ecef;">
+                            <p style="margin: 5px 0; color: #999999; font-size: 12px;">Mind Status 運営チーム</p>
+                            <p style="margin: 5px 0; color: #999999; font-size: 12px;">このメールは自動送信されています</p>
+                        </td>
+                    </tr>
+                </table>
+            </td>
+        </tr>
+    </table>
+</body>
+</html>
+''')
+
+
+RESET_TEMPLATE = Template('''\
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background-color: #f5f5f5;">
+    <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f5f5f5; padding: 20px 0;">
+        <tr>
+            <td align="center">
+                <table width="600" cellpadding="0" cellspacing="0" border="0" style="max-width: 600px; background-color: #ffffff; border-radius: 10px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
+                    <!-- ヘッダー -->
+                    <tr>
+                        <td bgcolor="#667eea" style="background-color: #667eea; padding: 40px; text-align: center;">
+                            <h1 style="color: #ffffff; margin: 0; font-size: 28px; font-weight: 600;">Mind Status</h1>
+                        </td>
+                    </tr>
+
+                    <!-- メインコンテンツ -->
+                    <tr>
+                        <td style="padding: 40px 30px;">
+                            <h2 style="color: #333333; margin: 0 0 20px 0; font-size: 22px;">$user_name 様</h2>
+
+                            <p style="color: #555555; font-size: 16px; line-height: 1.6; margin: 0 0 30px 0;">
+                                パスワードリセットのリクエストを受け付けました。<br>
+                                以下のボタンから新しいパスワードを設定してください。
+                            </p>
+
+                            <!-- ボタン（メールクライアント互換性最優先） -->
+                            <table width="100%" cellpadding="0" cellspacing="0" border="0">
+                                <tr>
+                                    <td align="center" style="padding: 20px 0;">
+                                        <table cellpadding="0" cellspacing="0" border="0">
+                                            <tr>
+                                                <td bgcolor="#667eea" style="background-color: #667eea; border-radius: 8px; padding: 16px 40px;">
+                                                    <a href="$action_url" style="display: inline-block; color: #ffffff; text-decoration: none; font-weight: 600; font-size: 16px; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;">
+                                                        パスワードをリセット
+                                                    </a>
+                                                </td>
+                                            </tr>
+                                        </table>
+                                    </td>
+                                </tr>
+                            </table>
+
+                            <!-- リンクのフォールバック -->
+                            <p style="color: #999999; font-size: 13px; line-height: 1.5; margin: 10px 0; text-align: center;">
+                                ボタンが表示されない場合は、以下のURLをコピーしてブラウザで開いてください：<br>
+                                <a href="$action_url" style="color: #667eea; word-break: break-all;">$action_url</a>
+                            </p>
+
+                            <!-- 注意事項 -->
+                            <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 30px 0;">
+                                <tr>
+                                    <td bgcolor="#fff3cd" style="background-color: #fff3cd; border-left: 4px solid #ffc107; padding: 15px; border-radius: 4px;">
+                                        <p style="margin: 0; color: #856404; font-size: 14px; line-height: 1.5;">
+                                            <strong>⏰ このリンクは1時間有効です</strong>
+                                        </p>
+                                    </td>
+                                </tr>
+                            </table>
+
+                            <p style="color: #999999; font-size: 13px; line-height: 1.5; margin: 20px 0 0 0;">
+                                ※このリクエストに心当たりがない場合は、このメールを無視してください。<br>
+                                パスワードは変更されません。
+                            </p>
+                        </td>
+                    </tr>
+
+                    <!-- フッター -->
+                    <tr>
+                        <td bgcolor="#f8f9fa" style="background-color: #f8f9fa; padding: 20px; text-align: center; border-top: 1px solid #e9ecef;">
+                            <p style="margin: 5px 0; color: #999999; font-size: 12px;">Mind Status 運営チーム</p>
+                        </td>
+                    </tr>
+                </table>
+            </td>
+        </tr>
+    </table>
+</body>
+</html>
+''')
+
+
+# 種別ごとの件名と本文（本文は substitutions のタグを差し込んだ状態で1回だけ生成する）
+EMAIL_KINDS = {
+    'INVITE': {
+        'label': '招待',
+        'subject': 'Mind Status への招待',
+        'html': INVITE_TEMPLATE.substitute(user_name=USER_NAME_TAG, action_url=ACTION_URL_TAG),
+    },
+    'RESET': {
+        'label': 'パスワードリセット',
+        'subject': 'Mind Status - パスワードリセット',
+        'html': RESET_TEMPLATE.substitute(user_name=USER_NAME_TAG, action_url=ACTION_URL_TAG),
+    },
+}
+
 
 def send_invite_email(user_email, user_name, invite_url):
     """
-    招待メールを送信
-    
-    本番環境（DEBUG=False）では SendGrid のみ使用。
-    開発環境（DEBUG=True）では SMTP フォールバック可能。
+    招待メールを1通送信（リクエスト処理からは outbox.enqueue_invites を使う）
     
     Args:
         user_email: 送信先メールアドレス
@@ -22,37 +226,13 @@ def send_invite_email(user_email, user_name, invite_url):
     
     Returns:
         bool: 成功時True、失敗時False
-    
-    Raises:
-        Exception: メール送信失敗時（呼び出し側でキャッチすること）
     """
-    
-    # ① settings 安全参照（AttributeError 防止）
-    api_key = getattr(settings, 'SENDGRID_API_KEY', None)
-    is_production = not getattr(settings, 'DEBUG', False)
-    
-    # SendGrid API Key が設定されている場合
-    if api_key:
-        return _send_via_sendgrid(api_key, user_email, user_name, invite_url)
-    
-    # 本番環境で SendGrid 未設定の場合はエラー
-    if is_production:
-        logger.error(
-            f'❌ 本番環境でSENDGRID_API_KEYが未設定です。'
-            f'メール送信をスキップします: {user_email}'
-        )
-        return False
-    
-    # 開発環境のみ SMTP フォールバック許可
-    logger.warning(
-        f'⚠️ 開発環境のため SMTP にフォールバックします: {user_email}'
-    )
-    return _send_via_smtp(user_email, user_name, invite_url)
+    return send_emails('INVITE', [(user_email, user_name, invite_url)])['sent']
 
 
 def send_password_reset_email(user_email, user_name, reset_url):
     """
-    パスワードリセットメールを送信
+    パスワードリセットメールを1通送信（リクエスト処理からは outbox.enqueue_email を使う）
     
     Args:
         user_email: 送信先メールアドレス
@@ -62,276 +242,185 @@ def send_password_reset_email(user_email, user_name, reset_url):
     Returns:
         bool: 成功時True、失敗時False
     """
+    return send_emails('RESET', [(user_email, user_name, reset_url)])['sent']
+
+
+def send_emails(kind, recipients, transport=None):
+    """
+    同じ種別のメールをまとめて送信
+    
+    本番環境（DEBUG=False）では SendGrid のみ使用（1回の API 呼び出しで全宛先に送信）。
+    開発環境（DEBUG=True）では SMTP フォールバック可能（1通ずつ送信）。
     
+    Args:
+        kind: 'INVITE' or 'RESET'
+        recipients: [(メールアドレス, ユーザー名, URL)]
+        transport: 使用する SendGridTransport（省略時はプロセスで共有するもの）
+    
+    Returns:
+        dict: sent（全宛先に送信できたか）, status（HTTPステータス）, message_id,
+            error（失敗時の内容）, retry（再送すべきか）, retry_after（429 の待機秒数）,
+            recipients（1通ずつ送信した SMTP の場合は recipients と同じ順の宛先ごとの結果・SendGrid は None）
+    """
+    
+    # ① settings 安全参照（AttributeError 防止）
     api_key = getattr(settings, 'SENDGRID_API_KEY', None)
     is_production = not getattr(settings, 'DEBUG', False)
     
-    if api_key:
-        return _send_password_reset_via_sendgrid(api_key, user_email, user_name, reset_url)
+    # SendGrid API Key が設定されている場合
+    if api_key or transport is not None:
+        return _send_via_sendgrid(transport or get_transport(), kind, recipients)
     
+    # 本番環境で SendGrid 未設定の場合はエラー（設定後に再送できるよう retry にする）
     if is_production:
         logger.error(
             f'❌ 本番環境でSENDGRID_API_KEYが未設定です。'
-            f'パスワードリセットメール送信をスキップします: {user_email}'
+            f'メール送信をスキップします: {len(recipients)}件'
         )
-        return False
+        return _result(False, error='SENDGRID_API_KEY が未設定です', retry=True)
     
+    # 開発環境のみ SMTP フォールバック許可
     logger.warning(
-        f'⚠️ 開発環境のため SMTP にフォールバックします: {user_email}'
+        f'⚠️ 開発環境のため SMTP にフォールバックします: {len(recipients)}件'
+    )
+    send = _send_via_smtp if kind == 'INVITE' else _send_password_reset_via_smtp
+    # 1通ずつ送信するため、宛先ごとの結果を返す（失敗した宛先だけを再送できるように）
+    per_recipient = []
+    for email, name, url in recipients:
+        sent = send(email, name, url)
+        per_recipient.append(_result(sent, error='' if sent else 'SMTP送信に失敗しました', retry=not sent))
+    sent = all(result['sent'] for result in per_recipient)
+    return _result(
+        sent,
+        error='' if sent else 'SMTP送信に失敗しました',
+        retry=not sent,
+        recipients=per_recipient,
     )
-    return _send_password_reset_via_smtp(user_email, user_name, reset_url)
 
 
-def _send_via_sendgrid(api_key, user_email, user_name, invite_url):
+def send_email_batches(batches, transport=None):
     """
-    SendGrid経由で招待メール送信
+    複数のまとまりを並行に送信（同時送信数は EMAIL_SEND_CONCURRENCY まで）
     
     Args:
-        api_key: SendGrid API Key
-        user_email: 送信先メールアドレス
-        user_name: ユーザー名
-        invite_url: 招待URL
+        batches: [(kind, recipients)] ※ 各要素は send_emails() の引数
+        transport: 使用する SendGridTransport（省略時はプロセスで共有するもの）
     
     Returns:
-        bool: 成功時True、失敗時False
+        list: batches と同じ順の send_emails() の結果
     """
+    if transport is None and getattr(settings, 'SENDGRID_API_KEY', None):
+        transport = get_transport()
+    if transport is None:
+        # SMTP・未設定時は並行送信しない
+        return [send_emails(kind, recipients) for kind, recipients in batches]
+    return transport.map(lambda batch: send_emails(*batch, transport=transport), batches)
+
+
+def _result(sent, status=None, message_id='', error='', retry=False, retry_after=None, recipients=None):
+    return {
+        'sent': sent,
+        'status': status,
+        'message_id': message_id,
+        'error': error,
+        'retry': retry,
+        'retry_after': retry_after,
+        'recipients': recipients,
+    }
+
+
+def _retry_after(headers):
+    """429 の Retry-After（秒）または X-RateLimit-Reset（UNIX時刻）から待機秒数を求める"""
     try:
-        default_from = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@mindstatus.com')
-        
-        message = Mail(
-            from_email=default_from,
-            to_emails=user_email,
-            subject='Mind Status への招待',
-            html_content=f'''
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            </head>
-            <body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background-color: #f5f5f5;">
-                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f5f5f5; padding: 20px 0;">
-                    <tr>
-                        <td align="center">
-                            <table width="600" cellpadding="0" cellspacing="0" border="0" style="max-width: 600px; background-color: #ffffff; border-radius: 10px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                                <!-- ヘッダー -->
-                                <tr>
-                                    <td bgcolor="#667eea" style="background-color: #667eea; padding: 40px; text-align: center;">
-                                        <h1 style="color: #ffffff; margin: 0; font-size: 28px; font-weight: 600;">Mind Status</h1>
-                                    </td>
-                                </tr>
-                                
-                                <!-- メインコンテンツ -->
-                                <tr>
-                                    <td style="padding: 40px 30px;">
-                                        <h2 style="color: #333333; margin: 0 0 20px 0; font-size: 22px;">ようこそ、{user_name} 様</h2>
-                                        
-                                        <p style="color: #555555; font-size: 16px; line-height: 1.6; margin: 0 0 30px 0;">
-                                            Mind Status へのご招待です。<br>
-                                            以下のボタンからパスワードを設定してアカウントを有効化してください。
-                                        </p>
-                                        
-                                        <!-- ボタン（メールクライアント互換性最優先） -->
-                                        <table width="100%" cellpadding="0" cellspacing="0" border="0">
-                                            <tr>
-                                                <td align="center" style="padding: 20px 0;">
-                                                    <table cellpadding="0" cellspacing="0" border="0">
-                                                        <tr>
-                                                            <td bgcolor="#667eea" style="background-color: #667eea; border-radius: 8px; padding: 16px 40px;">
-                                                                <a href="{invite_url}" style="display: inline-block; color:#ffffff !important; text-decoration: none; font-weight: 600; font-size: 16px; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;">
-                                                                    アカウントを有効化
-                                                                </a>
-                                                            </td>
-                                                        </tr>
-                                                    </table>
-                                                </td>
-                                            </tr>
-                                        </table>
-                                        
-                                        <!-- リンクのフォールバック -->
-                                        <p style="color: #999999; font-size: 13px; line-height: 1.5; margin: 10px 0; text-align: center;">
-                                            ボタンが表示されない場合は、以下のURLをコピーしてブラウザで開いてください：<br>
-                                            <a href="{invite_url}" style="color: #667eea; word-break: break-all;">{invite_url}</a>
-                                        </p>
-                                        
-                                        <!-- 注意事項 -->
-                                        <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 30px 0;">
-                                            <tr>
-                                                <td bgcolor="#fff3cd" style="background-color: #fff3cd; border-left: 4px solid #ffc107; padding: 15px; border-radius: 4px;">
-                                                    <p style="margin: 0; color: #856404; font-size: 14px; line-height: 1.5;">
-                                                        <strong>⏰ このリンクは7日間有効です</strong><br>
-                                                        期限切れの場合は、管理者に再発行を依頼してください。
-                                                    </p>
-                                                </td>
-                                            </tr>
-                                        </table>
-                                        
-                                        <p style="color: #999999; font-size: 13px; line-height: 1.5; margin: 20px 0 0 0;">
-                                            ※このメールに心当たりがない場合は、このまま削除してください。<br>
-                                            第三者がメールアドレスを誤って入力した可能性があります。
-                                        </p>
-                                    </td>
-                                </tr>
-                                
-                                <!-- フッター -->
-                                <tr>
-                                    <td bgcolor="#f8f9fa" style="background-color: #f8f9fa; padding: 20px; text-align: center; border-top: 1px solid #e9ecef;">
-                                        <p style="margin: 5px 0; color: #999999; font-size: 12px;">Mind Status 運営チーム</p>
-                                        <p style="margin: 5px 0; color: #999999; font-size: 12px;">このメールは自動送信されています</p>
-                                    </td>
-                                </tr>
-                            </table>
-                        </td>
-                    </tr>
-                </table>
-            </body>
-            </html>
-            '''
-        )
-        
-        sg = SendGridAPIClient(api_key)
-        response = sg.send(message)
-        
-        # 成功ログ（URLは含めない）
-        logger.info(
-            f'✅ SendGrid送信成功（招待）: {user_email} '
-            f'(Status: {response.status_code})'
-        )
-        return True
-        
-    except HTTPError as e:
-        # SendGrid APIエラー（400, 401, 403など）
-        logger.error(
-            f'❌ SendGrid APIエラー（招待）: {user_email} '
-            f'(Status: {e.status_code}, Reason: {e.reason})'
-        )
-        return False
-        
-    except Exception as e:
-        # その他の予期しないエラー
-        logger.error(
-            f'❌ SendGrid送信失敗（招待・予期しないエラー）: {user_email} '
-            f'- {type(e).__name__}: {str(e)}'
-        )
-        return False
+        if headers.get('Retry-After'):
+            return max(0, int(headers['Retry-After']))
+        if headers.get('X-RateLimit-Reset'):
+            return max(0, int(headers['X-RateLimit-Reset']) - int(time.time()))
+    except ValueError:
+        pass
+    return None
+
+
+def _from_address():
+    """DEFAULT_FROM_EMAIL（'名前 <アドレス>' 形式も可）を SendGrid の from に変換"""
+    name, address = parseaddr(getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@mindstatus.com'))
+    return {'email': address, 'name': name} if name else {'email': address}
+
+
+def build_sendgrid_payload(kind, recipients):
+    """
+    /v3/mail/send のリクエストボディを作成（宛先ごとに personalization を作成）
+    
+    本文は EMAIL_KINDS の生成済みの HTML を使い、宛名・URL は substitutions で差し込む。
+    
+    Args:
+        kind: 'INVITE' or 'RESET'
+        recipients: [(メールアドレス, ユーザー名, URL)]
+    """
+    config = EMAIL_KINDS[kind]
+    return {
+        'personalizations': [
+            {
+                'to': [{'email': user_email}],
+                # HTML に差し込むため値はエスケープする
+                'substitutions': {
+                    USER_NAME_TAG: html.escape(user_name),
+                    ACTION_URL_TAG: html.escape(url),
+                },
+            }
+            for user_email, user_name, url in recipients
+        ],
+        'from': _from_address(),
+        'subject': config['subject'],
+        'content': [{'type': 'text/html', 'value': config['html']}],
+    }
 
 
-def _send_password_reset_via_sendgrid(api_key, user_email, user_name, reset_url):
-    """SendGrid経由でパスワードリセットメール送信"""
+def _send_via_sendgrid(transport, kind, recipients):
+    """
+    SendGrid経由でまとめて送信
+    
+    Args:
+        transport: SendGridTransport
+        kind: 'INVITE' or 'RESET'
+        recipients: [(メールアドレス, ユーザー名, URL)]
+    
+    Returns:
+        dict: send_emails() と同じ
+    """
+    label = EMAIL_KINDS[kind]['label']
     try:
-        default_from = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@mindstatus.com')
-        
-        message = Mail(
-            from_email=default_from,
-            to_emails=user_email,
-            subject='Mind Status - パスワードリセット',
-            html_content=f'''
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            </head>
-            <body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background-color: #f5f5f5;">
-                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f5f5f5; padding: 20px 0;">
-                    <tr>
-                        <td align="center">
-                            <table width="600" cellpadding="0" cellspacing="0" border="0" style="max-width: 600px; background-color: #ffffff; border-radius: 10px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                                <!-- ヘッダー -->
-                                <tr>
-                                    <td bgcolor="#667eea" style="background-color: #667eea; padding: 40px; text-align: center;">
-                                        <h1 style="color: #ffffff; margin: 0; font-size: 28px; font-weight: 600;">Mind Status</h1>
-                                    </td>
-                                </tr>
-                                
-                                <!-- メインコンテンツ -->
-                                <tr>
-                                    <td style="padding: 40px 30px;">
-                                        <h2 style="color: #333333; margin: 0 0 20px 0; font-size: 22px;">{user_name} 様</h2>
-                                        
-                                        <p style="color: #555555; font-size: 16px; line-height: 1.6; margin: 0 0 30px 0;">
-                                            パスワードリセットのリクエストを受け付けました。<br>
-                                            以下のボタンから新しいパスワードを設定してください。
-                                        </p>
-                                        
-                                        <!-- ボタン（メールクライアント互換性最優先） -->
-                                        <table width="100%" cellpadding="0" cellspacing="0" border="0">
-                                            <tr>
-                                                <td align="center" style="padding: 20px 0;">
-                                                    <table cellpadding="0" cellspacing="0" border="0">
-                                                        <tr>
-                                                            <td bgcolor="#667eea" style="background-color: #667eea; border-radius: 8px; padding: 16px 40px;">
-                                                                <a href="{reset_url}" style="display: inline-block; color: #ffffff; text-decoration: none; font-weight: 600; font-size: 16px; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;">
-                                                                    パスワードをリセット
-                                                                </a>
-                                                            </td>
-                                                        </tr>
-                                                    </table>
-                                                </td>
-                                            </tr>
-                                        </table>
-                                        
-                                        <!-- リンクのフォールバック -->
-                                        <p style="color: #999999; font-size: 13px; line-height: 1.5; margin: 10px 0; text-align: center;">
-                                            ボタンが表示されない場合は、以下のURLをコピーしてブラウザで開いてください：<br>
-                                            <a href="{reset_url}" style="color: #667eea; word-break: break-all;">{reset_url}</a>
-                                        </p>
-                                        
-                                        <!-- 注意事項 -->
-                                        <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 30px 0;">
-                                            <tr>
-                                                <td bgcolor="#fff3cd" style="background-color: #fff3cd; border-left: 4px solid #ffc107; padding: 15px; border-radius: 4px;">
-                                                    <p style="margin: 0; color: #856404; font-size: 14px; line-height: 1.5;">
-                                                        <strong>⏰ このリンクは1時間有効です</strong>
-                                                    </p>
-                                                </td>
-                                            </tr>
-                                        </table>
-                                        
-                                        <p style="color: #999999; font-size: 13px; line-height: 1.5; margin: 20px 0 0 0;">
-                                            ※このリクエストに心当たりがない場合は、このメールを無視してください。<br>
-                                            パスワードは変更されません。
-                                        </p>
-                                    </td>
-                                </tr>
-                                
-                                <!-- フッター -->
-                                <tr>
-                                    <td bgcolor="#f8f9fa" style="background-color: #f8f9fa; padding: 20px; text-align: center; border-top: 1px solid #e9ecef;">
-                                        <p style="margin: 5px 0; color: #999999; font-size: 12px;">Mind Status 運営チーム</p>
-                                    </td>
-                                </tr>
-                            </table>
-                        </td>
-                    </tr>
-                </table>
-            </body>
-            </html>
-            '''
-        )
-        
-        sg = SendGridAPIClient(api_key)
-        response = sg.send(message)
-        
-        logger.info(
-            f'✅ SendGrid送信成功（パスワードリセット）: {user_email} '
-            f'(Status: {response.status_code})'
-        )
-        return True
-        
-    except HTTPError as e:
-        logger.error(
-            f'❌ SendGrid APIエラー（パスワードリセット）: {user_email} '
-            f'(Status: {e.status_code}, Reason: {e.reason})'
-        )
-        return False
+        status, headers, body = transport.send(build_sendgrid_payload(kind, recipients))
         
     except Exception as e:
+        # 接続エラー・タイムアウトなど
         logger.error(
-            f'❌ SendGrid送信失敗（パスワードリセット）: {user_email} '
+            f'❌ SendGrid送信失敗（{label}・予期しないエラー）: {len(recipients)}件 '
             f'- {type(e).__name__}: {str(e)}'
         )
-        return False
+        return _result(False, error=f'{type(e).__name__}: {str(e)}', retry=True)
+    
+    if 200 <= status < 300:
+        # 成功ログ（URLは含めない）
+        logger.info(
+            f'✅ SendGrid送信成功（{label}）: {len(recipients)}件 '
+            f'(Status: {status})'
+        )
+        return _result(True, status=status, message_id=headers.get('X-Message-Id', ''))
+    
+    # SendGrid APIエラー（400, 401, 403, 429, 5xx など）
+    reason = body.decode('utf-8', errors='replace')[:1000]
+    logger.error(
+        f'❌ SendGrid APIエラー（{label}）: {len(recipients)}件 '
+        f'(Status: {status}, Reason: {reason})'
+    )
+    return _result(
+        False,
+        status=status,
+        error=f'{status} {reason}',
+        retry=status in RETRYABLE_STATUSES or status >= 500,
+        retry_after=_retry_after(headers) if status == 429 else None,
+    )
 
 
 def _send_via_smtp(user_email, user_name, invite_url):
@@ -0,0 +1,140 @@
+"""
+メール送信のレート制限（トークンバケット・全ワーカーで共有）
+
+状態は EmailRateLimit の1行に保存し select_for_update で排他して更新するため、
+複数の run_email_worker で共有され、再起動しても引き継がれる。
+
+- トークンは宛先1件につき1つ。rate（通/秒）の速さで EMAIL_RATE_LIMIT_BURST まで貯まる
+- 429・5xx を受けたら rate を DECREASE_FACTOR 倍に下げ（下限 EMAIL_RATE_LIMIT_MIN_PER_SECOND）、
+  トークンを空にする。429 は Retry-After（X-RateLimit-Reset）まで送信を止める
+- 問題なく送信できたら rate を EMAIL_RATE_LIMIT_PER_SECOND まで少しずつ戻す（AIMD）
+- EMAIL_DAILY_LIMIT（0 は無制限）で1日の送信件数を制限する
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import EmailRateLimit
+
+logger = logging.getLogger(__name__)
+
+LIMITER_KEY = 'sendgrid'
+# 429・5xx を受けたときの rate の倍率
+DECREASE_FACTOR = 0.5
+# 送信に成功したときに rate を戻す量（EMAIL_RATE_LIMIT_PER_SECOND に対する割合）
+INCREASE_RATIO = 0.1
+# Retry-After がない 429 で送信を止める秒数
+DEFAULT_PAUSE_SECONDS = 1
+
+
+def _locked_state(now):
+    """レート制限の状態を排他ロックして取得し、経過時間分のトークンを補充する（トランザクション内で呼ぶ）"""
+    max_rate = settings.EMAIL_RATE_LIMIT_PER_SECOND
+    burst = settings.EMAIL_RATE_LIMIT_BURST
+    EmailRateLimit.objects.get_or_create(
+        key=LIMITER_KEY,
+        defaults={'rate': max_rate, 'tokens': burst, 'updated_at': now},
+    )
+    state = EmailRateLimit.objects.select_for_update().get(key=LIMITER_KEY)
+
+    # 設定が変わった場合も上限・下限に収める
+    state.rate = min(max(state.rate, settings.EMAIL_RATE_LIMIT_MIN_PER_SECOND), max_rate)
+    elapsed = max(0.0, (now - state.updated_at).total_seconds())
+    state.tokens = min(burst, state.tokens + state.rate * elapsed)
+    state.updated_at = now
+
+    today = timezone.localdate(now)
+    if state.day != today:
+        state.day = today
+        state.day_count = 0
+    return state
+
+
+def acquire_email_tokens(count):
+    """
+    最大 count 件分の送信枠を取得する
+
+    API 呼び出しが細切れにならないよう、1秒分（rate 件）以上のトークンが貯まるまでは取得しない
+    （その日の残り件数が rate 件より少ない場合は残り件数まで）。
+
+    Args:
+        count: 送信したい件数
+
+    Returns:
+        int: 取得できた件数（0 の場合は待ってから再度取得する）
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        state = _locked_state(now)
+        granted = 0
+        if not (state.paused_until and state.paused_until > now):
+            available = int(state.tokens)
+            threshold = min(count, max(1, int(state.rate)))
+            if settings.EMAIL_DAILY_LIMIT:
+                daily_remaining = max(0, settings.EMAIL_DAILY_LIMIT - state.day_count)
+                available = min(available, daily_remaining)
+                threshold = min(threshold, daily_remaining)
+            if available > 0 and available >= threshold:
+                granted = min(count, available)
+        state.tokens -= granted
+        state.day_count += granted
+        state.save()
+    return granted
+
+
+def release_email_tokens(count):
+    """acquire_email_tokens で取得したが使わなかった送信枠を戻す"""
+    if count <= 0:
+        return
+    with transaction.atomic():
+        state = _locked_state(timezone.now())
+        state.tokens = min(settings.EMAIL_RATE_LIMIT_BURST, state.tokens + count)
+        state.day_count = max(0, state.day_count - count)
+        state.save()
+
+
+def record_email_results(results):
+    """
+    送信結果から送信レートを調整する
+
+    Args:
+        results: send_emails() の結果のリスト
+    """
+    throttled = [result for result in results if result['status'] == 429]
+    overloaded = throttled or [result for result in results if (result['status'] or 0) >= 500]
+    if not overloaded and not any(result['sent'] for result in results):
+        return
+
+    now = timezone.now()
+    max_rate = settings.EMAIL_RATE_LIMIT_PER_SECOND
+    with transaction.atomic():
+        state = _locked_state(now)
+        if overloaded:
+            state.rate = max(settings.EMAIL_RATE_LIMIT_MIN_PER_SECOND, state.rate * DECREASE_FACTOR)
+            state.tokens = 0
+            if throttled:
+                pause = max(result['retry_after'] or DEFAULT_PAUSE_SECONDS for result in throttled)
+                state.paused_until = now + timedelta(seconds=min(pause, settings.EMAIL_RETRY_MAX_SECONDS))
+            logger.warning(
+                '送信レートを下げます: %.1f通/秒（%s）',
+                state.rate,
+                ', '.join(sorted({str(result['status']) for result in overloaded})),
+            )
+        else:
+            state.rate = min(max_rate, state.rate + max_rate * INCREASE_RATIO)
+        state.save()
+
+
+def daily_limit_reached():
+    """EMAIL_DAILY_LIMIT に達していて、今日はこれ以上送信できないか"""
+    if not settings.EMAIL_DAILY_LIMIT:
+        return False
+    state = EmailRateLimit.objects.filter(key=LIMITER_KEY).values_list('day', 'day_count').first()
+    if state is None:
+        return False
+    day, day_count = state
+    return day == timezone.localdate() and day_count >= settings.EMAIL_DAILY_LIMIT
@@ -0,0 +1,146 @@
+"""
+SendGrid v3 API（/v3/mail/send）への HTTP 送信
+
+SendGridAPIClient は呼び出しごとに新しい接続（TLS ハンドシェイク）を作るため、
+http.client の keep-alive 接続をプロセス内でプールして使い回す。
+複数のリクエストはスレッドプール（接続数と同じ上限）で並行に送信する。
+"""
+
+import http.client
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+SENDGRID_API_URL = 'https://api.sendgrid.com'
+MAIL_SEND_PATH = '/v3/mail/send'
+TIMEOUT_SECONDS = 30
+
+# keep-alive 接続が相手側で切られていた場合に発生する例外（新しい接続で1回だけ送り直す）
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class SendGridTransport:
+    """
+    keep-alive 接続をプールして SendGrid にリクエストを送る（スレッドセーフ）
+
+    Args:
+        api_key: SendGrid API Key
+        base_url: API の URL（スキーム・ホスト・ポート）
+        max_connections: 同時に使う接続数（= 並行送信数）の上限
+        timeout: 接続・応答待ちのタイムアウト秒数
+    """
+
+    def __init__(self, api_key, base_url=SENDGRID_API_URL, max_connections=4, timeout=TIMEOUT_SECONDS):
+        parts = urlsplit(base_url)
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_connections = max(1, max_connections)
+        self._connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        )
+        self._host = parts.hostname
+        self._port = parts.port
+        self._timeout = timeout
+        self._path = parts.path.rstrip('/') + MAIL_SEND_PATH
+        self._headers = {
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+        }
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix='email-send')
+
+    def send(self, payload):
+        """
+        メールを1リクエスト送信する
+
+        Args:
+            payload: /v3/mail/send のリクエストボディ（dict）
+
+        Returns:
+            tuple: (HTTPステータス, レスポンスヘッダー, レスポンスボディ)
+
+        Raises:
+            OSError, http.client.HTTPException: 接続エラー・タイムアウト
+        """
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        with self._slots:
+            conn, reused = self._checkout()
+            try:
+                try:
+                    response = self._request(conn, body)
+                except STALE_CONNECTION_ERRORS:
+                    if not reused:
+                        raise
+                    conn.close()
+                    conn = self._connect()
+                    response = self._request(conn, body)
+            except BaseException:
+                conn.close()
+                raise
+
+            status, headers, data, will_close = response
+            if will_close:
+                conn.close()
+            else:
+                self._idle.put(conn)
+            return status, headers, data
+
+    def map(self, func, items):
+        """func(item) をスレッドプールで並行に実行し、結果を items の順に返す"""
+        items = list(items)
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        return list(self._executor.map(func, items))
+
+    def close(self, wait=True):
+        """スレッドプールを止め、プール中の接続を閉じる"""
+        self._executor.shutdown(wait=wait)
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _checkout(self):
+        """プール中の接続（なければ新しい接続）を返す"""
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._connect(), False
+
+    def _connect(self):
+        return self._connection_class(self._host, self._port, timeout=self._timeout)
+
+    def _request(self, conn, body):
+        conn.request('POST', self._path, body=body, headers=self._headers)
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, response.headers, data, response.will_close
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """
+    プロセスで共有する SendGridTransport（初回に作成・API Key / SENDGRID_API_HOST が変わったら作り直す）
+    """
+    global _transport
+    api_key = settings.SENDGRID_API_KEY
+    base_url = settings.SENDGRID_API_HOST
+    with _transport_lock:
+        if _transport is None or (_transport.api_key, _transport.base_url) != (api_key, base_url):
+            if _transport is not None:
+                # 送信中のリクエストの完了は待たない
+                _transport.close(wait=False)
+            _transport = SendGridTransport(
+                api_key, base_url=base_url, max_connections=settings.EMAIL_SEND_CONCURRENCY
+            )
+        return _transport
@@ -0,0 +1,456 @@
+"""
+ステータスの Excel/CSV 出力
+
+- 期間指定モード: 指定期間内の全ステータス記録
+- 最新ステータスモード: 有効化済みユーザーごとの最新ステータス
+
+どちらのモードも、行データは values() の iterator から1行ずつ生成する。
+CSV はその行を StreamingHttpResponse でそのまま送り出すため、
+出力件数に関わらずメモリ使用量は一定（chunk_size 行分）に収まる。
+Excel は openpyxl の write-only モードで一時ファイルに書き出し、ファイルから送り出す。
+
+期間の長い出力は ExportJob としてキューに入れ、run_worker が EXPORT_ROOT にファイルを生成する。
+"""
+
+import csv
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.settings import APISettings
+
+from ..models import StatusLog, User
+from .status import JST
+
+STATUS_LABELS = {'GREEN': '健康', 'YELLOW': '注意', 'RED': '警告'}
+
+# iterator() で一度に取得する行数
+EXPORT_CHUNK_SIZE = 2000
+# CSV をまとめて送り出す行数（1行ずつ yield するとチャンクが細かくなりすぎる）
+CSV_FLUSH_ROWS = 500
+
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Excel で文字化けしないよう UTF-8 の BOM を付ける
+CSV_BOM = '\ufeff'
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """
+    ?format= を出力形式（xlsx/csv）の指定として使うため、
+    DRF のレンダラー選択（URL_FORMAT_OVERRIDE）には使わない
+    """
+    settings = APISettings({'URL_FORMAT_OVERRIDE': None})
+
+
+def export_filters(params):
+    """
+    クエリパラメータから出力フィルタを取得（'all' や空は指定なし扱い）
+
+    Returns:
+        dict: department, grade, class_name, status, search
+    """
+    def value(key):
+        v = params.get(key)
+        return v if v and v != 'all' else None
+
+    return {
+        'department': value('department'),
+        'grade': value('grade'),
+        'class_name': value('class'),
+        'status': value('status'),
+        'search': params.get('search') or None,
+    }
+
+
+def export_headers(org_type, latest=False):
+    """出力のヘッダー行（組織タイプ別）"""
+    status_header = '最新ステータス' if latest else 'ステータス'
+    if org_type == 'SCHOOL':
+        return ['氏名', '学年', '組・クラス', status_header, 'コメント', '記録日時']
+    return ['氏名', '所属・部署', '役職', status_header, 'コメント', '記録日時']
+
+
+def parse_export_options(params):
+    """
+    リクエストの指定を出力条件に変換
+
+    Args:
+        params: format, start_date, end_date と各フィルタを含む dict 相当
+
+    Returns:
+        dict: format, start_date, end_date（date または None）, filters
+
+    Raises:
+        ValueError: 出力形式・日付が不正な場合（メッセージはそのままエラー表示に使う）
+    """
+    output_format = params.get('format') or 'xlsx'
+    if output_format not in ('xlsx', 'csv'):
+        raise ValueError('出力形式は xlsx または csv を指定してください')
+
+    start_date = end_date = None
+    if params.get('start_date') and params.get('end_date'):
+        try:
+            start_date = datetime.strptime(params['start_date'], '%Y-%m-%d').date()
+            end_date = datetime.strptime(params['end_date'], '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('日付形式が正しくありません（YYYY-MM-DD）')
+
+    return {
+        'format': output_format,
+        'start_date': start_date,
+        'end_date': end_date,
+        'filters': export_filters(params),
+    }
+
+
+def options_to_params(options):
+    """出力条件を ExportJob.params に保存できる形にする"""
+    params = {'format': options['format']}
+    if options['start_date']:
+        params['start_date'] = options['start_date'].isoformat()
+        params['end_date'] = options['end_date'].isoformat()
+    # export_filters() が読むキー名で保存
+    for key, param in (('department', 'department'), ('grade', 'grade'), ('class_name', 'class'),
+                       ('status', 'status'), ('search', 'search')):
+        if options['filters'][key]:
+            params[param] = options['filters'][key]
+    return params
+
+
+def build_export(organization, options):
+    """
+    出力条件から、ヘッダー・行・シート設定をまとめて返す
+
+    Returns:
+        dict: headers, rows, queryset（件数取得用）, sheet_title, header_color, basename
+    """
+    filters = options['filters']
+    if options['start_date']:
+        # 期間指定モード: 全ステータス記録を出力
+        start_date, end_date = options['start_date'], options['end_date']
+        return {
+            'headers': export_headers(organization.org_type),
+            'rows': period_rows(organization, start_date, end_date, filters),
+            'queryset': period_logs(organization, start_date, end_date, filters),
+            'sheet_title': 'ステータス記録',
+            'header_color': '4472C4',
+            'basename': f'user_status_{start_date}_{end_date}',
+        }
+    # 最新ステータスモード
+    return {
+        'headers': export_headers(organization.org_type, latest=True),
+        'rows': latest_rows(organization, filters),
+        'queryset': latest_users(organization, filters),
+        'sheet_title': '最新ステータス',
+        'header_color': '70AD47',
+        'basename': 'user_status_latest',
+    }
+
+
+def _local_datetime(value):
+    """日本時間の naive datetime（Excel はタイムゾーン付きの値を扱えないため）"""
+    return value.astimezone(JST).replace(tzinfo=None, microsecond=0)
+
+
+def period_logs(organization, start_date, end_date, filters):
+    """期間指定モードの対象記録（有効化済み・無効化されていないユーザーのみ）"""
+    logs = StatusLog.objects.filter(
+        user__organization=organization,
+        user__role='USER',
+        user__is_activated=True,
+        user__is_active=True,
+        local_date__gte=start_date,
+        local_date__lte=end_date,
+    )
+
+    # フィルタ適用（企業用）
+    if filters['department']:
+        logs = logs.filter(user__department=filters['department'])
+
+    # フィルタ適用（学校用）
+    if filters['grade']:
+        logs = logs.filter(user__grade=int(filters['grade']))
+    if filters['class_name']:
+        logs = logs.filter(user__class_name=filters['class_name'])
+
+    # 共通フィルタ
+    if filters['status']:
+        logs = logs.filter(status=filters['status'])
+    if filters['search']:
+        logs = logs.filter(user__full_name__icontains=filters['search'])
+    return logs
+
+
+def period_rows(organization, start_date, end_date, filters, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    期間指定モードの行を生成
+
+    Args:
+        organization: 組織
+        start_date: 開始日（日本時間）
+        end_date: 終了日（日本時間）
+        filters: export_filters() の結果
+        chunk_size: iterator() の取得単位
+
+    Yields:
+        list: ヘッダーと同じ並びのセル値
+    """
+    logs = period_logs(organization, start_date, end_date, filters)
+    if organization.org_type == 'SCHOOL':
+        attributes = ('user__grade', 'user__class_name')
+    else:
+        attributes = ('user__department', 'user__position')
+
+    rows = logs.order_by('user__full_name', 'created_at').values_list(
+        'user__full_name', *attributes, 'status', 'comment', 'created_at',
+    )
+    for full_name, first, second, status, comment, created_at in rows.iterator(chunk_size=chunk_size):
+        yield [
+            full_name,
+            first or '-',
+            second or '-',
+            STATUS_LABELS.get(status, status),
+            comment or '-',
+            _local_datetime(created_at),
+        ]
+
+
+def latest_users(organization, filters):
+    """最新ステータスモードの対象ユーザー（ステータスフィルタは最新ステータス基準）"""
+    users = User.objects.filter(
+        organization=organization,
+        role='USER',
+        is_activated=True,
+        is_active=True,
+    )
+
+    # フィルタ適用（企業用）
+    if filters['department']:
+        users = users.filter(department=filters['department'])
+
+    # フィルタ適用（学校用）
+    if filters['grade']:
+        users = users.filter(grade=int(filters['grade']))
+    if filters['class_name']:
+        users = users.filter(class_name=filters['class_name'])
+
+    # 共通フィルタ
+    if filters['search']:
+        users = users.filter(full_name__icontains=filters['search'])
+    if filters['status']:
+        users = users.filter(latest_status__status=filters['status'])
+    return users
+
+
+def latest_rows(organization, filters, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    最新ステータスモードの行を生成（記録のないユーザーは '-'）
+
+    Args:
+        organization: 組織
+        filters: export_filters() の結果
+        chunk_size: iterator() の取得単位
+
+    Yields:
+        list: ヘッダーと同じ並びのセル値
+    """
+    users = latest_users(organization, filters)
+    if organization.org_type == 'SCHOOL':
+        attributes = ('grade', 'class_name')
+    else:
+        attributes = ('department', 'position')
+
+    rows = users.order_by('full_name').values_list(
+        'full_name', *attributes,
+        'latest_status__status', 'latest_status__comment', 'latest_status__created_at',
+    )
+    for full_name, first, second, status, comment, created_at in rows.iterator(chunk_size=chunk_size):
+        has_log = created_at is not None
+        yield [
+            full_name,
+            first or '-',
+            second or '-',
+            STATUS_LABELS.get(status, '-') if has_log else '-',
+            comment if has_log else '-',
+            _local_datetime(created_at) if has_log else '-',
+        ]
+
+
+class _Echo:
+    """csv.writer の書き込み先（書き込まれた文字列をそのまま返す）"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(headers, rows, flush_rows=CSV_FLUSH_ROWS):
+    """
+    ヘッダーと行を CSV として少しずつ生成する
+
+    ヘッダー（と BOM）はクエリ実行前に送り出すため、最初のバイトはすぐに返る。
+
+    Yields:
+        bytes: UTF-8 でエンコードした CSV の断片
+    """
+    writer = csv.writer(_Echo())
+    yield (CSV_BOM + writer.writerow(headers)).encode('utf-8')
+
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow([
+            value.strftime(DATETIME_FORMAT) if isinstance(value, datetime) else value
+            for value in row
+        ]))
+        if len(buffer) >= flush_rows:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+# 列幅（氏名・属性2列・ステータス・コメント・記録日時）
+COLUMN_WIDTHS = {'A': 15, 'B': 12, 'C': 12, 'D': 12, 'E': 40, 'F': 20}
+
+
+def _named_styles(header_color):
+    """ヘッダーと記録日時の名前付きスタイル（セルごとにスタイルを複製しない）"""
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+
+    header = NamedStyle(name=f'export_header_{header_color}')
+    header.font = Font(bold=True, color='FFFFFF')
+    header.fill = PatternFill(start_color=header_color, end_color=header_color, fill_type='solid')
+    header.alignment = Alignment(horizontal='center')
+
+    timestamp = NamedStyle(name='export_datetime', number_format='yyyy-mm-dd hh:mm:ss')
+    return header, timestamp
+
+
+def write_xlsx(fileobj, headers, rows, sheet_title, header_color):
+    """
+    ヘッダーと行を write-only モードの Excel としてファイルに書き出す
+
+    行はワークシートの一時ファイルへ順に書き出されるため、セルはメモリに残らない
+    （文字列は共有文字列表に入るため、異なる文字列の数に応じて増える）。
+
+    Args:
+        fileobj: 書き込み先（一時ファイルなど）
+        headers: ヘッダー行
+        rows: 行のイテラブル（period_rows / latest_rows）
+        sheet_title: シート名
+        header_color: ヘッダーの背景色（RGB）
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    wb = Workbook(write_only=True)
+    header_style, timestamp_style = _named_styles(header_color)
+    wb.add_named_style(header_style)
+    wb.add_named_style(timestamp_style)
+
+    ws = wb.create_sheet(sheet_title)
+    for column, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[column].width = width
+
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.style = header_style.name
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    for row in rows:
+        *values, recorded_at = row
+        if isinstance(recorded_at, datetime):
+            recorded_at = WriteOnlyCell(ws, value=recorded_at)
+            recorded_at.style = timestamp_style.name
+        ws.append([*values, recorded_at])
+
+    wb.save(fileobj)
+
+
+# 進捗（rows_processed）を保存する間隔（行数）
+PROGRESS_EVERY = 1000
+
+
+def _export_root():
+    from django.conf import settings
+    return Path(settings.EXPORT_ROOT)
+
+
+def _with_progress(job, rows):
+    """行を数えながら流し、PROGRESS_EVERY 行ごとに進捗を保存する"""
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % PROGRESS_EVERY == 0:
+            job.heartbeat(rows_processed=count)
+    job.heartbeat(rows_processed=count)
+
+
+def run_export_job(job):
+    """
+    ExportJob を実行し、ファイルを EXPORT_ROOT に保存する（run_worker から呼ばれる）
+
+    一時ファイルに書き出してから置き換えるため、書き出し途中のファイルがダウンロードされることはない。
+    """
+    from django.conf import settings
+    from django.utils import timezone
+
+    options = parse_export_options(job.params)
+    export = build_export(job.organization, options)
+    job.heartbeat(total_rows=export['queryset'].count(), rows_processed=0)
+
+    root = _export_root()
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / f'{job.id}.{options["format"]}'
+    partial = path.with_suffix(path.suffix + '.part')
+
+    rows = _with_progress(job, export['rows'])
+    try:
+        with open(partial, 'wb') as output:
+            if options['format'] == 'csv':
+                for chunk in stream_csv(export['headers'], rows):
+                    output.write(chunk)
+            else:
+                write_xlsx(output, export['headers'], rows, export['sheet_title'], export['header_color'])
+        os.replace(partial, path)
+    finally:
+        if partial.exists():
+            partial.unlink()
+
+    job.mark_succeeded(
+        file_name=f'{export["basename"]}.{options["format"]}',
+        file_path=path.name,
+        file_size=path.stat().st_size,
+        expires_at=timezone.now() + timedelta(hours=settings.EXPORT_FILE_TTL_HOURS),
+    )
+
+
+def export_file_path(job):
+    """ジョブの出力ファイルの絶対パス"""
+    return _export_root() / job.file_path
+
+
+def delete_expired_exports():
+    """
+    期限切れの出力ファイルを削除し、ジョブのファイル情報を消す
+
+    Returns:
+        int: 削除したファイル数
+    """
+    from django.utils import timezone
+    from ..models import ExportJob
+
+    deleted = 0
+    expired = ExportJob.objects.filter(expires_at__lt=timezone.now()).exclude(file_path='')
+    for job in expired.iterator():
+        path = export_file_path(job)
+        if path.exists():
+            path.unlink()
+            deleted += 1
+        ExportJob.objects.filter(pk=job.pk).update(file_path='')
+    return deleted
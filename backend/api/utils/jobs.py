@@ -0,0 +1,102 @@
+"""
+バックグラウンドジョブの実行（run_worker から使う）
+
+JOB_TYPES に（モデル, 実行関数）を登録する。
+ワーカーは種類に関係なく最も古い（created_at）待機中のジョブから1件ずつ実行する
+（一括登録が続いても出力ジョブが後回しにされ続けないように）。
+実行中はハートビートスレッドが JOB_HEARTBEAT_SECONDS ごとに heartbeat_at を更新するため、
+1チャンクの処理が JOB_STALE_SECONDS を超えても他のワーカーに再取得されない。
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from ..models import BulkUploadJob, ExportJob
+from .bulk_upload import run_bulk_upload_job
+from .export import run_export_job
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPES = [
+    (BulkUploadJob, run_bulk_upload_job),
+    (ExportJob, run_export_job),
+]
+
+
+@contextmanager
+def heartbeat_in_background(job, interval=None):
+    """
+    with ブロックの間、別スレッドで job.touch() を interval 秒ごとに呼ぶ
+
+    スレッドは自分の DB 接続を使い、終了時に閉じる。
+    """
+    if interval is None:
+        interval = settings.JOB_HEARTBEAT_SECONDS
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(interval):
+                try:
+                    job.touch()
+                except Exception:
+                    logger.exception('%s %s heartbeat failed', type(job).__name__, job.id)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f'job-heartbeat-{job.id}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def _job_types_by_age(stale_after):
+    """取得できるジョブがある種類を、最も古いジョブの created_at の順に返す"""
+    candidates = []
+    for model, handler in JOB_TYPES:
+        created_at = model.oldest_claimable_at(stale_after)
+        if created_at is not None:
+            candidates.append((created_at, model, handler))
+    candidates.sort(key=lambda candidate: candidate[0])
+    return [(model, handler) for _, model, handler in candidates]
+
+
+def run_next_job():
+    """
+    待機中のジョブを1件実行する
+
+    Returns:
+        bool: ジョブを実行した場合 True（キューが空なら False）
+    """
+    stale_after = timedelta(seconds=settings.JOB_STALE_SECONDS)
+    close_old_connections()
+    for model, handler in _job_types_by_age(stale_after):
+        # 他のワーカーが先に取得した場合は次に古い種類を試す
+        job = model.claim_next(stale_after)
+        if job is None:
+            continue
+
+        if job.attempts > model.MAX_ATTEMPTS:
+            job.mark_failed('実行回数の上限に達しました')
+            logger.error('%s %s gave up after %s attempts', model.__name__, job.id, job.attempts - 1)
+            return True
+
+        logger.info('%s %s started (attempt %s)', model.__name__, job.id, job.attempts)
+        try:
+            with heartbeat_in_background(job):
+                handler(job)
+        except Exception as e:
+            logger.exception('%s %s failed', model.__name__, job.id)
+            job.mark_failed(e)
+        else:
+            logger.info('%s %s finished', model.__name__, job.id)
+        return True
+    return False
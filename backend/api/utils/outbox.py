@@ -0,0 +1,197 @@
+"""
+メールの送信キュー（EmailOutbox）
+
+リクエスト処理ではユーザー・トークンと同じトランザクションで EmailOutbox に登録するだけにし、
+run_email_worker が deliver_outbox() でまとめて送信する。
+
+- 同じ種別のメールは EMAIL_OUTBOX_BATCH_SIZE 件ずつ1回の API 呼び出しで送信し、
+  複数のまとまりは EMAIL_SEND_CONCURRENCY 件まで並行に送信（email.send_email_batches）
+- 一時的な失敗（429・5xx・接続エラー）は指数バックオフで再送し、MAX_ATTEMPTS 回で FAILED
+- 400（宛先不正など）はまとめて送った場合のみ1通ずつ送り直し、原因の宛先だけを FAILED にする
+- 送信件数は email_rate_limit のトークンバケットで制限し（全ワーカーで共有）、
+  組織ごとに順番に取得する（EmailOutbox.claim_batch）
+"""
+
+import itertools
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from ..models import EmailOutbox
+from .email import send_email_batches
+from .email_rate_limit import acquire_email_tokens, record_email_results, release_email_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def invite_url(token):
+    return f"{settings.FRONTEND_URL}/invite/{token.token}"
+
+
+def reset_url(token):
+    return f"{settings.FRONTEND_URL}/reset-password/{token.token}"
+
+
+def enqueue_email(kind, user, url):
+    """
+    メールを1通登録（呼び出し側のトランザクション内で実行する）
+
+    Args:
+        kind: 'INVITE' or 'RESET'
+        user: 宛先ユーザー
+        url: メール内のリンク
+    """
+    return EmailOutbox.objects.create(
+        kind=kind,
+        organization_id=user.organization_id,
+        user=user,
+        to_email=user.email,
+        to_name=user.full_name,
+        action_url=url,
+    )
+
+
+def enqueue_invites(invited, batch_size=500):
+    """
+    招待メールをまとめて登録（呼び出し側のトランザクション内で実行する）
+
+    Args:
+        invited: [(User, InviteToken)]
+    """
+    EmailOutbox.objects.bulk_create([
+        EmailOutbox(
+            kind='INVITE',
+            organization_id=user.organization_id,
+            user=user,
+            to_email=user.email,
+            to_name=user.full_name,
+            action_url=invite_url(token),
+        )
+        for user, token in invited
+    ], batch_size=batch_size)
+
+
+def deliver_outbox(batch_size=None):
+    """
+    送信待ちのメールをまとめて送信する（run_email_worker から呼ばれる）
+
+    最大 batch_size × EMAIL_SEND_CONCURRENCY 件（レート制限の範囲内）を取得し、
+    種別ごとに batch_size 件ずつ並行に送信する。送信結果の DB への反映は呼び出し元のスレッドで行う。
+
+    Returns:
+        int: 送信を試みた件数（キューが空・レート制限中なら 0）
+    """
+    close_old_connections()
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    stale_after = timedelta(seconds=settings.JOB_STALE_SECONDS)
+    granted = acquire_email_tokens(batch_size * settings.EMAIL_SEND_CONCURRENCY)
+    if not granted:
+        return 0
+    emails = EmailOutbox.claim_batch(granted, stale_after)
+    release_email_tokens(granted - len(emails))
+
+    emails.sort(key=lambda email: email.kind)
+    batches = []
+    for kind, group in itertools.groupby(emails, key=lambda email: email.kind):
+        group = list(group)
+        batches.extend((kind, group[i:i + batch_size]) for i in range(0, len(group), batch_size))
+
+    while batches:
+        batches = _deliver(batches)
+    return len(emails)
+
+
+def _deliver(batches):
+    """
+    まとまりを並行に送信して結果を反映する
+
+    Returns:
+        list: 送り直すまとまり（400 のまとまりを1通ずつに分けたもの）
+    """
+    results = send_email_batches([
+        (kind, [(email.to_email, email.to_name, email.action_url) for email in emails])
+        for kind, emails in batches
+    ])
+    record_email_results(results)
+
+    outcomes = []
+    for (kind, emails), result in zip(batches, results):
+        if result['recipients'] is not None:
+            # 1通ずつ送信した結果（SMTP）は宛先ごとに反映する（送信済みのメールを再送しない）
+            outcomes.extend((kind, [email], recipient) for email, recipient in zip(emails, result['recipients']))
+        else:
+            outcomes.append((kind, emails, result))
+
+    resend = []
+    for kind, emails, result in outcomes:
+        if result['sent']:
+            _mark_sent(emails, result)
+        elif result['status'] == 400 and len(emails) > 1:
+            # どの宛先が原因か分からないため1通ずつ送り直す
+            resend.extend((kind, [email]) for email in emails)
+        elif result['retry']:
+            _mark_retry(emails, result)
+        else:
+            _mark_failed(emails, result)
+    return resend
+
+
+def _mark_sent(emails, result):
+    EmailOutbox.objects.filter(pk__in=[email.pk for email in emails]).update(
+        status='SENT',
+        sent_at=timezone.now(),
+        provider_status=result['status'],
+        provider_message_id=result['message_id'],
+        last_error='',
+    )
+
+
+def _mark_failed(emails, result):
+    logger.error('メール送信失敗（再送しません）: %s件 - %s', len(emails), result['error'])
+    EmailOutbox.objects.filter(pk__in=[email.pk for email in emails]).update(
+        status='FAILED',
+        provider_status=result['status'],
+        last_error=result['error'][:2000],
+    )
+
+
+def _mark_retry(emails, result):
+    """送信回数に応じて待ってから再送（上限に達したものは FAILED）"""
+    give_up = [email for email in emails if email.attempts >= EmailOutbox.MAX_ATTEMPTS]
+    if give_up:
+        _mark_failed(give_up, result)
+
+    now = timezone.now()
+    retry = [email for email in emails if email.attempts < EmailOutbox.MAX_ATTEMPTS]
+    retry.sort(key=lambda email: email.attempts)
+    for attempts, group in itertools.groupby(retry, key=lambda email: email.attempts):
+        delay = min(
+            max(settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), result['retry_after'] or 0),
+            settings.EMAIL_RETRY_MAX_SECONDS,
+        )
+        EmailOutbox.objects.filter(pk__in=[email.pk for email in group]).update(
+            status='PENDING',
+            next_attempt_at=now + timedelta(seconds=delay),
+            provider_status=result['status'],
+            last_error=result['error'][:2000],
+        )
+
+
+def has_due_emails():
+    """今すぐ送信できるメールがあるか（レート制限で送れなかった分を含む）"""
+    return EmailOutbox.objects.filter(status='PENDING', next_attempt_at__lte=timezone.now()).exists()
+
+
+def delete_sent_emails():
+    """
+    保存期間を過ぎた送信済みメールを削除する
+
+    Returns:
+        int: 削除した件数
+    """
+    cutoff = timezone.now() - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+    deleted, _ = EmailOutbox.objects.filter(status='SENT', sent_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,215 @@
+"""
+SendGrid v3 API（POST /v3/mail/send）互換のローカルサーバー（負荷試験・ベンチマーク用）
+
+SENDGRID_API_HOST をこのサーバーに向けると、本番と同じ送信経路（email._send_via_sendgrid）を
+ネットワークなしで実行できる。メールは送信せず、リクエストの検証結果と件数だけを記録する。
+
+- 応答までの遅延（latency_ms ± jitter_ms）
+- 一定の割合で 429（レート制限）・5xx（一時障害）を返す
+- Authorization がない場合は 401、ボディが不正な場合は SendGrid と同じ形式のエラーで 400
+
+GET /stats で受け付けたリクエスト数・宛先数・ステータスごとの件数を JSON で返す。
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .email_transport import MAIL_SEND_PATH
+
+# SendGrid の1リクエストあたりの personalizations の上限
+MAX_PERSONALIZATIONS = 1000
+SERVER_ERROR_STATUSES = (500, 502, 503)
+
+
+class SendGridStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'SendGridStub'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.path != MAIL_SEND_PATH:
+            self._respond(404, {'errors': [{'message': 'Not Found', 'field': None}]})
+            return
+
+        self.server.simulate_latency()
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            self._respond(401, _errors('The provided authorization grant is invalid, expired, or revoked'))
+            return
+
+        status = self.server.simulated_failure()
+        if status == 429:
+            self._respond(429, _errors('too many requests'), {
+                'X-RateLimit-Limit': '600',
+                'X-RateLimit-Remaining': '0',
+                'X-RateLimit-Reset': str(int(time.time()) + 1),
+            })
+            return
+        if status is not None:
+            self._respond(status, _errors('service unavailable'))
+            return
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._respond(400, _errors('Bad Request', field=None))
+            return
+        errors = validate_mail_payload(payload)
+        if errors:
+            self._respond(400, {'errors': errors})
+            return
+
+        self.server.record(202, len(payload['personalizations']))
+        self._respond(202, None, {'X-Message-Id': uuid.uuid4().hex})
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._respond(200, self.server.stats(), record=False)
+        else:
+            self._respond(404, {'errors': [{'message': 'Not Found', 'field': None}]}, record=False)
+
+    def _respond(self, status, data, headers=None, record=True):
+        if record and status != 202:
+            self.server.record(status, 0)
+        content = json.dumps(data, ensure_ascii=False).encode('utf-8') if data is not None else b''
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if content:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def _errors(message, field=None):
+    return {'errors': [{'message': message, 'field': field, 'help': None}]}
+
+
+def validate_mail_payload(payload):
+    """
+    /v3/mail/send のボディを検証する（SendGrid が 400 を返す主なケースのみ）
+
+    Returns:
+        list: エラー（{'message', 'field', 'help'}）のリスト・問題がなければ空
+    """
+    if not isinstance(payload, dict):
+        return [{'message': 'Bad Request', 'field': None, 'help': None}]
+
+    errors = []
+    personalizations = payload.get('personalizations')
+    if not isinstance(personalizations, list) or not personalizations:
+        errors.append({'message': 'The personalizations field is required.', 'field': 'personalizations', 'help': None})
+    elif len(personalizations) > MAX_PERSONALIZATIONS:
+        errors.append({
+            'message': f'The personalizations field may not have more than {MAX_PERSONALIZATIONS} items.',
+            'field': 'personalizations',
+            'help': None,
+        })
+    else:
+        for i, personalization in enumerate(personalizations):
+            recipients = personalization.get('to') if isinstance(personalization, dict) else None
+            if not recipients:
+                errors.append({'message': 'The to field is required.', 'field': f'personalizations.{i}.to', 'help': None})
+                continue
+            for j, recipient in enumerate(recipients):
+                if '@' not in str(recipient.get('email', '')):
+                    errors.append({
+                        'message': 'Does not contain a valid address.',
+                        'field': f'personalizations.{i}.to.{j}.email',
+                        'help': None,
+                    })
+
+    if '@' not in str((payload.get('from') or {}).get('email', '')):
+        errors.append({'message': 'The from email does not contain a valid address.', 'field': 'from.email', 'help': None})
+    if not payload.get('subject'):
+        errors.append({'message': 'The subject is required.', 'field': 'subject', 'help': None})
+    if not payload.get('content'):
+        errors.append({'message': 'The content field is required.', 'field': 'content', 'help': None})
+    return errors
+
+
+class SendGridStubServer(ThreadingHTTPServer):
+    """
+    SendGrid 互換サーバー
+
+    Args:
+        address: (ホスト, ポート) ※ ポート 0 は空いているポートを使う
+        latency_ms: 応答までの遅延（ミリ秒）
+        jitter_ms: 遅延のばらつき（± ミリ秒）
+        error_rate: 5xx を返す割合（0〜1）
+        rate_limit_rate: 429 を返す割合（0〜1）
+        seed: 乱数のシード（同じ値なら同じ順序で失敗する）
+        verbose: リクエストごとにログを出力するか
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 rate_limit_rate=0.0, seed=None, verbose=False):
+        super().__init__(address, SendGridStubHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.verbose = verbose
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._messages = 0
+        self._statuses = Counter()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """別スレッドで起動する（ベンチマーク用）"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def simulate_latency(self):
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        delay = max(0, self.latency_ms + jitter)
+        if delay:
+            time.sleep(delay / 1000)
+
+    def simulated_failure(self):
+        """429 / 5xx を返す場合はそのステータス・成功させる場合は None"""
+        with self._lock:
+            r = self._random.random()
+            if r < self.rate_limit_rate:
+                return 429
+            if r < self.rate_limit_rate + self.error_rate:
+                return self._random.choice(SERVER_ERROR_STATUSES)
+        return None
+
+    def record(self, status, messages):
+        with self._lock:
+            self._requests += 1
+            self._messages += messages
+            self._statuses[status] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'messages': self._messages,
+                'statuses': {str(status): count for status, count in sorted(self._statuses.items())},
+            }
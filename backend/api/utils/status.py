@@ -0,0 +1,474 @@
+"""
+ステータス集計用のクエリヘルパー
+
+ダッシュボード系エンドポイントで共通利用する「各ユーザーの最新ステータス」を
+UserLatestStatus から、日次の推移を DailyStatusAggregate から、
+ユーザー数に依存しない一定回数のクエリで取得する。
+"""
+
+import pytz
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from ..models import User, StatusLog, UserLatestStatus, DailyStatusAggregate
+from .cache import bump_org_cache_version
+
+# 日本時間（集計日の基準）
+JST = pytz.timezone('Asia/Tokyo')
+
+STATUS_KEYS = ('GREEN', 'YELLOW', 'RED')
+
+
+def today_jst():
+    """日本時間で本日の日付を返す"""
+    return timezone.now().astimezone(JST).date()
+
+
+def active_members(organization):
+    """
+    集計対象ユーザー（一般ユーザー・有効化済み・無効化されていない）のクエリセット
+
+    一括同期（bulk_sync）で無効化（is_active=False）したユーザーはダッシュボード・エクスポートに含めない。
+
+    Args:
+        organization: 対象組織
+
+    Returns:
+        QuerySet[User]
+    """
+    return User.objects.filter(
+        organization=organization,
+        role='USER',
+        is_activated=True,  # 有効化済みユーザーのみ
+        is_active=True,  # 無効化したユーザーを除く
+    )
+
+
+def is_active_member(user):
+    """active_members の対象か（日次集計の増分更新で rebuild_daily_aggregates と同じ条件にする）"""
+    return user.role == 'USER' and user.is_activated and user.is_active
+
+
+def latest_statuses(organization):
+    """
+    集計対象ユーザーの最新ステータス行（UserLatestStatus）
+
+    UserLatestStatus は1ユーザー1行のため、履歴をスキャンせずに
+    主キー / (local_date, status) インデックスで参照できる。
+
+    Args:
+        organization: 対象組織
+
+    Returns:
+        QuerySet[UserLatestStatus]
+    """
+    return UserLatestStatus.objects.filter(
+        user__organization=organization,
+        user__role='USER',
+        user__is_activated=True,  # 有効化済みユーザーのみ
+        user__is_active=True,  # 無効化したユーザーを除く
+    )
+
+
+def status_distribution_of_day(organization, target_date):
+    """
+    指定日のステータス分布（各ユーザーのその日の最新ステータス基準）
+
+    最新ステータスの記録日が target_date のユーザーのみを status で集計する。
+
+    Returns:
+        dict: {'GREEN': n, 'YELLOW': n, 'RED': n}
+    """
+    distribution = {key: 0 for key in STATUS_KEYS}
+    rows = (
+        latest_statuses(organization)
+        .filter(local_date=target_date)
+        .order_by()
+        .values('status')
+        .annotate(count=Count('user'))
+    )
+    for row in rows:
+        distribution[row['status']] = row['count']
+
+    return distribution
+
+
+def red_alerts_of_day(organization, target_date):
+    """
+    指定日の最新ステータスが RED のユーザー（ユーザー情報を JOIN 済み）
+
+    Returns:
+        QuerySet[UserLatestStatus]
+    """
+    return (
+        latest_statuses(organization)
+        .filter(local_date=target_date, status='RED')
+        .select_related('user')
+        .only(
+            'status_log_id', 'status', 'comment', 'created_at',
+            'user__id', 'user__full_name', 'user__department',
+            'user__grade', 'user__class_name',
+        )
+        .order_by('-created_at', 'user_id')
+    )
+
+
+def latest_logs_from_history(queryset=None):
+    """
+    StatusLog の履歴から各ユーザーの最新記録を求める（1ユーザー1件）
+
+    PostgreSQL の DISTINCT ON (user_id) を使用する。
+    UserLatestStatus のバックフィル・整合性チェック用。
+
+    Args:
+        queryset: 対象の StatusLog クエリセット（省略時は全件）
+
+    Returns:
+        QuerySet[StatusLog]
+    """
+    if queryset is None:
+        queryset = StatusLog.objects.all()
+    return queryset.order_by('user_id', '-created_at').distinct('user_id')
+
+
+def department_label(organization, user):
+    """
+    所属の表示用ラベル
+
+    企業: 部署名 / 学校: 「{学年}年{組}」
+    """
+    if organization.org_type == 'COMPANY':
+        return user.department or '-'
+    if user.grade and user.class_name:
+        return f'{user.grade}年{user.class_name}'
+    return '-'
+
+
+def record_status_log(status_log):
+    """
+    新しい StatusLog を非正規化テーブルへ反映（呼び出し側のトランザクション内で実行）
+
+    - UserLatestStatus: 最新ステータスを upsert
+    - DailyStatusAggregate: その日の直前の最後の記録のステータスから新しいステータスへ人数を移動
+      （集計対象ユーザー（active_members）のみ・rebuild_daily_aggregates と同じ条件）
+
+    ユーザーの行を SELECT ... FOR NO KEY UPDATE でロックしてから最新行・その日の記録を読むため、
+    同一ユーザーの同時記録（最新行がまだない最初の記録を含む）でも集計がずれない。
+    同時記録では後から反映する記録のほうが古い（created_at が前）場合があるため、
+    最新行・集計はどちらも created_at の順で判定する。
+    """
+    user = (
+        User.objects
+        .select_for_update(no_key=True)
+        .only('organization_id', 'role', 'is_activated', 'is_active')
+        .get(pk=status_log.user_id)
+    )
+    previous = (
+        UserLatestStatus.objects
+        .filter(user_id=status_log.user_id)
+        .only('created_at')
+        .first()
+    )
+    if previous is None or previous.created_at <= status_log.created_at:
+        UserLatestStatus.record(status_log)
+
+    organization_id = user.organization_id
+    if organization_id is None:
+        return
+    bump_org_cache_version(organization_id)
+    if not is_active_member(user):
+        return
+
+    # その日の最後の記録と、その前の記録（rebuild_daily_aggregates と同じく created_at の順）
+    local_date = status_log.local_date
+    last_of_day = list(
+        StatusLog.objects
+        .filter(user_id=status_log.user_id, local_date=local_date)
+        .order_by('-created_at')
+        .values_list('id', 'status')[:2]
+    )
+    if last_of_day[0][0] != status_log.id:
+        return
+    previous_status = last_of_day[1][1] if len(last_of_day) > 1 else None
+    if previous_status == status_log.status:
+        return
+
+    if previous_status:
+        DailyStatusAggregate.add(organization_id, local_date, previous_status, -1)
+    DailyStatusAggregate.add(organization_id, local_date, status_log.status, 1)
+
+
+def remove_status_log(status_log):
+    """
+    StatusLog を削除し、非正規化テーブルを履歴から再計算
+
+    削除された記録がその日の最後の記録だった可能性があるため、
+    最新ステータスと該当日のロールアップを作り直す。
+    """
+    with transaction.atomic():
+        user_id = status_log.user_id
+        local_date = status_log.local_date
+        # record_status_log と同じくユーザーの行をロックして同時記録と直列化する
+        organization_id = (
+            User.objects
+            .select_for_update(no_key=True)
+            .values_list('organization_id', flat=True)
+            .get(pk=user_id)
+        )
+
+        status_log.delete()
+        UserLatestStatus.refresh_for_user(user_id)
+        if organization_id is not None:
+            rebuild_daily_aggregates(local_date, local_date, organization_id=organization_id)
+            bump_org_cache_version(organization_id)
+
+
+def rebuild_daily_aggregates(start_date, end_date, organization_id=None):
+    """
+    指定期間の DailyStatusAggregate を StatusLog の履歴から再構築
+
+    ROW_NUMBER() OVER (PARTITION BY user_id, 日付) で各ユーザーのその日の最後の記録を求め、
+    組織・日付・ステータスで集計した結果で期間内の行を置き換える。
+
+    Args:
+        start_date: 開始日（日本時間・当日を含む）
+        end_date: 終了日（日本時間・当日を含む）
+        organization_id: 対象組織ID（省略時は全組織）
+
+    Returns:
+        int: 作成した集計行の数
+    """
+    logs = StatusLog.objects.filter(
+        user__role='USER',
+        user__is_activated=True,
+        user__is_active=True,
+        user__organization__isnull=False,
+        local_date__gte=start_date,
+        local_date__lte=end_date,
+    )
+    if organization_id is not None:
+        logs = logs.filter(user__organization_id=organization_id)
+
+    last_of_day_ids = (
+        logs
+        .annotate(rank=Window(
+            RowNumber(),
+            partition_by=[F('user_id'), F('local_date')],
+            order_by=F('created_at').desc(),
+        ))
+        .filter(rank=1)
+        .values('id')
+    )
+    counts = (
+        StatusLog.objects
+        .filter(id__in=last_of_day_ids)
+        .order_by()
+        .values('user__organization_id', 'local_date', 'status')
+        .annotate(count=Count('id'))
+    )
+    rows = [
+        DailyStatusAggregate(
+            organization_id=row['user__organization_id'],
+            date=row['local_date'],
+            status=row['status'],
+            count=row['count'],
+        )
+        for row in counts
+    ]
+
+    existing = DailyStatusAggregate.objects.filter(date__gte=start_date, date__lte=end_date)
+    if organization_id is not None:
+        existing = existing.filter(organization_id=organization_id)
+
+    with transaction.atomic():
+        touched_organization_ids = set(existing.values_list('organization_id', flat=True).distinct())
+        existing.delete()
+        DailyStatusAggregate.objects.bulk_create(rows)
+
+        touched_organization_ids.update(row.organization_id for row in rows)
+        for touched_organization_id in touched_organization_ids:
+            bump_org_cache_version(touched_organization_id)
+
+    return len(rows)
+
+
+def rebuild_daily_aggregates_for_users(organization_id, user_ids):
+    """
+    ユーザーの記録がある期間の DailyStatusAggregate を再構築
+
+    集計対象かどうかが変わったユーザー（無効化・有効に戻したユーザー）の過去の日にも反映する。
+
+    Args:
+        organization_id: 対象組織ID
+        user_ids: 対象ユーザーIDのリスト
+
+    Returns:
+        int: 作成した集計行の数
+    """
+    span = status_log_span(user_ids)
+    if span is None:
+        return 0
+    return rebuild_daily_aggregates(*span, organization_id=organization_id)
+
+
+def status_log_span(user_ids):
+    """
+    ユーザーの記録がある期間
+
+    Returns:
+        tuple | None: (最初の記録日, 最後の記録日)（記録がない場合は None）
+    """
+    if not user_ids:
+        return None
+    span = StatusLog.objects.filter(user_id__in=user_ids).aggregate(
+        start=Min('local_date'), end=Max('local_date')
+    )
+    if span['start'] is None:
+        return None
+    return span['start'], span['end']
+
+
+def trend_of_days(organization, days, end_date=None):
+    """
+    直近 days 日分のステータス推移（DailyStatusAggregate から1クエリで取得）
+
+    Returns:
+        list[dict]: 古い日付順の [{'date', 'green', 'yellow', 'red', 'total'}, ...]
+    """
+    if end_date is None:
+        end_date = today_jst()
+    start_date = end_date - timedelta(days=days - 1)
+
+    counts = {}
+    rows = DailyStatusAggregate.objects.filter(
+        organization=organization,
+        date__gte=start_date,
+        date__lte=end_date,
+    ).values_list('date', 'status', 'count')
+    for date, status, count in rows:
+        counts.setdefault(date, {})[status] = count
+
+    trend = []
+    for i in range(days):
+        target_date = start_date + timedelta(days=i)
+        status_count = counts.get(target_date, {})
+        green = status_count.get('GREEN', 0)
+        yellow = status_count.get('YELLOW', 0)
+        red = status_count.get('RED', 0)
+        trend.append({
+            'date': target_date.isoformat(),
+            'green': green,
+            'yellow': yellow,
+            'red': red,
+            'total': green + yellow + red
+        })
+
+    return trend
+
+
+def alert_row(organization, user, latest):
+    """アラート一覧の1行（alerts / dashboard_bundle 共通）"""
+    return {
+        'id': str(latest.status_log_id),
+        'user_id': str(user.id),
+        'user_name': user.full_name,
+        'department': department_label(organization, user),
+        'status': latest.status,
+        'comment': latest.comment,
+        'created_at': latest.created_at.isoformat()
+    }
+
+
+def user_status_row(user, latest):
+    """全ユーザーステータス一覧の1行（user_latest_status / dashboard_bundle 共通）"""
+    return {
+        'id': str(user.id),
+        'full_name': user.full_name,
+        'email': user.email,
+        'is_activated': user.is_activated,  # フロントエンド用に追加
+        # 企業用
+        'department': user.department or '',
+        'position': user.position or '',
+        # 学校用
+        'grade': user.grade,
+        'class_name': user.class_name or '',
+        # ステータス
+        'latest_status': latest.status if latest else None,
+        'latest_comment': latest.comment if latest else None,
+        'latest_date': latest.created_at.isoformat() if latest else None
+    }
+
+
+BUNDLE_SECTIONS = ('dashboard_summary', 'alerts', 'user_latest_status', 'trend_data')
+
+
+def dashboard_bundle(organization, sections=BUNDLE_SECTIONS, days=7):
+    """
+    管理者ダッシュボードの各セクションをまとめて生成
+
+    dashboard_summary / alerts / user_latest_status は
+    「集計対象ユーザー + 最新ステータス」を1回だけ取得（1クエリ）した結果から計算し、
+    trend_data は日次ロールアップから取得する（1クエリ）。
+
+    Args:
+        organization: 対象組織
+        sections: 生成するセクション名（BUNDLE_SECTIONS の部分集合）
+        days: trend_data の日数
+
+    Returns:
+        dict: {セクション名: 各エンドポイントと同じ形式のデータ}
+    """
+    bundle = {}
+    today = today_jst()
+
+    if set(sections) & {'dashboard_summary', 'alerts', 'user_latest_status'}:
+        members = list(
+            active_members(organization)
+            .select_related('latest_status')
+            .order_by('full_name')
+        )
+        latest_of = {
+            member.id: getattr(member, 'latest_status', None) for member in members
+        }
+        today_members = [
+            member for member in members
+            if latest_of[member.id] and latest_of[member.id].local_date == today
+        ]
+
+        if 'dashboard_summary' in sections:
+            distribution = {key: 0 for key in STATUS_KEYS}
+            for member in today_members:
+                distribution[latest_of[member.id].status] += 1
+            bundle['dashboard_summary'] = {
+                'total_users': len(members),
+                'today_recorded': len(today_members),
+                'red_alerts': distribution['RED'],
+                'status_distribution': distribution,
+                'date': today.isoformat()
+            }
+
+        if 'alerts' in sections:
+            red_members = [
+                member for member in today_members
+                if latest_of[member.id].status == 'RED'
+            ]
+            # alerts エンドポイントと同じ並び順（新しい記録順）
+            red_members.sort(key=lambda member: str(member.id))
+            red_members.sort(key=lambda member: latest_of[member.id].created_at, reverse=True)
+            bundle['alerts'] = [
+                alert_row(organization, member, latest_of[member.id])
+                for member in red_members
+            ]
+
+        if 'user_latest_status' in sections:
+            bundle['user_latest_status'] = [
+                user_status_row(member, latest_of[member.id]) for member in members
+            ]
+
+    if 'trend_data' in sections:
+        bundle['trend_data'] = trend_of_days(organization, days, end_date=today)
+
+    return bundle
@@ -2,6 +2,7 @@
 Validators for Mind Status API.
 """
 
+from django.conf import settings
 from rest_framework import serializers
 
 
@@ -110,9 +111,10 @@ def validate_bulk_upload_file(file) -> None:
         serializers.ValidationError: ファイル検証エラー
     """
     
-    # ファイルサイズチェック（10MB制限）
-    if file.size > 10 * 1024 * 1024:
-        raise serializers.ValidationError('ファイルサイズは10MB以下にしてください')
+    # ファイルサイズチェック（行は逐次読み込むため、上限は settings で変更可能）
+    max_size_mb = settings.BULK_UPLOAD_MAX_SIZE_MB
+    if file.size > max_size_mb * 1024 * 1024:
+        raise serializers.ValidationError(f'ファイルサイズは{max_size_mb}MB以下にしてください')
     
     # ファイル拡張子チェック
     allowed_extensions = ['.csv', '.xlsx', '.xls']
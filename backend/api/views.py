@@ -2,14 +2,32 @@
 Views for Mind Status API.
 """
 
-from django.db.models import Count, Q
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta
 from rest_framework import viewsets, permissions, status as http_status, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Organization, User, StatusLog, InviteToken
-from .serializers import OrganizationSerializer, UserSerializer, StatusLogSerializer
+from .models import Organization, User, StatusLog, InviteToken, ExportJob, BulkUploadJob
+from .serializers import (
+    OrganizationSerializer, UserSerializer, StatusLogSerializer, ExportJobSerializer,
+    BulkUploadJobSerializer,
+    STATUS_LOG_LIST_FIELDS, status_log_rows_to_representation,
+)
+from .utils.status import (
+    today_jst, active_members, status_distribution_of_day,
+    red_alerts_of_day, alert_row, user_status_row,
+    record_status_log, remove_status_log, trend_of_days,
+    dashboard_bundle, BUNDLE_SECTIONS,
+)
+from .utils.cache import cached_org_response
+from .utils.export import (
+    CSV_CONTENT_TYPE, XLSX_CONTENT_TYPE, ExportContentNegotiation, build_export,
+    export_file_path, options_to_params, parse_export_options, stream_csv, write_xlsx,
+)
+from .pagination import KeysetPaginationMixin
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,7 +39,7 @@ class OrganizationViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     """ユーザーAPI"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -110,35 +128,13 @@ class UserViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def bulk_upload(self, request):
-        """CSV一括登録（セキュリティ強化版）"""
+        """
+        CSV一括登録（セキュリティ強化版）
         
-        def format_serializer_errors(errors):
-            """
-            Serializer のエラーを読みやすい文字列に整形
-            
-            例:
-            {'email': [ErrorDetail(string='このメールアドレスを持ったユーザーが既に存在します。', code='unique')]}
-            → 'このメールアドレスを持ったユーザーが既に存在します。'
-            
-            複数エラー時:
-            {'email': [...], 'grade': [...]}
-            → 'このメールアドレスを持ったユーザーが既に存在します。 / 学年は1〜12の範囲で入力してください'
-            """
-            if isinstance(errors, dict):
-                messages = []
-                for field, error_list in errors.items():
-                    if isinstance(error_list, list):
-                        for error in error_list:
-                            # ErrorDetail オブジェクトから文字列を抽出
-                            error_str = str(error) if hasattr(error, '__str__') else error
-                            # フィールド名は含めない
-                            messages.append(error_str)
-                    else:
-                        # フィールド名は含めない
-                        messages.append(str(error_list))
-                return ' / '.join(messages)
-            else:
-                return str(errors)
+        パラメータ（クエリまたはフォーム）:
+        - validate_only=true: 登録・招待メール送信を行わず、同じ形式の検証結果だけを返す（ドライラン）
+        - mode=sync: 名簿の差分同期（key・deactivate_missing は bulk_upload_preview を参照）
+        """
         
         # 権限チェック
         if request.user.role != 'ADMIN':
@@ -155,9 +151,8 @@ class UserViewSet(viewsets.ModelViewSet):
             )
         
         # ファイル検証（validators.py）
-        from .validators import validate_bulk_upload_file, validate_bulk_upload_row
-        from .serializers import BulkUploadUserSerializer
-        from django.db import transaction
+        from .validators import validate_bulk_upload_file
+        from .utils.bulk_upload import UploadReadError, import_user_rows, iter_upload_rows
         
         try:
             validate_bulk_upload_file(upload_file)
@@ -167,178 +162,200 @@ class UserViewSet(viewsets.ModelViewSet):
                 status=http_status.HTTP_400_BAD_REQUEST
             )
         
+        mode = self._bulk_param(request, 'mode') or 'create'
+        if mode not in ('create', 'sync'):
+            return Response(
+                {'error': 'mode は create または sync を指定してください'},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
+        validate_only = self._bulk_param(request, 'validate_only').lower() in ('true', '1')
+        if mode == 'sync':
+            return self._bulk_sync(request, upload_file, preview=validate_only)
+        
         # ファイル拡張子
         file_ext = upload_file.name.lower().split('.')[-1]
         
-        # ファイル読み込み
+        # ファイル読み込み（1行ずつ読み出して検証に渡す）・一括登録処理
+        rows, first_row_num = iter_upload_rows(
+            upload_file, file_ext, request.user.organization.org_type
+        )
         try:
-            rows = []
-            
-            # Excel形式の場合
-            if file_ext in ['xlsx', 'xls']:
-                from openpyxl import load_workbook
-                
-                wb = load_workbook(upload_file, data_only=True)
-                org_type = request.user.organization.org_type
-                
-                # シート選択
-                if org_type == 'SCHOOL':
-                    ws = wb['学校向けテンプレート'] if '学校向けテンプレート' in wb.sheetnames else wb.worksheets[0]
-                else:
-                    ws = wb['企業向けテンプレート'] if '企業向けテンプレート' in wb.sheetnames else (wb.worksheets[1] if len(wb.worksheets) > 1 else wb.worksheets[0])
-                
-                # ヘッダー取得（2行目）
-                headers = [cell.value for cell in ws[2]]
-                
-                # データ行読み込み（3行目以降）
-                for row in ws.iter_rows(min_row=3, values_only=True):
-                    if any(row):
-                        row_dict = {headers[i]: (row[i] if i < len(row) else None) for i in range(len(headers))}
-                        rows.append(row_dict)
-            
-            # CSV形式の場合
-            else:
-                import csv
-                import io
-                decoded_file = upload_file.read().decode('utf-8-sig')
-                csv_reader = csv.DictReader(io.StringIO(decoded_file))
-                rows = list(csv_reader)
-            
-        except Exception as e:
+            invited, error_list = import_user_rows(
+                request.user.organization, rows, first_row_num, validate_only=validate_only
+            )
+        except UploadReadError as e:
             return Response(
-                {'error': f'ファイルの読み込みに失敗しました: {str(e)}'},
+                {'error': str(e)},
                 status=http_status.HTTP_400_BAD_REQUEST
             )
         
-        # 一括登録処理（行単位でエラーハンドリング）
-        success_list = []
-        error_list = []
-        
-        for row_num, row in enumerate(rows, start=3 if file_ext in ['xlsx', 'xls'] else 2):
-            try:
-                # 1. ホワイトリスト検証
-                validated_row = validate_bulk_upload_row(
-                    row,
-                    request.user.organization.org_type,
-                    row_num
-                )
-                
-                email = validated_row.get('email', '').lower().strip()
-                
-                # 既存ユーザーを検索（未アクティブのみ更新対象）
-                existing_user = User.objects.filter(
-                    email=email,
-                    organization=request.user.organization,
-                    is_activated=False  # 未アクティブのみ
-                ).first()
-                
-                if existing_user:
-                    # 未アクティブユーザーは更新
-                    serializer = BulkUploadUserSerializer(
-                        existing_user,
-                        data=validated_row,
-                        context={'organization': request.user.organization},  # 重複チェック用
-                        partial=True
-                    )
-                    if not serializer.is_valid():
-                        error_list.append({
-                            'row': row_num,
-                            'email': email,
-                            'error': format_serializer_errors(serializer.errors)
-                        })
-                        continue
-                    
-                    user = serializer.save(
-                        organization=request.user.organization,
-                        role='USER',
-                        is_activated=False,
-                        is_staff=False,
-                        is_superuser=False
-                    )
-                    
-                    # 既存の招待トークンを無効化
-                    InviteToken.objects.filter(user=user).update(is_used=True)
-                else:
-                    # 新規作成
-                    serializer = BulkUploadUserSerializer(
-                        data=validated_row,
-                        context={'organization': request.user.organization}  # 重複チェック用
-                    )
-                    if not serializer.is_valid():
-                        error_list.append({
-                            'row': row_num,
-                            'email': email,
-                            'error': format_serializer_errors(serializer.errors)
-                        })
-                        continue
-                    
-                    user = serializer.save(
-                        organization=request.user.organization,
-                        role='USER',
-                        is_activated=False,
-                        is_staff=False,
-                        is_superuser=False,
-                        password=User.objects.make_random_password(length=12)
-                    )
-                
-                # 4. 招待トークン生成
-                invite_token = InviteToken.objects.create(
-                    user=user,
-                    token_type='INVITE',
-                    expires_at=timezone.now() + timedelta(days=7)
-                )
-                
-                # 5. 招待メール送信
-                try:
-                    from .utils.email import send_invite_email
-                    from django.conf import settings
-                
-                    invite_url = f"{settings.FRONTEND_URL}/invite/{invite_token.token}"
-
-                    success = send_invite_email(
-                        user_email=user.email,
-                        user_name=user.full_name,
-                        invite_url=invite_url
-                    )
-
-                    if not success:
-                        logger.warning(f'招待メール送信失敗: {user.email}')
-                    
-                except Exception as e:
-                    logger.error(
-                    f'招待メール送信中に予期しないエラー: {user.email} '
-                        f'- {type(e).__name__}: {str(e)}'
-                    )
-                    
-                success_list.append({
-                    'row': row_num,
-                    'email': user.email
-                })
-                
-            except serializers.ValidationError as e:
-                # バリデーションエラー
-                error_detail = str(e.detail) if hasattr(e, 'detail') else str(e)
-                error_list.append({
-                    'row': row_num,
-                    'email': row.get('email', ''),
-                    'error': error_detail
-                })
-            
-            except Exception as e:
-                # 予期しないエラー
-                error_list.append({
-                    'row': row_num,
-                    'email': row.get('email', ''),
-                    'error': f'エラー: {str(e)}'
-                })
-        
-        # 結果を返す
+        if validate_only:
+            # 登録せずに検証結果のみ返す（success_count は登録される予定の件数）
+            return Response({
+                'validate_only': True,
+                'success_count': len(invited),
+                'error_count': len(error_list),
+                'errors': error_list
+            })
+        
+        # 結果を返す（招待メールは登録と同じトランザクションで送信キューに登録済み・run_email_worker が送信）
         return Response({
-            'success_count': len(success_list),
+            'success_count': len(invited),
             'error_count': len(error_list),
             'errors': error_list
         })
     
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    def bulk_upload_preview(self, request):
+        """
+        名簿の差分同期のプレビュー（登録はしない）
+        
+        POST /api/users/bulk_upload_preview/
+        
+        パラメータ（クエリまたはフォーム）:
+        - file: 名簿ファイル（CSV / Excel）
+        - key: 突き合わせに使う列（email・学校は student_number・企業は employee_number、デフォルト: email）
+        - deactivate_missing=true: 名簿にない一般ユーザーを無効化（is_active=False）の対象にする
+        
+        新規・変更（変更前後の値）・無効化の一覧を返す。
+        反映するには同じパラメータで bulk_upload に mode=sync を付けて送信する。
+        """
+        if request.user.role != 'ADMIN':
+            return Response(
+                {'error': '管理者のみアクセス可能です'},
+                status=http_status.HTTP_403_FORBIDDEN
+            )
+        
+        upload_file = request.FILES.get('file')
+        if not upload_file:
+            return Response(
+                {'error': 'ファイルが選択されていません'},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
+        
+        from .validators import validate_bulk_upload_file
+        
+        try:
+            validate_bulk_upload_file(upload_file)
+        except serializers.ValidationError as e:
+            return Response(
+                {'error': str(e)},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
+        
+        return self._bulk_sync(request, upload_file, preview=True)
+    
+    def _bulk_param(self, request, name):
+        """一括登録のパラメータ（クエリ → フォームの順に参照・未指定は空文字列）"""
+        return str(request.query_params.get(name) or request.data.get(name) or '')
+    
+    def _bulk_sync(self, request, upload_file, preview):
+        """名簿の差分同期（preview の場合は差分の計算のみ）"""
+        from .utils.bulk_sync import SYNC_KEYS, apply_user_diff, diff_summary, diff_user_rows
+        from .utils.bulk_upload import UploadReadError, iter_upload_rows
+        
+        organization = request.user.organization
+        key = self._bulk_param(request, 'key') or 'email'
+        if key not in SYNC_KEYS[organization.org_type]:
+            return Response(
+                {'error': f'key は {" / ".join(SYNC_KEYS[organization.org_type])} のいずれかを指定してください'},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
+        deactivate_missing = self._bulk_param(request, 'deactivate_missing').lower() in ('true', '1')
+        
+        file_ext = upload_file.name.lower().split('.')[-1]
+        rows, first_row_num = iter_upload_rows(upload_file, file_ext, organization.org_type)
+        try:
+            diff = diff_user_rows(organization, rows, first_row_num, key, deactivate_missing)
+        except UploadReadError as e:
+            return Response(
+                {'error': str(e)},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
+        
+        if preview:
+            return Response(dict(diff_summary(diff), validate_only=True))
+        
+        # 招待メールは反映と同じトランザクションで送信キューに登録される
+        apply_user_diff(organization, diff)
+        
+        summary = diff_summary(diff, details=False)
+        summary['success_count'] = summary['create_count'] + summary['update_count']
+        return Response(summary)
+    
+    @action(detail=False, methods=['get', 'post'], permission_classes=[permissions.IsAuthenticated])
+    def bulk_upload_jobs(self, request):
+        """
+        一括登録ジョブの作成（POST）・一覧（GET）（管理者用）
+        
+        POST はファイルを保存してすぐにジョブを返す（202）。
+        取り込みは run_worker がチャンク単位で行い、進捗は bulk_upload_jobs/<id>/ で確認する。
+        """
+        if request.user.role != 'ADMIN':
+            return Response(
+                {'error': '管理者のみアクセス可能です'},
+                status=http_status.HTTP_403_FORBIDDEN
+            )
+        
+        if request.method == 'GET':
+            jobs = BulkUploadJob.objects.filter(
+                organization=request.user.organization
+            ).order_by('-created_at')[:20]
+            return Response(BulkUploadJobSerializer(jobs, many=True).data)
+        
+        upload_file = request.FILES.get('file')
+        if not upload_file:
+            return Response(
+                {'error': 'ファイルが選択されていません'},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
+        
+        from django.conf import settings
+        from .validators import validate_bulk_upload_file
+        from .utils.bulk_upload import store_upload_file
+        
+        try:
+            validate_bulk_upload_file(upload_file)
+        except serializers.ValidationError as e:
+            return Response(
+                {'error': str(e)},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
+        
+        # ファイル保存後にコミット（保存前のジョブをワーカーが取得しないように）
+        with transaction.atomic():
+            job = BulkUploadJob.objects.create(
+                organization=request.user.organization,
+                requested_by=request.user,
+                file_name=upload_file.name,
+                chunk_size=settings.BULK_UPLOAD_CHUNK_SIZE,
+            )
+            store_upload_file(job, upload_file)
+        
+        return Response(BulkUploadJobSerializer(job).data, status=http_status.HTTP_202_ACCEPTED)
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path=r'bulk_upload_jobs/(?P<job_id>[0-9a-f-]+)',
+    )
+    def bulk_upload_job_detail(self, request, job_id=None):
+        """一括登録ジョブの進捗・結果を取得（管理者用）"""
+        if request.user.role != 'ADMIN':
+            return Response(
+                {'error': '管理者のみアクセス可能です'},
+                status=http_status.HTTP_403_FORBIDDEN
+            )
+        try:
+            job = BulkUploadJob.objects.get(id=job_id, organization=request.user.organization)
+        except (BulkUploadJob.DoesNotExist, ValueError, DjangoValidationError):
+            return Response(
+                {'error': '一括登録ジョブが見つかりません'},
+                status=http_status.HTTP_404_NOT_FOUND
+            )
+        return Response(BulkUploadJobSerializer(job).data)
+    
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny])
     def verify_invite(self, request):
         """
@@ -538,36 +555,17 @@ class UserViewSet(viewsets.ModelViewSet):
                 'message': 'メールアドレスが登録されている場合、リセットリンクが送られます'
             })
         
-        # リセットトークン生成
+        # リセットトークン生成・リセットメールを送信キューに登録（同じトランザクション）
+        # 送信は run_email_worker が行うため、外部API障害や遅延でリクエストが待たされない
         from .models import InviteToken
-        reset_token = InviteToken.objects.create(
-            user=user,
-            token_type='RESET',
-            expires_at=timezone.now() + timedelta(hours=1)  # 1時間有効
-        )
-        
-        # リセットメール送信（外部API障害でサービス全体が落ちないように保護）
-        try:
-            from .utils.email import send_password_reset_email
-            from django.conf import settings
-
-            reset_url = f"{settings.FRONTEND_URL}/reset-password/{reset_token.token}"
-
-            success = send_password_reset_email(
-                user_email=user.email,
-                user_name=user.full_name,
-                reset_url=reset_url
-            )
-
-            if not success:
-                logger.warning(f'パスワードリセットメール送信失敗: {user.email}')
-                
-        except Exception as e:
-            # メール送信失敗してもトークンは作成済みなので処理は続行
-            logger.error(
-                f'パスワードリセットメール送信中に予期しないエラー: {user.email} '
-                f'- {type(e).__name__}: {str(e)}'
+        from .utils.outbox import enqueue_email, reset_url
+        with transaction.atomic():
+            reset_token = InviteToken.objects.create(
+                user=user,
+                token_type='RESET',
+                expires_at=timezone.now() + timedelta(hours=1)  # 1時間有効
             )
+            enqueue_email('RESET', user, reset_url(reset_token))
         
         return Response({
             'success': True,
@@ -786,7 +784,7 @@ class UserViewSet(viewsets.ModelViewSet):
             )
 
 
-class StatusLogViewSet(viewsets.ModelViewSet):
+class StatusLogViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     """ステータス記録API"""
     queryset = StatusLog.objects.all()
     serializer_class = StatusLogSerializer
@@ -797,18 +795,46 @@ class StatusLogViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.role == 'ADMIN':
             # 管理者: 同じ組織の全ユーザーのステータス
-            return StatusLog.objects.filter(user__organization=user.organization)
-        # 一般ユーザー: 自分のステータスのみ
-        return StatusLog.objects.filter(user=user)
+            queryset = StatusLog.objects.filter(user__organization=user.organization)
+        else:
+            # 一般ユーザー: 自分のステータスのみ
+            queryset = StatusLog.objects.filter(user=user)
+        # user_name（user.full_name）のために JOIN（行ごとのユーザー取得を防ぐ）
+        return queryset.select_related('user')
+    
+    def list(self, request, *args, **kwargs):
+        """
+        ステータス記録一覧（読み取り専用の高速パス）
+        
+        values() の行から直接レスポンスを組み立て、
+        モデルインスタンス生成と Serializer のフィールド処理を省略する。
+        出力形式は StatusLogSerializer と同じ。
+        """
+        queryset = self.filter_queryset(self.get_queryset()).values(*STATUS_LOG_LIST_FIELDS)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(status_log_rows_to_representation(page))
+        
+        return Response(status_log_rows_to_representation(queryset))
     
     def perform_create(self, serializer):
         """ステータス作成時に自動的にユーザーを設定（管理者は記録不可）"""
         if self.request.user.role == 'ADMIN':
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied('管理者はステータスを記録できません')
-        serializer.save(user=self.request.user)
+        
+        # 記録と最新ステータス・日次集計の更新は同一トランザクション
+        with transaction.atomic():
+            status_log = serializer.save(user=self.request.user)
+            record_status_log(status_log)
+    
+    def perform_destroy(self, instance):
+        """ステータス削除時に最新ステータス・日次集計を履歴から再計算"""
+        remove_status_log(instance)
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    @cached_org_response('dashboard_summary')
     def dashboard_summary(self, request):
         """管理者用ダッシュボードサマリー"""
         if request.user.role != 'ADMIN':
@@ -820,55 +846,15 @@ class StatusLogViewSet(viewsets.ModelViewSet):
         organization = request.user.organization
         
         # 日本時間で本日の日付を取得
-        import pytz
-        jst = pytz.timezone('Asia/Tokyo')
-        now_jst = timezone.now().astimezone(jst)
-        today = now_jst.date()
-        
-        # デバッグログ
-        logger.debug(f"Current time (JST): {now_jst}")
-        logger.debug(f"Today's date: {today}")
+        today = today_jst()
         
         # 全ユーザー数（管理者を除外・有効化済みのみ）
-        total_users = User.objects.filter(
-            organization=organization,
-            role='USER',
-            is_activated=True  # 有効化済みユーザーのみ
-        ).count()
-        
-        # 各ユーザーの本日の最新ステータスを取得（有効化済みのみ）
-        users = User.objects.filter(
-            organization=organization,
-            role='USER',
-            is_activated=True  # 有効化済みユーザーのみ
-        )
+        total_users = active_members(organization).count()
         
-        status_distribution = {
-            'GREEN': 0,
-            'YELLOW': 0,
-            'RED': 0
-        }
-        today_recorded = 0
-        red_alerts = 0
-        
-        for user in users:
-            # このユーザーの本日の最新ステータス
-            latest_status = StatusLog.objects.filter(
-                user=user,
-                created_at__date=today
-            ).order_by('-created_at').first()
-            
-            if latest_status:
-                # デバッグログ
-                logger.debug(
-                f"User: {user.full_name}, Status: {latest_status.status}, "
-                    f"Time: {latest_status.created_at}"
-                )
-                
-                today_recorded += 1
-                status_distribution[latest_status.status] += 1
-                if latest_status.status == 'RED':
-                    red_alerts += 1
+        # 各ユーザーの本日の最新ステータスを集計（UserLatestStatus の GROUP BY 1クエリ）
+        status_distribution = status_distribution_of_day(organization, today)
+        today_recorded = sum(status_distribution.values())
+        red_alerts = status_distribution['RED']
         
         return Response({
             'total_users': total_users,
@@ -879,8 +865,18 @@ class StatusLogViewSet(viewsets.ModelViewSet):
         })
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    @cached_org_response('alerts')
     def alerts(self, request):
-        """REDステータスのアラート一覧（最新ステータスがREDのユーザーのみ）"""
+        """
+        REDステータスのアラート一覧（最新ステータスがREDのユーザーのみ）
+        
+        GET /api/status/alerts/?limit=20&offset=0&department=営業部&grade=1
+        
+        Query Params（すべて任意）:
+            limit / offset: ページング
+            department: 部署で絞り込み（企業用）
+            grade: 学年で絞り込み（学校用）
+        """
         if request.user.role != 'ADMIN':
             return Response(
                 {'error': '管理者のみアクセス可能です'}, 
@@ -890,50 +886,51 @@ class StatusLogViewSet(viewsets.ModelViewSet):
         organization = request.user.organization
         
         # 日本時間で本日の日付を取得
-        import pytz
-        jst = pytz.timezone('Asia/Tokyo')
-        now_jst = timezone.now().astimezone(jst)
-        today = now_jst.date()
-        
-        # 一般ユーザーのみ取得（有効化済みのみ）
-        users = User.objects.filter(
-            organization=organization,
-            role='USER',
-            is_activated=True  # 有効化済みユーザーのみ
-        )
+        today = today_jst()
         
-        alerts = []
-        for user in users:
-            # このユーザーの本日の最新ステータス
-            latest_status = StatusLog.objects.filter(
-                user=user,
-                created_at__date=today
-            ).order_by('-created_at').first()
-            
-            # 最新ステータスがREDの場合のみアラートに追加
-            if latest_status and latest_status.status == 'RED':
-                # 所属を正しく表示
-                if organization.org_type == 'COMPANY':
-                    department = user.department or '-'
-                else:  # SCHOOL
-                    if user.grade and user.class_name:
-                        department = f'{user.grade}年{user.class_name}'
-                    else:
-                        department = '-'
-                
-                alerts.append({
-                    'id': str(latest_status.id),
-                    'user_id': str(user.id),
-                    'user_name': user.full_name,
-                    'department': department,
-                    'status': latest_status.status,
-                    'comment': latest_status.comment,
-                    'created_at': latest_status.created_at.isoformat()
-                })
+        # ページングパラメータ（任意）
+        try:
+            limit = request.query_params.get('limit')
+            limit = int(limit) if limit else None
+            offset = int(request.query_params.get('offset') or 0)
+        except ValueError:
+            return Response(
+                {'error': 'limit / offset は数値で指定してください'},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
+        if (limit is not None and limit < 0) or offset < 0:
+            return Response(
+                {'error': 'limit / offset は0以上で指定してください'},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
+        
+        # 本日の最新ステータスがREDのユーザー（ユーザー情報をJOINした1クエリ）
+        logs = red_alerts_of_day(organization, today)
+        
+        # フィルタ適用（企業用）
+        department_filter = request.query_params.get('department')
+        if department_filter and department_filter != 'all':
+            logs = logs.filter(user__department=department_filter)
+        
+        # フィルタ適用（学校用）
+        grade_filter = request.query_params.get('grade')
+        if grade_filter and grade_filter != 'all':
+            if not grade_filter.isdigit():
+                return Response(
+                    {'error': '学年は数値で指定してください'},
+                    status=http_status.HTTP_400_BAD_REQUEST
+                )
+            logs = logs.filter(user__grade=int(grade_filter))
+        
+        # LIMIT / OFFSET もSQL側で適用
+        logs = logs[offset:offset + limit] if limit is not None else logs[offset:]
+        
+        alerts = [alert_row(organization, log.user, log) for log in logs]
         
         return Response(alerts)
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    @cached_org_response('user_latest_status')
     def user_latest_status(self, request):
         """全ユーザーの最新ステータス（管理者を除外）"""
         if request.user.role != 'ADMIN':
@@ -943,37 +940,18 @@ class StatusLogViewSet(viewsets.ModelViewSet):
             )
         
         organization = request.user.organization
-        # 一般ユーザーのみ取得（有効化済みのみ）
-        users = User.objects.filter(
-            organization=organization,
-            role='USER',
-            is_activated=True  # 有効化済みユーザーのみ
-        ).order_by('full_name')
-        
-        user_status_list = []
-        for user in users:
-            latest_log = StatusLog.objects.filter(user=user).order_by('-created_at').first()
-            
-            user_status_list.append({
-                'id': str(user.id),
-                'full_name': user.full_name,
-                'email': user.email,
-                'is_activated': user.is_activated,  # フロントエンド用に追加
-                # 企業用
-                'department': user.department or '',
-                'position': user.position or '',
-                # 学校用
-                'grade': user.grade,
-                'class_name': user.class_name or '',
-                # ステータス
-                'latest_status': latest_log.status if latest_log else None,
-                'latest_comment': latest_log.comment if latest_log else None,
-                'latest_date': latest_log.created_at.isoformat() if latest_log else None
-            })
+        # 一般ユーザーのみ取得（有効化済み・無効化されていないユーザーのみ）
+        users = active_members(organization).select_related('latest_status').order_by('full_name')
+        
+        user_status_list = [
+            user_status_row(user, getattr(user, 'latest_status', None))
+            for user in users
+        ]
         
         return Response(user_status_list)
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    @cached_org_response('trend_data')
     def trend_data(self, request):
         """ステータス推移データ（管理者用）- 期間指定可能"""
         if request.user.role != 'ADMIN':
@@ -989,279 +967,219 @@ class StatusLogViewSet(viewsets.ModelViewSet):
         if days not in [7, 14, 30]:
             days = 7  # 不正な値の場合は7日間
         
-        # 日本時間で日付を生成
-        import pytz
-        jst = pytz.timezone('Asia/Tokyo')
-        today_jst = timezone.now().astimezone(jst).date()
+        # 日次ロールアップから N日前〜今日（日本時間）の推移を取得（1クエリ）
+        trend_data = trend_of_days(organization, days)
         
-        trend_data = []
+        return Response(trend_data)
+    
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    @cached_org_response('dashboard_bundle')
+    def dashboard_bundle(self, request):
+        """
+        管理者ダッシュボード一括取得
         
-        for i in range(days - 1, -1, -1):  # N日前から今日まで
-            target_date = today_jst - timedelta(days=i)
-            
-            # 一般ユーザーのみ取得（有効化済みのみ）
-            users = User.objects.filter(
-                organization=organization,
-                role='USER',
-                is_activated=True  # 有効化済みユーザーのみ
+        dashboard_summary / alerts / user_latest_status / trend_data を
+        1リクエスト・共通の最新ステータス取得1回でまとめて返す。
+        
+        GET /api/status/dashboard_bundle/?sections=dashboard_summary,alerts&days=7
+        
+        Query Params（すべて任意）:
+            sections: 取得するセクション（カンマ区切り・省略時は全セクション）
+            days: trend_data の期間（7 / 14 / 30）
+        
+        Response:
+        {
+            "dashboard_summary": {...},
+            "alerts": [...],
+            "user_latest_status": [...],
+            "trend_data": [...]
+        }
+        """
+        if request.user.role != 'ADMIN':
+            return Response(
+                {'error': '管理者のみアクセス可能です'},
+                status=http_status.HTTP_403_FORBIDDEN
             )
-            
-            status_count = {
-                'GREEN': 0,
-                'YELLOW': 0,
-                'RED': 0
-            }
-            
-            # 各ユーザーのその日の最新ステータスを取得
-            for user in users:
-                latest_status = StatusLog.objects.filter(
-                    user=user,
-                    created_at__date=target_date
-                ).order_by('-created_at').first()
-                
-                if latest_status:
-                    status_count[latest_status.status] += 1
-            
-            trend_data.append({
-                'date': target_date.isoformat(),
-                'green': status_count['GREEN'],
-                'yellow': status_count['YELLOW'],
-                'red': status_count['RED'],
-                'total': status_count['GREEN'] + status_count['YELLOW'] + status_count['RED']
-            })
         
-        return Response(trend_data)
+        sections_param = request.query_params.get('sections')
+        if sections_param:
+            sections = [section.strip() for section in sections_param.split(',') if section.strip()]
+            unknown = set(sections) - set(BUNDLE_SECTIONS)
+            if unknown:
+                return Response(
+                    {'error': f'不正なセクションが含まれています: {", ".join(sorted(unknown))}'},
+                    status=http_status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            sections = list(BUNDLE_SECTIONS)
+        
+        # 期間パラメータ取得（trend_data と同じ扱い）
+        days = request.query_params.get('days', '7')
+        days = int(days) if days.isdigit() else 7
+        if days not in [7, 14, 30]:
+            days = 7  # 不正な値の場合は7日間
+        
+        return Response(dashboard_bundle(request.user.organization, sections, days))
     
-    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[permissions.IsAuthenticated],
+        content_negotiation_class=ExportContentNegotiation,
+    )
     def export_csv(self, request):
-        """ユーザーステータスをExcel/CSV出力（管理者用・期間指定可能）"""
+        """
+        ユーザーステータスをExcel/CSV出力（管理者用・期間指定可能）
+
+        クエリパラメータ:
+            format: xlsx（デフォルト）/ csv
+            start_date, end_date: 期間指定（YYYY-MM-DD・省略時は最新ステータス）
+            department, grade, class, status, search: フィルタ
+
+        CSV は StreamingHttpResponse で行を取得しながら送り出す。
+        Excel は write-only モードで一時ファイルに書き出してから送り出す。
+        """
         if request.user.role != 'ADMIN':
             return Response(
                 {'error': '管理者のみアクセス可能です'},
                 status=http_status.HTTP_403_FORBIDDEN
             )
         
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, PatternFill, Alignment
-        from django.http import HttpResponse
-        from datetime import datetime
-        import pytz
-        import io
+        from django.http import FileResponse, StreamingHttpResponse
+        import tempfile
         
         organization = request.user.organization
         
-        # 出力形式（デフォルトはExcel）
-        output_format = request.query_params.get('format', 'xlsx')
+        # 出力形式（デフォルトはExcel）・期間（省略時は最新ステータス）・フィルタ
+        try:
+            options = parse_export_options(request.query_params)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
         
-        # 期間パラメータ取得
-        start_date_str = request.query_params.get('start_date')
-        end_date_str = request.query_params.get('end_date')
+        export = build_export(organization, options)
+        headers, rows = export['headers'], export['rows']
+        basename = export['basename']
         
-        # 日本時間のタイムゾーン
-        jst = pytz.timezone('Asia/Tokyo')
+        # CSV形式（ストリーミング）
+        if options['format'] == 'csv':
+            response = StreamingHttpResponse(stream_csv(headers, rows), content_type=CSV_CONTENT_TYPE)
+            response['Content-Disposition'] = f'attachment; filename="{basename}.csv"'
+            return response
         
-        # 期間指定の有無で処理を分岐
-        if start_date_str and end_date_str:
-            # 期間指定モード: 全ステータス記録を出力
-            try:
-                start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-                end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-            except ValueError:
-                return Response(
-                    {'error': '日付形式が正しくありません（YYYY-MM-DD）'},
-                    status=http_status.HTTP_400_BAD_REQUEST
-                )
-            
-            # フィルタパラメータ取得
-            department_filter = request.query_params.get('department')
-            grade_filter = request.query_params.get('grade')
-            class_filter = request.query_params.get('class')
-            status_filter = request.query_params.get('status')
-            search_query = request.query_params.get('search')
-            
-            # 指定期間内のステータス記録を取得（有効化済みユーザーのみ）
-            logs = StatusLog.objects.filter(
-                user__organization=organization,
-                user__role='USER',
-                user__is_activated=True,  # 有効化済みユーザーのみ
-                created_at__date__gte=start_date,
-                created_at__date__lte=end_date
+        # Excel形式（write-only で一時ファイルに書き出し、ファイルから送り出す）
+        output = tempfile.TemporaryFile()
+        try:
+            write_xlsx(output, headers, rows, export['sheet_title'], export['header_color'])
+        except Exception:
+            output.close()
+            raise
+        output.seek(0)
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=f'{basename}.xlsx',
+            content_type=XLSX_CONTENT_TYPE,
+        )
+    
+    @action(detail=False, methods=['get', 'post'], permission_classes=[permissions.IsAuthenticated])
+    def export_jobs(self, request):
+        """
+        出力ジョブの作成（POST）・一覧（GET）（管理者用）
+        
+        POST の指定は export_csv と同じ（format / start_date / end_date / フィルタ）。
+        ファイルは run_worker が生成し、完了後に download_url からダウンロードできる。
+        """
+        if request.user.role != 'ADMIN':
+            return Response(
+                {'error': '管理者のみアクセス可能です'},
+                status=http_status.HTTP_403_FORBIDDEN
             )
-            
-            # フィルタ適用（企業用）
-            if department_filter and department_filter != 'all':
-                logs = logs.filter(user__department=department_filter)
-            
-            # フィルタ適用（学校用）
-            if grade_filter and grade_filter != 'all':
-                logs = logs.filter(user__grade=int(grade_filter))
-            if class_filter and class_filter != 'all':
-                logs = logs.filter(user__class_name=class_filter)
-            
-            # 共通フィルタ
-            if status_filter and status_filter != 'all':
-                logs = logs.filter(status=status_filter)
-            
-            if search_query:
-                logs = logs.filter(user__full_name__icontains=search_query)
-            
-            logs = logs.select_related('user').order_by('user__full_name', 'created_at')
-            
-            # Excel形式
-            if output_format == 'xlsx':
-                wb = Workbook()
-                ws = wb.active
-                ws.title = 'ステータス記録'
-                
-                # ヘッダー行（組織タイプ別）
-                if organization.org_type == 'SCHOOL':
-                    headers = ['氏名', '学年', '組・クラス', 'ステータス', 'コメント', '記録日時']
-                else:  # COMPANY
-                    headers = ['氏名', '所属・部署', '役職', 'ステータス', 'コメント', '記録日時']
-                
-                for col_num, header in enumerate(headers, 1):
-                    cell = ws.cell(row=1, column=col_num, value=header)
-                    cell.font = Font(bold=True, color="FFFFFF")
-                    cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-                    cell.alignment = Alignment(horizontal="center")
-                
-                # データ行
-                status_labels = {'GREEN': '健康', 'YELLOW': '注意', 'RED': '警告'}
-                
-                for row_num, log in enumerate(logs, 2):
-                    if organization.org_type == 'SCHOOL':
-                        ws.cell(row=row_num, column=1, value=log.user.full_name)
-                        ws.cell(row=row_num, column=2, value=log.user.grade or '-')
-                        ws.cell(row=row_num, column=3, value=log.user.class_name or '-')
-                        ws.cell(row=row_num, column=4, value=status_labels.get(log.status, log.status))
-                        ws.cell(row=row_num, column=5, value=log.comment or '-')
-                        ws.cell(row=row_num, column=6, value=log.created_at.astimezone(jst).strftime('%Y-%m-%d %H:%M:%S'))
-                    else:  # COMPANY
-                        ws.cell(row=row_num, column=1, value=log.user.full_name)
-                        ws.cell(row=row_num, column=2, value=log.user.department or '-')
-                        ws.cell(row=row_num, column=3, value=log.user.position or '-')
-                        ws.cell(row=row_num, column=4, value=status_labels.get(log.status, log.status))
-                        ws.cell(row=row_num, column=5, value=log.comment or '-')
-                        ws.cell(row=row_num, column=6, value=log.created_at.astimezone(jst).strftime('%Y-%m-%d %H:%M:%S'))
-                
-                # 列幅調整
-                ws.column_dimensions['A'].width = 15
-                ws.column_dimensions['B'].width = 12
-                ws.column_dimensions['C'].width = 12
-                ws.column_dimensions['D'].width = 12
-                ws.column_dimensions['E'].width = 40
-                ws.column_dimensions['F'].width = 20
-                
-                # Excelファイルとして出力
-                output = io.BytesIO()
-                wb.save(output)
-                output.seek(0)
-                
-                response = HttpResponse(
-                    output.read(),
-                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                filename = f'user_status_{start_date}_{end_date}.xlsx'
-                response['Content-Disposition'] = f'attachment; filename="{filename}"'
-                
-                return response
         
-        else:
-            # 最新ステータスモード
-            # フィルタパラメータ取得
-            department_filter = request.query_params.get('department')
-            grade_filter = request.query_params.get('grade')
-            class_filter = request.query_params.get('class')
-            status_filter = request.query_params.get('status')
-            search_query = request.query_params.get('search')
-            
-            users = User.objects.filter(
-                organization=organization,
-                role='USER',
-                is_activated=True  # 有効化済みユーザーのみ
+        if request.method == 'GET':
+            jobs = ExportJob.objects.filter(
+                organization=request.user.organization
+            ).order_by('-created_at')[:20]
+            return Response(ExportJobSerializer(jobs, many=True).data)
+        
+        try:
+            options = parse_export_options(request.data)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=http_status.HTTP_400_BAD_REQUEST
+            )
+        
+        job = ExportJob.objects.create(
+            organization=request.user.organization,
+            requested_by=request.user,
+            format=options['format'],
+            params=options_to_params(options),
+        )
+        return Response(ExportJobSerializer(job).data, status=http_status.HTTP_202_ACCEPTED)
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path=r'export_jobs/(?P<job_id>[0-9a-f-]+)',
+    )
+    def export_job_detail(self, request, job_id=None):
+        """出力ジョブの状態・進捗を取得（管理者用）"""
+        job = self._get_export_job(request, job_id)
+        if isinstance(job, Response):
+            return job
+        return Response(ExportJobSerializer(job).data)
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path=r'export_jobs/(?P<job_id>[0-9a-f-]+)/download',
+    )
+    def export_job_download(self, request, job_id=None):
+        """完了した出力ジョブのファイルをダウンロード（管理者用）"""
+        from django.http import FileResponse
+        
+        job = self._get_export_job(request, job_id)
+        if isinstance(job, Response):
+            return job
+        
+        if job.status != 'SUCCEEDED':
+            return Response(
+                {'error': 'ファイルはまだ作成されていません'},
+                status=http_status.HTTP_409_CONFLICT
+            )
+        
+        path = export_file_path(job)
+        if job.is_expired() or not job.file_path or not path.exists():
+            return Response(
+                {'error': 'ダウンロード期限が切れています。もう一度出力してください'},
+                status=http_status.HTTP_410_GONE
+            )
+        
+        content_type = CSV_CONTENT_TYPE if job.format == 'csv' else XLSX_CONTENT_TYPE
+        return FileResponse(
+            open(path, 'rb'),
+            as_attachment=True,
+            filename=job.file_name,
+            content_type=content_type,
+        )
+    
+    def _get_export_job(self, request, job_id):
+        """自組織の出力ジョブを取得（取得できなければエラーの Response）"""
+        if request.user.role != 'ADMIN':
+            return Response(
+                {'error': '管理者のみアクセス可能です'},
+                status=http_status.HTTP_403_FORBIDDEN
+            )
+        try:
+            return ExportJob.objects.get(id=job_id, organization=request.user.organization)
+        except (ExportJob.DoesNotExist, ValueError, DjangoValidationError):
+            return Response(
+                {'error': '出力ジョブが見つかりません'},
+                status=http_status.HTTP_404_NOT_FOUND
             )
-            
-            # フィルタ適用（企業用）
-            if department_filter and department_filter != 'all':
-                users = users.filter(department=department_filter)
-            
-            # フィルタ適用（学校用）
-            if grade_filter and grade_filter != 'all':
-                users = users.filter(grade=int(grade_filter))
-            if class_filter and class_filter != 'all':
-                users = users.filter(class_name=class_filter)
-            
-            # 共通フィルタ
-            if search_query:
-                users = users.filter(full_name__icontains=search_query)
-            
-            users = users.order_by('full_name')
-            
-            # Excel形式
-            if output_format == 'xlsx':
-                wb = Workbook()
-                ws = wb.active
-                ws.title = '最新ステータス'
-                
-                # ヘッダー行（組織タイプ別）
-                if organization.org_type == 'SCHOOL':
-                    headers = ['氏名', '学年', '組・クラス', '最新ステータス', 'コメント', '記録日時']
-                else:  # COMPANY
-                    headers = ['氏名', '所属・部署', '役職', '最新ステータス', 'コメント', '記録日時']
-                
-                for col_num, header in enumerate(headers, 1):
-                    cell = ws.cell(row=1, column=col_num, value=header)
-                    cell.font = Font(bold=True, color="FFFFFF")
-                    cell.fill = PatternFill(start_color="70AD47", end_color="70AD47", fill_type="solid")
-                    cell.alignment = Alignment(horizontal="center")
-                
-                # データ行
-                status_labels = {'GREEN': '健康', 'YELLOW': '注意', 'RED': '警告'}
-                
-                row_num = 2
-                for user in users:
-                    latest_log = StatusLog.objects.filter(user=user).order_by('-created_at').first()
-                    
-                    # ステータスフィルタを適用
-                    if status_filter and status_filter != 'all':
-                        if not latest_log or latest_log.status != status_filter:
-                            continue
-                    
-                    if organization.org_type == 'SCHOOL':
-                        ws.cell(row=row_num, column=1, value=user.full_name)
-                        ws.cell(row=row_num, column=2, value=user.grade or '-')
-                        ws.cell(row=row_num, column=3, value=user.class_name or '-')
-                        ws.cell(row=row_num, column=4, value=status_labels.get(latest_log.status, '-') if latest_log else '-')
-                        ws.cell(row=row_num, column=5, value=latest_log.comment if latest_log else '-')
-                        ws.cell(row=row_num, column=6, value=latest_log.created_at.astimezone(jst).strftime('%Y-%m-%d %H:%M:%S') if latest_log else '-')
-                    else:  # COMPANY
-                        ws.cell(row=row_num, column=1, value=user.full_name)
-                        ws.cell(row=row_num, column=2, value=user.department or '-')
-                        ws.cell(row=row_num, column=3, value=user.position or '-')
-                        ws.cell(row=row_num, column=4, value=status_labels.get(latest_log.status, '-') if latest_log else '-')
-                        ws.cell(row=row_num, column=5, value=latest_log.comment if latest_log else '-')
-                        ws.cell(row=row_num, column=6, value=latest_log.created_at.astimezone(jst).strftime('%Y-%m-%d %H:%M:%S') if latest_log else '-')
-                    
-                    row_num += 1
-                
-                # 列幅調整
-                ws.column_dimensions['A'].width = 15
-                ws.column_dimensions['B'].width = 12
-                ws.column_dimensions['C'].width = 12
-                ws.column_dimensions['D'].width = 12
-                ws.column_dimensions['E'].width = 40
-                ws.column_dimensions['F'].width = 20
-                
-                # Excelファイルとして出力
-                output = io.BytesIO()
-                wb.save(output)
-                output.seek(0)
-                
-                response = HttpResponse(
-                    output.read(),
-                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                response['Content-Disposition'] = 'attachment; filename="user_status_latest.xlsx"'
-                
-                return response
 
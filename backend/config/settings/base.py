@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS - 最初に配置
+    'api.middleware.QueryInstrumentationMiddleware',  # SQL計測（QUERY_INSTRUMENTATION_ENABLED 時のみ有効）
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -138,6 +139,28 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Export jobs
+# 出力ジョブ（ExportJob）のファイル保存先と保持時間
+EXPORT_ROOT = os.getenv('EXPORT_ROOT', str(MEDIA_ROOT / 'exports'))
+EXPORT_FILE_TTL_HOURS = int(os.getenv('EXPORT_FILE_TTL_HOURS', '24'))
+
+# Bulk upload jobs
+# 一括登録ジョブ（BulkUploadJob）のアップロードファイル保存先と1チャンクの行数
+BULK_UPLOAD_ROOT = os.getenv('BULK_UPLOAD_ROOT', str(MEDIA_ROOT / 'bulk_uploads'))
+BULK_UPLOAD_CHUNK_SIZE = int(os.getenv('BULK_UPLOAD_CHUNK_SIZE', '500'))
+# アップロードファイルの上限（行を逐次読み込むため、ファイル全体はメモリに展開しない）
+BULK_UPLOAD_MAX_SIZE_MB = int(os.getenv('BULK_UPLOAD_MAX_SIZE_MB', '50'))
+# 行の検証を並列化するプロセス数（0/1 はプロセス内で検証）と、1プロセスに渡す行数
+BULK_UPLOAD_VALIDATION_WORKERS = int(os.getenv('BULK_UPLOAD_VALIDATION_WORKERS', '0'))
+BULK_UPLOAD_VALIDATION_ROWS = int(os.getenv('BULK_UPLOAD_VALIDATION_ROWS', '2000'))
+
+# Background worker (python manage.py run_worker)
+WORKER_POLL_INTERVAL = float(os.getenv('WORKER_POLL_INTERVAL', '2'))
+# この秒数 heartbeat が無い実行中ジョブは停止したとみなして再取得する
+JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', '300'))
+# 実行中ジョブの heartbeat を（処理の進捗とは別に）更新する間隔（秒）
+JOB_HEARTBEAT_SECONDS = int(os.getenv('JOB_HEARTBEAT_SECONDS', '30'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -147,7 +170,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -158,6 +181,58 @@ REST_FRAMEWORK = {
 }
 
 
+# Cache Settings
+# デフォルトはプロセス内メモリ（ワーカーごと）。
+# 複数ワーカー・複数インスタンスで共有する場合は環境変数で差し替える。
+#   例) CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache
+#       CACHE_LOCATION=cache_table  （python manage.py createcachetable が必要）
+#   例) CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#       CACHE_LOCATION=redis://localhost:6379/0  （redis パッケージが必要）
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'mindstatus-default'),
+    }
+}
+
+# プロセス内のキャッシュ（ワーカー間で共有されない）
+# ダッシュボード・認証のキャッシュはバージョンを上げて無効化するため、共有されないキャッシュでは
+# 他のワーカーに無効化が届かない（gunicorn --workers 3 などでは古いデータが TTL まで残る）
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+SHARED_CACHE = CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHE_BACKENDS
+
+# 管理者ダッシュボードのレスポンスキャッシュ（秒・0 で無効）
+# 共有キャッシュ（Redis・DB）のときのみデフォルトで有効（1プロセスで動かす場合は環境変数で有効にできる）
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', 60 if SHARED_CACHE else 0))
+
+# 認証済みユーザー（と組織）のキャッシュ（秒・0 で無効）
+# 無効化・権限変更が他のワーカーに届かないと認可の問題になるため、共有キャッシュでのみ使う
+# （プロセス内のキャッシュでは設定しても使わない）
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 30 if SHARED_CACHE else 0))
+
+
+# SQL クエリ計測（api.middleware.QueryInstrumentationMiddleware）
+# 有効時はリクエストごとのクエリ数・SQL時間を Server-Timing ヘッダーと
+# ロガー api.performance に出力し、予算超過を警告する。
+QUERY_INSTRUMENTATION_ENABLED = os.getenv('QUERY_INSTRUMENTATION_ENABLED', 'False') == 'True'
+
+# 1リクエストあたりのクエリ数の上限（URL名ごと・未指定は QUERY_BUDGET_DEFAULT）
+QUERY_BUDGET_DEFAULT = int(os.getenv('QUERY_BUDGET_DEFAULT', 20))
+QUERY_BUDGETS = {
+    'status-list': 5,
+    'status-dashboard-summary': 5,
+    'status-alerts': 5,
+    'status-user-latest-status': 5,
+    'status-trend-data': 5,
+    'status-dashboard-bundle': 6,
+    'status-export-csv': 10,
+    'user-bulk-upload': 50,
+}
+
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv('JWT_ACCESS_TOKEN_LIFETIME', 60))),
@@ -207,6 +282,8 @@ EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.Em
 
 # SendGrid 設定（本番環境）
 SENDGRID_API_KEY = os.getenv('SENDGRID_API_KEY', '')
+# 送信先の API（負荷試験では python manage.py run_sendgrid_stub の URL を指定する）
+SENDGRID_API_HOST = os.getenv('SENDGRID_API_HOST', 'https://api.sendgrid.com')
 
 # SMTP設定（開発環境）
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
@@ -218,5 +295,23 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 # 送信元アドレス
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@mindstatus.com')
 
+# 送信キュー（EmailOutbox・python manage.py run_email_worker）
+# 1回の API 呼び出しで送る最大件数（SendGrid の personalizations は1000件まで）
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '500'))
+# SendGrid への同時リクエスト数（keep-alive 接続をこの数までプールして使い回す）
+EMAIL_SEND_CONCURRENCY = int(os.getenv('EMAIL_SEND_CONCURRENCY', '4'))
+# 再送までの待機秒数（失敗するたびに倍・上限あり）
+EMAIL_RETRY_BASE_SECONDS = int(os.getenv('EMAIL_RETRY_BASE_SECONDS', '30'))
+EMAIL_RETRY_MAX_SECONDS = int(os.getenv('EMAIL_RETRY_MAX_SECONDS', '3600'))
+# 送信レート制限（全ワーカーで共有するトークンバケット・429/5xx を受けると自動的に下げる）
+# 1秒あたりの送信件数（宛先数）の上限・下限と、貯められる件数
+EMAIL_RATE_LIMIT_PER_SECOND = float(os.getenv('EMAIL_RATE_LIMIT_PER_SECOND', '100'))
+EMAIL_RATE_LIMIT_MIN_PER_SECOND = float(os.getenv('EMAIL_RATE_LIMIT_MIN_PER_SECOND', '1'))
+EMAIL_RATE_LIMIT_BURST = int(os.getenv('EMAIL_RATE_LIMIT_BURST', '1000'))
+# 1日の送信件数の上限（0 は無制限・SendGrid のプランに合わせる）
+EMAIL_DAILY_LIMIT = int(os.getenv('EMAIL_DAILY_LIMIT', '0'))
+# 送信済みメールの保存日数
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv('EMAIL_OUTBOX_RETENTION_DAYS', '30'))
+
 # Frontend URL (for email links)
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
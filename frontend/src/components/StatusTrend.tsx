@@ -12,7 +12,7 @@ import {
 } from 'recharts';
 import './StatusTrend.css';
 
-interface TrendData {
+export interface TrendData {
   date: string;
   green: number;
   yellow: number;
@@ -21,13 +21,27 @@ interface TrendData {
   dateLabel?: string; // フォーマット済み日付（追加）
 }
 
-const StatusTrend: React.FC = () => {
+interface StatusTrendProps {
+  initialData?: TrendData[]; // ダッシュボード一括取得済みの7日間データ
+}
+
+const StatusTrend: React.FC<StatusTrendProps> = ({ initialData }) => {
   const [trendData, setTrendData] = useState<TrendData[]>([]);
   const [loading, setLoading] = useState(true);
   const [selectedDays, setSelectedDays] = useState<number>(7);
 
   // fetchTrendData を useEffect より先に宣言
   const fetchTrendData = useCallback(async () => {
+    // 7日間表示は一括取得済みのデータを使う（追加リクエストなし）
+    if (selectedDays === 7 && initialData) {
+      setTrendData(initialData.map((item: TrendData) => ({
+        ...item,
+        dateLabel: formatDate(item.date),
+      })));
+      setLoading(false);
+      return;
+    }
+
     setLoading(true);
     try {
       const response = await apiClient.get(
@@ -45,7 +59,7 @@ const StatusTrend: React.FC = () => {
     } finally {
       setLoading(false);
     }
-  }, [selectedDays]);
+  }, [selectedDays, initialData]);
 
   useEffect(() => {
     fetchTrendData();
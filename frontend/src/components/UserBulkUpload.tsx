@@ -1,4 +1,4 @@
-import React, { useState, useRef } from 'react';
+import React, { useState, useRef, useEffect } from 'react';
 import apiClient from '../api/client';
 import './UserBulkUpload.css';
 
@@ -16,11 +16,49 @@ interface UploadResult {
   }>;
 }
 
+// 一括登録ジョブ（/api/users/bulk_upload_jobs/<id>/）
+interface BulkUploadJob extends UploadResult {
+  id: string;
+  status: 'PENDING' | 'RUNNING' | 'SUCCEEDED' | 'FAILED';
+  total_rows: number | null;
+  rows_processed: number;
+  progress: number | null;
+  error: string;
+}
+
+// 進捗の確認間隔（ミリ秒）
+const POLL_INTERVAL_MS = 1000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
 const UserBulkUpload: React.FC<UserBulkUploadProps> = ({ onSuccess }) => {
   const [file, setFile] = useState<File | null>(null);
   const [uploading, setUploading] = useState(false);
   const [result, setResult] = useState<UploadResult | null>(null);
+  const [job, setJob] = useState<BulkUploadJob | null>(null);
   const fileInputRef = useRef<HTMLInputElement>(null);
+  const unmountedRef = useRef(false);
+
+  useEffect(() => {
+    unmountedRef.current = false;
+    return () => {
+      // アンマウント後はポーリングを止める
+      unmountedRef.current = true;
+    };
+  }, []);
+
+  const waitForJob = async (jobId: string): Promise<BulkUploadJob | null> => {
+    // 完了・失敗するまで進捗を取得（ジョブはサーバー側で継続するため、離脱しても登録は続く）
+    while (!unmountedRef.current) {
+      const response = await apiClient.get<BulkUploadJob>(`/api/users/bulk_upload_jobs/${jobId}/`);
+      setJob(response.data);
+      if (response.data.status === 'SUCCEEDED' || response.data.status === 'FAILED') {
+        return response.data;
+      }
+      await sleep(POLL_INTERVAL_MS);
+    }
+    return null;
+  };
 
   const handleFileChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     if (e.target.files && e.target.files[0]) {
@@ -66,20 +104,35 @@ const UserBulkUpload: React.FC<UserBulkUploadProps> = ({ onSuccess }) => {
 
     setUploading(true);
     setResult(null);
+    setJob(null);
 
     try {
       const formData = new FormData();
         formData.append('file', file);
 
-      const response = await apiClient.post('/api/users/bulk_upload/', formData, {
+      // ファイルを送信してジョブを作成（取り込みはバックグラウンドで実行）
+      const response = await apiClient.post<BulkUploadJob>('/api/users/bulk_upload_jobs/', formData, {
         headers: {
           'Content-Type': 'multipart/form-data',
         },
       });
+      setJob(response.data);
 
-      setResult(response.data);
+      const finishedJob = await waitForJob(response.data.id);
+      if (!finishedJob) {
+        return;
+      }
+
+      if (finishedJob.status === 'FAILED') {
+        alert(`❌ エラー\n\n${finishedJob.error || 'アップロードに失敗しました'}`);
+        if (finishedJob.success_count === 0) {
+          return;
+        }
+      }
+
+      setResult(finishedJob);
       
-      if (response.data.error_count === 0) {
+      if (finishedJob.error_count === 0 && finishedJob.status === 'SUCCEEDED') {
         // alert は削除（結果UIで統一）
         resetFileInput();  // file input のみリセット
         
@@ -87,7 +140,7 @@ const UserBulkUpload: React.FC<UserBulkUploadProps> = ({ onSuccess }) => {
         if (onSuccess) {
           onSuccess();
         }
-      } else if (response.data.success_count > 0) {
+      } else if (finishedJob.success_count > 0) {
         // 一部成功の場合も通知
         if (onSuccess) {
           onSuccess();
@@ -143,6 +196,7 @@ const UserBulkUpload: React.FC<UserBulkUploadProps> = ({ onSuccess }) => {
       }
     } finally {
       setUploading(false);
+      setJob(null);
     }
   };
 
@@ -198,10 +252,23 @@ const UserBulkUpload: React.FC<UserBulkUploadProps> = ({ onSuccess }) => {
           disabled={!file || uploading}
           className="upload-button"
         >
-          {uploading ? 'アップロード中...' : '登録実行'}
+          {uploading ? (job ? '登録中...' : 'アップロード中...') : '登録実行'}
         </button>
       </div>
 
+      {uploading && job && (
+        <div className="progress-section">
+          <div className="progress-bar">
+            <div className="progress-bar-fill" style={{ width: `${job.progress ?? 0}%` }} />
+          </div>
+          <p className="progress-text">
+            {job.status === 'PENDING' || job.total_rows === null
+              ? '登録の開始を待っています...'
+              : `${job.rows_processed} / ${job.total_rows} 行を処理しました（成功 ${job.success_count}件・失敗 ${job.error_count}件）`}
+          </p>
+        </div>
+      )}
+
       {result && (
         <div className="result-section">
           <h3>登録結果</h3>
@@ -3,7 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import apiClient from '../api/client';
 import { PieChart, Pie, Cell, ResponsiveContainer, Legend, Tooltip } from 'recharts';
 import UserBulkUpload from '../components/UserBulkUpload';
-import StatusTrend from '../components/StatusTrend';
+import StatusTrend, { TrendData } from '../components/StatusTrend';
 import './AdminDashboard.css';
 
 interface AdminDashboardProps {
@@ -57,6 +57,7 @@ const AdminDashboard: React.FC<AdminDashboardProps> = ({ setIsAuthenticated }) =
   const [summary, setSummary] = useState<DashboardSummary | null>(null);
   const [alerts, setAlerts] = useState<Alert[]>([]);
   const [userStatuses, setUserStatuses] = useState<UserStatus[]>([]);
+  const [trendData, setTrendData] = useState<TrendData[] | undefined>(undefined);
   const [loading, setLoading] = useState(true);
   const [showBulkUpload, setShowBulkUpload] = useState(false);
   const [orgType, setOrgType] = useState<'SCHOOL' | 'COMPANY'>('COMPANY'); // 組織タイプ
@@ -80,16 +81,16 @@ const AdminDashboard: React.FC<AdminDashboardProps> = ({ setIsAuthenticated }) =
 
   const fetchDashboardData = async () => {
     try {
-      const [summaryRes, alertsRes, usersRes, userInfoRes] = await Promise.all([
-        apiClient.get('/api/status/dashboard_summary/'),
-        apiClient.get('/api/status/alerts/'),
-        apiClient.get('/api/status/user_latest_status/'),
+      // サマリー・アラート・ユーザー一覧・推移を1リクエストで取得
+      const [bundleRes, userInfoRes] = await Promise.all([
+        apiClient.get('/api/status/dashboard_bundle/'),
         apiClient.get('/api/users/me/')
       ]);
 
-      setSummary(summaryRes.data);
-      setAlerts(alertsRes.data);
-      setUserStatuses(usersRes.data);
+      setSummary(bundleRes.data.dashboard_summary);
+      setAlerts(bundleRes.data.alerts);
+      setUserStatuses(bundleRes.data.user_latest_status);
+      setTrendData(bundleRes.data.trend_data);
       
       // 組織タイプとユーザーIDを設定
       const currentUser = userInfoRes.data;
@@ -414,7 +415,7 @@ const AdminDashboard: React.FC<AdminDashboardProps> = ({ setIsAuthenticated }) =
 
               {/* 時系列グラフ */}
               <div className="trend-section">
-                <StatusTrend />
+                <StatusTrend initialData={trendData} />
               </div>
 
               {/* ユーザー一覧 */}